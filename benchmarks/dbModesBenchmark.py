@@ -0,0 +1,163 @@
+"""
+Compare requests/sec of the sync (psycopg2 + threadpool) and async (asyncpg)
+database stacks for ``/fetch_stat`` and the quiz read/write endpoints.
+
+Requires a reachable PostgreSQL in ``POSTGRE_URL`` with the schema created.
+The benchmark seeds its own users and quiz and removes them afterwards.
+
+Usage:
+    python -m benchmarks.dbModesBenchmark --concurrency 32 --duration 10
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from fastapi import FastAPI, Depends
+from sqlalchemy.orm import Session
+import httpx
+from database.connection import SessionLocal, get_db
+from database.models import User, UserAuth, Quiz, Question, QuizAttempt, AttemptAnswer, func
+from routes.middleware.auth import get_user_id
+from schemas.quizSchemas import AttemptQuizAnswerRequest
+from controllers import usersController, quizController
+from utils.auth import create_access_token, get_password_hash
+
+QUESTIONS_PER_QUIZ = 5
+
+
+def build_sync_app() -> FastAPI:
+    """
+    Build an app serving the benchmarked endpoints with the sync controllers.
+    """
+    app = FastAPI()
+
+    @app.get("/api/v1/fetch_stat")
+    def fetch_stat(user_id: str = Depends(get_user_id), db: Session = Depends(get_db)):
+        return usersController.fetch_user_info(db, user_id)
+
+    @app.get("/api/v1/quiz/attempt/{quiz_attempt_id}")
+    def quiz_questions(quiz_attempt_id: str, user_id: str = Depends(get_user_id), db: Session = Depends(get_db)):
+        return quizController.get_quiz_questions(db, quiz_attempt_id, user_id)
+
+    @app.get("/api/v1/quiz/answer/{quiz_attempt_id}/{question_id}")
+    def quiz_answer(quiz_attempt_id: str, question_id: str, user_id: str = Depends(get_user_id), db: Session = Depends(get_db)):
+        return quizController.get_answer_by_quiz_attempt_question_id(db, quiz_attempt_id, question_id, user_id)
+
+    @app.put("/api/v1/quiz/submit/{quiz_attempt_id}/{question_id}")
+    def quiz_submit(quiz_attempt_id: uuid.UUID, question_id: uuid.UUID, user_answers: AttemptQuizAnswerRequest,
+                    user_id: str = Depends(get_user_id), db: Session = Depends(get_db)):
+        return quizController.attempt_quiz_answer(db, quiz_attempt_id, user_id, question_id, user_answers)
+
+    return app
+
+
+def seed() -> dict:
+    """
+    Insert a dashboard user and a quiz user with an active attempt.
+    """
+    db = SessionLocal()
+    try:
+        password = get_password_hash("benchmark")
+        users = []
+        for _ in range(2):
+            user = User(full_name="Benchmark User", age=30)
+            db.add(user)
+            db.flush()
+            db.add(UserAuth(user_id=user.id, username=f"bench-{uuid.uuid4().hex[:12]}", password=password))
+            users.append(user.id)
+        quiz = Quiz(generated_by_user_id=users[1], title="Benchmark quiz", description="Benchmark quiz")
+        db.add(quiz)
+        db.flush()
+        questions = [
+            Question(quiz_id=quiz.id, question_text=f"Question {i}", question_type="multiple_choice",
+                     possible_answers={"A": "a", "B": "b", "C": "c", "D": "d"}, correct_answer=["A"])
+            for i in range(QUESTIONS_PER_QUIZ)
+        ]
+        db.add_all(questions)
+        db.flush()
+        attempt = QuizAttempt(quiz_id=quiz.id, user_id=users[1], expired_at=func.now() + func.make_interval(0, 0, 0, 0, 1))
+        db.add(attempt)
+        db.flush()
+        db.add(AttemptAnswer(attempt_id=attempt.id, question_id=questions[0].id, user_answer=["A"]))
+        db.commit()
+        return {
+            "users": users,
+            "quiz_id": quiz.id,
+            "attempt_id": attempt.id,
+            "question_id": questions[0].id,
+        }
+    finally:
+        db.close()
+
+
+def cleanup(seeded: dict) -> None:
+    db = SessionLocal()
+    try:
+        db.query(Quiz).filter(Quiz.id == seeded["quiz_id"]).delete(synchronize_session=False)
+        db.query(User).filter(User.id.in_(seeded["users"])).delete(synchronize_session=False)
+        db.commit()
+    finally:
+        db.close()
+
+
+async def drive(app: FastAPI, method: str, url: str, token: str, concurrency: int, duration: float, json: dict = None) -> float:
+    """
+    Hammer one endpoint with ``concurrency`` clients for ``duration`` seconds.
+
+    :return: Successful requests per second
+    """
+    headers = {"Authorization": f"Bearer {token}"}
+    transport = httpx.ASGITransport(app=app)
+    completed = 0
+    failed = 0
+    deadline = time.perf_counter() + duration
+
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def worker():
+            nonlocal completed, failed
+            while time.perf_counter() < deadline:
+                response = await client.request(method, url, headers=headers, json=json)
+                if response.status_code < 400:
+                    completed += 1
+                else:
+                    failed += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+    if failed:
+        print(f"    {failed} failed requests on {method} {url}")
+    return completed / elapsed
+
+
+async def main(concurrency: int, duration: float) -> None:
+    from main import app as async_app
+
+    seeded = seed()
+    try:
+        dashboard_token = create_access_token({"user_id": str(seeded["users"][0])})
+        quiz_token = create_access_token({"user_id": str(seeded["users"][1])})
+        attempt_id, question_id = seeded["attempt_id"], seeded["question_id"]
+        cases = [
+            ("GET", "/api/v1/fetch_stat", dashboard_token, None),
+            ("GET", f"/api/v1/quiz/attempt/{attempt_id}", quiz_token, None),
+            ("GET", f"/api/v1/quiz/answer/{attempt_id}/{question_id}", quiz_token, None),
+            ("PUT", f"/api/v1/quiz/submit/{attempt_id}/{question_id}", quiz_token, {"user_answers": ["B"]}),
+        ]
+        modes = {"sync": build_sync_app(), "async": async_app}
+        print(f"concurrency={concurrency} duration={duration}s")
+        for method, url, token, body in cases:
+            print(f"{method} {url}")
+            for mode, app in modes.items():
+                rps = await drive(app, method, url, token, concurrency, duration, body)
+                print(f"    {mode:<5} {rps:10.1f} req/s")
+    finally:
+        cleanup(seeded)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--duration", type=float, default=10.0)
+    args = parser.parse_args()
+    asyncio.run(main(args.concurrency, args.duration))
@@ -0,0 +1,122 @@
+"""
+Compare the per-answer grading loop the sync ``evaluate_quiz`` used to run
+with the set-based grading statement of ``database.grading`` at growing quiz
+sizes.
+
+Requires a reachable PostgreSQL in ``POSTGRE_URL`` with the schema created.
+The benchmark seeds its own user and quizzes and removes them afterwards.
+
+Usage:
+    python -m benchmarks.gradingBenchmark --sizes 5 50 500 --repeat 5
+"""
+import argparse
+import statistics
+import time
+import uuid
+from sqlalchemy import insert, func
+from database.connection import SessionLocal
+from database.models import User, Quiz, Question, QuizAttempt, AttemptAnswer, UserCollection
+from database.grading import grade_attempt_statement
+
+
+def seed_quiz(db, user_id: uuid.UUID, size: int) -> tuple[uuid.UUID, list[uuid.UUID]]:
+    quiz_id = uuid.uuid4()
+    db.execute(insert(Quiz).values(id=quiz_id, generated_by_user_id=user_id, title=f"Grading {size}", description=""))
+    question_ids = [uuid.uuid4() for _ in range(size)]
+    db.execute(insert(Question), [
+        {
+            "id": question_id, "quiz_id": quiz_id, "question_text": f"Question {index}",
+            "question_type": "multiple_answer", "possible_answers": {"A": "a", "B": "b", "C": "c", "D": "d"},
+            "correct_answer": ["A", "C"],
+        } for index, question_id in enumerate(question_ids)
+    ])
+    db.commit()
+    return quiz_id, question_ids
+
+
+def seed_attempt(db, user_id: uuid.UUID, quiz_id: uuid.UUID, question_ids: list[uuid.UUID]) -> uuid.UUID:
+    attempt_id = uuid.uuid4()
+    db.execute(insert(QuizAttempt).values(id=attempt_id, user_id=user_id, quiz_id=quiz_id))
+    db.execute(insert(AttemptAnswer), [
+        {
+            "id": uuid.uuid4(), "attempt_id": attempt_id, "question_id": question_id,
+            "user_answer": ["C", "A"] if index % 2 else ["B"],
+        } for index, question_id in enumerate(question_ids)
+    ])
+    db.commit()
+    return attempt_id
+
+
+def legacy(db, attempt_id: uuid.UUID, user_id: uuid.UUID) -> None:
+    """
+    One query per answer, then the attempt and the user collection, as ``evaluate_quiz`` used to grade.
+    """
+    attempt = db.query(QuizAttempt).filter(QuizAttempt.id == attempt_id, QuizAttempt.is_completed == False).first()
+    answers = db.query(AttemptAnswer).filter(AttemptAnswer.attempt_id == attempt_id).all()
+    questions = db.query(Question).filter(Question.quiz_id == attempt.quiz_id).all()
+    point = 0
+    for question in questions:
+        answer = next((a for a in answers if a.question_id == question.id), None)
+        is_correct = answer is not None and set(answer.user_answer) == set(question.correct_answer)
+        if answer is not None:
+            db.query(AttemptAnswer).filter(AttemptAnswer.id == answer.id).update(
+                {AttemptAnswer.is_correct: is_correct}, synchronize_session=False
+            )
+        point += is_correct
+    score = point / len(questions) * 100
+    db.query(QuizAttempt).filter(QuizAttempt.id == attempt_id).update(
+        {QuizAttempt.is_completed: True, QuizAttempt.completed_at: func.now(), QuizAttempt.score: score,
+         QuizAttempt.points_earned: point},
+        synchronize_session=False
+    )
+    collection = db.query(UserCollection).filter(UserCollection.user_id == user_id).first()
+    if collection:
+        collection.score = int((collection.score + score) / (collection.num_quiz_attempt + 1))
+        collection.point_earned += point
+        collection.num_quiz_attempt += 1
+    else:
+        db.add(UserCollection(user_id=user_id, score=score, point_earned=point, num_quiz_attempt=1))
+    db.commit()
+
+
+def set_based(db, attempt_id: uuid.UUID, user_id: uuid.UUID) -> None:
+    rows = db.execute(grade_attempt_statement(attempt_id, user_id)).all()
+    db.commit()
+    assert rows, "attempt was not graded"
+
+
+def main(sizes: list[int], repeat: int) -> None:
+    db = SessionLocal()
+    user = User(full_name="Grading Benchmark", age=30)
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    try:
+        print(f"{'questions':>9} {'legacy ms':>10} {'set-based ms':>13} {'speedup':>8}")
+        for size in sizes:
+            quiz_id, question_ids = seed_quiz(db, user_id, size)
+            timings = {}
+            for name, grade in (("legacy", legacy), ("set_based", set_based)):
+                samples = []
+                for _ in range(repeat):
+                    attempt_id = seed_attempt(db, user_id, quiz_id, question_ids)
+                    started = time.perf_counter()
+                    grade(db, attempt_id, user_id)
+                    samples.append(time.perf_counter() - started)
+                timings[name] = statistics.median(samples) * 1000
+            print(f"{size:>9} {timings['legacy']:>10.1f} {timings['set_based']:>13.1f} "
+                  f"{timings['legacy'] / timings['set_based']:>7.1f}x")
+    finally:
+        db.rollback()
+        db.query(Quiz).filter(Quiz.generated_by_user_id == user_id).delete(synchronize_session=False)
+        db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+        db.commit()
+        db.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[5, 50, 500])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+    main(args.sizes, args.repeat)
@@ -0,0 +1,79 @@
+"""
+Rank lookups on the in-memory leaderboard at 1M users, compared with the
+scan a naive ``SELECT count(*) + 1 ... WHERE point_earned > :points`` does
+on every request (simulated in memory, so no database is needed). The
+rebuild is also run in a thread next to an event loop, to measure the
+longest stall it causes, as the refresh job runs it.
+
+Usage:
+    python -m benchmarks.leaderboardBenchmark --users 1000000 --lookups 10000
+"""
+import argparse
+import asyncio
+import random
+import time
+import uuid
+from utils.leaderboard import Leaderboard
+
+
+async def longest_stall(board: Leaderboard, rows: list) -> float:
+    """
+    Rebuild the board in a thread and return the longest gap between two ticks of the event loop.
+    """
+    rebuild = asyncio.ensure_future(asyncio.to_thread(board.replace, rows))
+    longest, last = 0.0, time.perf_counter()
+    while not rebuild.done():
+        await asyncio.sleep(0.001)
+        now = time.perf_counter()
+        longest, last = max(longest, now - last), now
+    await rebuild
+    return longest
+
+
+def main(users: int, lookups: int, seed: int) -> None:
+    rng = random.Random(seed)
+    rows = [(uuid.UUID(int=rng.getrandbits(128)), None, rng.randint(0, 50_000)) for _ in range(users)]
+    # The refresh query returns the rows in this order
+    rows.sort(key=lambda row: (-row[2], row[0].int))
+    board = Leaderboard()
+
+    started = time.perf_counter()
+    board.replace(rows)
+    print(f"rebuild of {users} users: {(time.perf_counter() - started) * 1000:.0f} ms")
+    print(f"longest event loop stall during a threaded rebuild: {asyncio.run(longest_stall(board, rows)) * 1000:.0f} ms")
+
+    sample = [rng.choice(rows) for _ in range(lookups)]
+    started = time.perf_counter()
+    for user_id, _, _ in sample:
+        board.rank(user_id)
+    elapsed = time.perf_counter() - started
+    print(f"rank lookup: {elapsed / lookups * 1e6:.2f} us per call")
+
+    started = time.perf_counter()
+    for user_id, _, _ in sample:
+        board.around(user_id, 5)
+    elapsed = time.perf_counter() - started
+    print(f"rank with 5 neighbors: {elapsed / lookups * 1e6:.2f} us per call")
+
+    started = time.perf_counter()
+    for user_id, _, points in sample:
+        board.update(user_id, points + rng.randint(1, 5))
+    elapsed = time.perf_counter() - started
+    print(f"incremental update: {elapsed / lookups * 1e6:.2f} us per call")
+
+    points = [point_earned for _, _, point_earned in rows]
+    scans = max(lookups // 100, 1)
+    started = time.perf_counter()
+    for _, _, own in sample[:scans]:
+        sum(1 for other in points if other > own) + 1
+    elapsed = time.perf_counter() - started
+    print(f"full scan rank (naive query): {elapsed / scans * 1e6:.0f} us per call")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--lookups", type=int, default=10_000)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    main(args.users, args.lookups, args.seed)
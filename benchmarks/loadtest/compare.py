@@ -0,0 +1,63 @@
+"""
+Compare two load test baselines written by ``benchmarks.loadtest.run``.
+
+Prints the p50/p95/p99 and throughput of every endpoint side by side and
+exits with status 1 when an endpoint's p95 grew by more than
+``--threshold`` percent, or its error count grew, so it can gate CI.
+
+Usage:
+    python -m benchmarks.loadtest.compare benchmarks/loadtest/baselines/users100-concurrency10.json \\
+        candidate.json --threshold 10
+"""
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _change(before: float, after: float) -> float:
+    return (after - before) / before * 100 if before else 0.0
+
+
+def compare(baseline: dict, candidate: dict, threshold: float) -> list[str]:
+    """
+    Print the comparison table and return the regressions found.
+    """
+    regressions = []
+    print(f"baseline {baseline.get('commit')} ({baseline['created_at']}) -> "
+          f"candidate {candidate.get('commit')} ({candidate['created_at']})")
+    if baseline["config"] != candidate["config"]:
+        print("warning: the runs used different configurations", file=sys.stderr)
+    print(f"{'endpoint':<16} {'p50 ms':>17} {'p95 ms':>17} {'p99 ms':>17} {'req/s':>15} {'errors':>9}")
+    for name in sorted(set(baseline["endpoints"]) | set(candidate["endpoints"])):
+        before = baseline["endpoints"].get(name)
+        after = candidate["endpoints"].get(name)
+        if before is None or after is None:
+            print(f"{name:<16} only in {'candidate' if before is None else 'baseline'}")
+            continue
+        cells = [
+            f"{before[key]:>7.1f}>{after[key]:>7.1f}{'*' if key == 'p95_ms' and _change(before[key], after[key]) > threshold else ' '}"
+            for key in ("p50_ms", "p95_ms", "p99_ms")
+        ]
+        print(f"{name:<16} {cells[0]:>17} {cells[1]:>17} {cells[2]:>17} "
+              f"{before['throughput_rps']:>6.1f}>{after['throughput_rps']:>6.1f} "
+              f"{before['errors']:>4}>{after['errors']:<4}")
+        if _change(before["p95_ms"], after["p95_ms"]) > threshold:
+            regressions.append(f"{name}: p95 {before['p95_ms']:.1f} ms -> {after['p95_ms']:.1f} ms "
+                               f"(+{_change(before['p95_ms'], after['p95_ms']):.0f}%)")
+        if after["errors"] > before["errors"]:
+            regressions.append(f"{name}: errors {before['errors']} -> {after['errors']}")
+    return regressions
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("baseline", type=Path)
+    parser.add_argument("candidate", type=Path)
+    parser.add_argument("--threshold", type=float, default=10, help="allowed p95 increase in percent")
+    args = parser.parse_args()
+
+    regressions = compare(json.loads(args.baseline.read_text()), json.loads(args.candidate.read_text()), args.threshold)
+    if regressions:
+        print("\nregressions:\n  " + "\n  ".join(regressions))
+        sys.exit(1)
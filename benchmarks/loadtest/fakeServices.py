@@ -0,0 +1,110 @@
+"""
+Offline stand-ins for Azure OpenAI and the mood classifier.
+
+* ``POST .../chat/completions`` answers like Azure OpenAI. Structured
+  output requests (``response_format`` JSON schema, or a tool call) get a
+  JSON document generated from the requested schema, so the LangChain
+  parsers of ``nodes`` accept it.
+* ``POST /score`` answers like the mood classifier with a random mood.
+
+Both wait a configurable time to stand in for the model latency.
+
+Usage:
+    python -m benchmarks.loadtest.fakeServices --port 8901 --llm-latency-ms 400 --classifier-latency-ms 80
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import time
+import uuid
+from fastapi import FastAPI, Request
+
+MOODS = ("happy", "surprise", "sad", "anger", "disgust", "fear", "neutral")
+
+app = FastAPI()
+app.state.llm_latency = float(os.getenv("FAKE_LLM_LATENCY_MS", "400")) / 1000
+app.state.classifier_latency = float(os.getenv("FAKE_CLASSIFIER_LATENCY_MS", "80")) / 1000
+
+
+def fake_value(schema: dict, definitions: dict):
+    """
+    Build a value matching a JSON schema, enough for the pydantic models of the app.
+    """
+    if "$ref" in schema:
+        return fake_value(definitions[schema["$ref"].rsplit("/", 1)[-1]], definitions)
+    for combinator in ("anyOf", "oneOf", "allOf"):
+        if combinator in schema:
+            options = [option for option in schema[combinator] if option.get("type") != "null"]
+            return fake_value(options[0], definitions)
+    if "enum" in schema:
+        return schema["enum"][0]
+    kind = schema.get("type", "string")
+    if kind == "object":
+        return {name: fake_value(prop, definitions) for name, prop in schema.get("properties", {}).items()}
+    if kind == "array":
+        return [fake_value(schema.get("items", {}), definitions) for _ in range(max(schema.get("minItems", 1), 1))]
+    if kind in ("integer", "number"):
+        return 1
+    if kind == "boolean":
+        return True
+    return f"Lorem ipsum {random.randint(1, 1_000_000)}"
+
+
+def _structured(schema: dict) -> str:
+    return json.dumps(fake_value(schema, schema.get("$defs", schema.get("definitions", {}))))
+
+
+@app.post("/{path:path}/chat/completions")
+async def chat_completions(path: str, request: Request) -> dict:
+    body = await request.json()
+    await asyncio.sleep(app.state.llm_latency)
+    message = {"role": "assistant", "content": "I hear you. Let's take a deep breath together."}
+    response_format = body.get("response_format") or {}
+    if response_format.get("type") == "json_schema":
+        message["content"] = _structured(response_format["json_schema"]["schema"])
+    elif body.get("tools"):
+        function = body["tools"][0]["function"]
+        message["content"] = None
+        message["tool_calls"] = [{
+            "id": f"call_{uuid.uuid4().hex[:24]}",
+            "type": "function",
+            "function": {"name": function["name"], "arguments": _structured(function.get("parameters", {}))},
+        }]
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "gpt-4.1"),
+        "choices": [{
+            "index": 0,
+            "message": message,
+            "finish_reason": "tool_calls" if message.get("tool_calls") else "stop",
+        }],
+        "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150},
+    }
+
+
+@app.post("/score")
+async def score() -> dict:
+    await asyncio.sleep(app.state.classifier_latency)
+    prediction = random.choice(MOODS)
+    return {
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "prediction": prediction,
+        "scores": {mood: f"{0.9 if mood == prediction else 0.1 / 6:.4f}" for mood in MOODS},
+    }
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--llm-latency-ms", type=float, default=400)
+    parser.add_argument("--classifier-latency-ms", type=float, default=80)
+    args = parser.parse_args()
+    app.state.llm_latency = args.llm_latency_ms / 1000
+    app.state.classifier_latency = args.classifier_latency_ms / 1000
+    uvicorn.run(app, host="127.0.0.1", port=args.port, log_level="warning")
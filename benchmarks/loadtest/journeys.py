@@ -0,0 +1,94 @@
+"""
+User journeys of the load test and the recording of their latencies.
+
+A journey is the path of a new user through the app: register, login,
+face detection, fetch_stat, chat, generate a quiz, start an attempt,
+answer every question, evaluate the attempt and fetch_stat again.
+"""
+import base64
+import os
+import random
+import time
+import uuid
+from collections import defaultdict
+from dataclasses import dataclass, field
+import httpx
+
+PREFIX = "/api/v1"
+# Small random payload standing in for a camera frame
+FAKE_IMAGE = base64.b64encode(os.urandom(24 * 1024)).decode()
+
+
+@dataclass
+class Recorder:
+    """
+    Latency samples and errors by endpoint name.
+    """
+    latencies: dict = field(default_factory=lambda: defaultdict(list))
+    errors: dict = field(default_factory=lambda: defaultdict(int))
+    status_codes: dict = field(default_factory=lambda: defaultdict(lambda: defaultdict(int)))
+
+    async def call(self, client: httpx.AsyncClient, name: str, method: str, url: str, expected: int = 200, **kwargs):
+        """
+        Send one request and record its latency under ``name``.
+
+        :raises JourneyAborted: If the status is not ``expected``, the rest of the journey depends on it
+        """
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError as e:
+            self.errors[name] += 1
+            self.status_codes[name]["transport"] += 1
+            raise JourneyAborted(f"{name}: {e!r}") from e
+        self.latencies[name].append(time.perf_counter() - started)
+        self.status_codes[name][str(response.status_code)] += 1
+        if response.status_code != expected:
+            self.errors[name] += 1
+            raise JourneyAborted(f"{name}: {response.status_code} {response.text[:200]}")
+        return response
+
+
+class JourneyAborted(Exception):
+    pass
+
+
+async def user_journey(client: httpx.AsyncClient, recorder: Recorder, theme: str = "mental_health") -> None:
+    """
+    Run the journey of one new user.
+
+    :param client: HTTP client with the base URL of the app
+    :param recorder: Recorder of the latencies
+    :param theme: Theme of the generated quiz
+    """
+    username = f"load-{uuid.uuid4().hex[:12]}"
+    password = uuid.uuid4().hex
+    await recorder.call(client, "register", "POST", f"{PREFIX}/register", expected=201, json={
+        "full_name": "Load Test", "username": username, "password": password, "age": random.randint(18, 60),
+    })
+    login = await recorder.call(client, "login", "POST", f"{PREFIX}/login", data={
+        "username": username, "password": password,
+    })
+    headers = {"Authorization": f"Bearer {login.json()['access_token']}"}
+
+    await recorder.call(client, "face_detection", "POST", f"{PREFIX}/mood/face-detection",
+                        headers=headers, json={"image": FAKE_IMAGE})
+    await recorder.call(client, "fetch_stat", "GET", f"{PREFIX}/fetch_stat", headers=headers)
+    await recorder.call(client, "chat", "POST", f"{PREFIX}/chat", headers=headers, json={
+        "message": "I could not sleep well this week.", "message_history": [],
+    })
+
+    quiz = await recorder.call(client, "quiz_generate", "POST", f"{PREFIX}/quiz/generate", expected=201,
+                               headers=headers, json={"theme": theme, "difficulty": "easy"})
+    attempt = await recorder.call(client, "quiz_attempt", "POST", f"{PREFIX}/quiz/attempt/{quiz.json()['quiz_id']}",
+                                  headers=headers)
+    attempt = attempt.json()
+    for question in attempt["questions"]:
+        await recorder.call(
+            client, "quiz_answer", "PUT",
+            f"{PREFIX}/quiz/submit/{attempt['quiz_attempt_id']}/{question['question_id']}",
+            headers=headers, json={"user_answers": [random.choice("ABCD")]}
+        )
+    await recorder.call(client, "quiz_evaluate", "POST", f"{PREFIX}/quiz/submit/{attempt['quiz_attempt_id']}",
+                        headers=headers)
+    await recorder.call(client, "fetch_stat", "GET", f"{PREFIX}/fetch_stat", headers=headers)
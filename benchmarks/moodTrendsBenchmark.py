@@ -0,0 +1,74 @@
+"""
+Time the vectorized mood trends of ``utils.moodTrends`` on synthetic
+multi-year data, against the same statistics computed row by row in Python.
+
+Usage:
+    python -m benchmarks.moodTrendsBenchmark --years 1 5 10 --repeat 50
+"""
+import argparse
+import statistics
+import time
+import numpy as np
+from utils.moodTrends import compute_mood_trends
+
+MOOD_IDS = list(range(1, 8))
+
+
+def synthetic(days: int, seed: int) -> tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    # A record on about 80% of the days, moods drawn with a bias to the first ones
+    offsets = np.flatnonzero(rng.random(days) < 0.8)
+    levels = rng.choice(MOOD_IDS, size=len(offsets), p=[0.3, 0.1, 0.2, 0.1, 0.05, 0.05, 0.2])
+    return offsets, levels
+
+
+def python_trends(offsets, levels, days: int, window: int = 7) -> None:
+    """
+    Reference implementation looping over the days and records in Python.
+    """
+    by_day = dict(zip(offsets.tolist(), levels.tolist()))
+    rolling = []
+    for day in range(days):
+        counts = {mood: 0 for mood in MOOD_IDS}
+        for previous in range(max(day - window + 1, 0), day + 1):
+            if previous in by_day:
+                counts[by_day[previous]] += 1
+        rolling.append(counts)
+    longest, run_mood, run_length = {}, None, 0
+    for day in range(days):
+        mood = by_day.get(day)
+        run_length = run_length + 1 if mood is not None and mood == run_mood else (1 if mood is not None else 0)
+        run_mood = mood
+        if mood is not None:
+            longest[mood] = max(longest.get(mood, 0), run_length)
+    weekly = {}
+    for day, mood in by_day.items():
+        week = weekly.setdefault(day // 7, {m: 0 for m in MOOD_IDS})
+        week[mood] += 1
+
+
+def timed(function, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function()
+        samples.append(time.perf_counter() - started)
+    return statistics.median(samples) * 1000
+
+
+def main(years: list[int], repeat: int) -> None:
+    print(f"{'years':>5} {'records':>8} {'numpy ms':>9} {'python ms':>10} {'speedup':>8}")
+    for count in years:
+        days = count * 365
+        offsets, levels = synthetic(days, seed=count)
+        vectorized = timed(lambda: compute_mood_trends(offsets, levels, days, MOOD_IDS), repeat)
+        reference = timed(lambda: python_trends(offsets, levels, days), max(repeat // 10, 1))
+        print(f"{count:>5} {len(offsets):>8} {vectorized:>9.2f} {reference:>10.2f} {reference / vectorized:>7.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--years", type=int, nargs="+", default=[1, 5, 10])
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+    main(args.years, args.repeat)
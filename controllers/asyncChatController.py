@@ -0,0 +1,107 @@
+from nodes.chatAzure import chat_azure, ChatAzureMentalCareResponse
+from uuid import UUID
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from database.models import User, DailyMood, Moods, func, UserCollection
+from schemas.chatSchemas import ChatRequest, ChatTrialRequest
+from logging_config import logger
+from utils.metrics import track
+
+async def chat_trial(db: AsyncSession, data: ChatTrialRequest) -> ChatAzureMentalCareResponse:
+    """
+    Perform chat trial for a user based on the provided data.
+
+    :param db: SQLAlchemy async session object
+    :param data: Data to be sent for chat trial
+    :return: Chat trial result
+    """
+    try:
+        data = data.model_dump()
+        logger.info("Sending chat trial request with a %s character message", len(data.get('message') or ""))
+        if len(data.get('message_history')) > 7:
+            logger.warning("Chat trial message history exceeds 3 messages, truncating to last 3")
+            raise ProcessLookupError("Chat trial message history exceeds 3 messages")
+        # The LLM client is blocking, run it in the threadpool
+        with track("llm"):
+            response = await run_in_threadpool(chat_azure.chat, data)
+
+        if not response:
+            logger.error("Chat trial failed to get a response")
+            raise ValueError("Chat trial failed to get a response")
+
+        logger.info("Chat trial successful")
+        return response
+    except Exception as e:
+        logger.exception("Error in chat_trial function: %s", e)
+        raise ValueError("Chat trial failed due to an error") from e
+
+async def chat(db: AsyncSession, user_id: UUID, data: ChatRequest) -> ChatAzureMentalCareResponse:
+    """
+    Perform chat for a user based on the provided data.
+
+    :param db: SQLAlchemy async session object
+    :param user_id: ID of the user for whom chat is to be performed
+    :param data: Data to be sent for chat
+    :return: Chat result
+    """
+    try:
+        data = data.model_dump()
+        user = (await db.execute(select(User.full_name).where(User.id == user_id))).first()
+        if not user:
+            logger.error("User not found with ID: %s", user_id)
+            raise ValueError("User not found")
+
+        current_mood = (await db.execute(
+            select(DailyMood.notes, Moods.name.label("mood_name")).join(
+                Moods, DailyMood.mood_level == Moods.id
+            ).where(
+                DailyMood.user_id == user_id,
+                DailyMood.date == func.current_date()
+            )
+        )).first()
+
+        if not current_mood:
+            logger.error("Current mood not found for user ID: %s", user_id)
+            raise ValueError("Current mood not found for the user")
+
+        user_collection = (await db.execute(
+            select(UserCollection.user_condition_summary).where(
+                UserCollection.user_id == user_id
+            )
+        )).first()
+
+        data['user_name'] = user.full_name if user else None
+        data['current_mood'] = current_mood.mood_name
+        data['notes'] = current_mood.notes if current_mood.notes else None
+        data['user_condition_summary'] = user_collection.user_condition_summary if user_collection else None
+
+        logger.info("Sending chat request for user: %s with mood: %s", user_id, data.get('current_mood'))
+        # Return the connection to the pool while waiting for the LLM, the updates open a new transaction
+        await db.commit()
+        with track("llm"):
+            response = await run_in_threadpool(chat_azure.chat, data)
+
+        if not response:
+            logger.error("Chat failed to get a response for user ID: %s", user_id)
+            raise ValueError("Chat failed to get a response")
+
+        await db.execute(
+            update(DailyMood).where(
+                DailyMood.user_id == user_id,
+                DailyMood.date == func.current_date()
+            ).values(notes=response.summary).execution_options(synchronize_session=False)
+        )
+        await db.execute(
+            update(UserCollection).where(
+                UserCollection.user_id == user_id
+            ).values(user_condition_summary=response.summary).execution_options(synchronize_session=False)
+        )
+        await db.commit()
+
+        logger.info("Chat successful for user ID: %s", user_id)
+        return response
+    except Exception as e:
+        await db.rollback()
+        logger.exception("Error in chat function: %s", e)
+        raise ValueError("Chat failed due to an error") from e
@@ -0,0 +1,127 @@
+"""
+Streaming export of the data of a user.
+
+Rows are read with server side cursors (``yield_per``) and serialized one
+partition at a time, so memory use does not depend on the size of the
+history. The response body is produced while the rows are fetched and can
+be compressed with zstd on the fly.
+"""
+import csv
+import io
+import json
+from datetime import date
+from typing import AsyncIterator, List, Optional
+from uuid import UUID
+from sqlalchemy import select
+import zstandard
+from database.models import DailyMood, Moods, QuizAttempt, AttemptAnswer
+from database.replica import read_session
+from logging_config import logger
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_COMPRESSIONS = ("zstd",)
+# Rows fetched per round trip of the server side cursor
+EXPORT_BATCH_SIZE = 1000
+
+
+def _export_queries(user_id: UUID) -> dict:
+    return {
+        "daily_moods": select(
+            DailyMood.id, DailyMood.date, Moods.name.label("mood"), DailyMood.notes, DailyMood.created_at
+        ).outerjoin(Moods, Moods.id == DailyMood.mood_level).where(
+            DailyMood.user_id == user_id
+        ).order_by(DailyMood.date),
+        "quiz_attempts": select(
+            QuizAttempt.id, QuizAttempt.quiz_id, QuizAttempt.attempted_at, QuizAttempt.completed_at,
+            QuizAttempt.is_completed, QuizAttempt.score, QuizAttempt.points_earned
+        ).where(QuizAttempt.user_id == user_id).order_by(QuizAttempt.attempted_at, QuizAttempt.id),
+        "attempt_answers": select(
+            AttemptAnswer.id, AttemptAnswer.attempt_id, AttemptAnswer.question_id,
+            AttemptAnswer.user_answer, AttemptAnswer.is_correct
+        ).join(QuizAttempt, QuizAttempt.id == AttemptAnswer.attempt_id).where(
+            QuizAttempt.user_id == user_id
+        ).order_by(AttemptAnswer.attempt_id, AttemptAnswer.id),
+    }
+
+
+EXPORT_TABLES = tuple(_export_queries(None))
+
+
+def _csv_value(value):
+    if isinstance(value, (list, dict)):
+        return json.dumps(value)
+    return value
+
+
+def _serialize_ndjson(table: str, rows) -> bytes:
+    return "".join(
+        json.dumps({"table": table, **row._asdict()}, default=str, separators=(",", ":")) + "\n" for row in rows
+    ).encode()
+
+
+def _serialize_csv(rows, header: Optional[List[str]] = None) -> bytes:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(header)
+    writer.writerows([_csv_value(value) for value in row] for row in rows)
+    return buffer.getvalue().encode()
+
+
+def prepare_export(user_id: UUID, export_format: str, tables: Optional[List[str]], compression: Optional[str]) -> dict:
+    """
+    Validate an export request and build its streamed body.
+
+    NDJSON exports any set of tables, every line carries its ``table``. CSV exports exactly one table.
+
+    :param user_id: ID of the user
+    :param export_format: ``ndjson`` or ``csv``
+    :param tables: Tables to export, all of them when empty
+    :param compression: ``zstd`` or None
+    :return: Body iterator, media type and file name of the export
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format, use one of {', '.join(EXPORT_FORMATS)}")
+    if compression is not None and compression not in EXPORT_COMPRESSIONS:
+        raise ValueError(f"Unsupported compression, use one of {', '.join(EXPORT_COMPRESSIONS)}")
+    tables = list(dict.fromkeys(tables or EXPORT_TABLES))
+    unknown = [table for table in tables if table not in EXPORT_TABLES]
+    if unknown:
+        raise ValueError(f"Unknown tables: {', '.join(unknown)}")
+    if export_format == "csv" and len(tables) != 1:
+        raise ValueError("CSV exports exactly one table")
+
+    file_name = f"export-{tables[0] if len(tables) == 1 else 'all'}-{date.today().isoformat()}.{export_format}"
+    media_type = EXPORT_FORMATS[export_format]
+    body = _stream_rows(user_id, export_format, tables)
+    if compression == "zstd":
+        body = _zstd(body)
+        file_name += ".zst"
+        media_type = "application/zstd"
+    return {"body": body, "media_type": media_type, "file_name": file_name}
+
+
+async def _stream_rows(user_id: UUID, export_format: str, tables: List[str]) -> AsyncIterator[bytes]:
+    # The session is opened here and not taken from the request dependency,
+    # which is already closed when the streaming response starts
+    queries = _export_queries(user_id)
+    exported = 0
+    async with read_session() as db:
+        for table in tables:
+            result = await db.stream(queries[table].execution_options(yield_per=EXPORT_BATCH_SIZE))
+            header = list(result.keys()) if export_format == "csv" else None
+            if header:
+                yield _serialize_csv([], header)
+            async for rows in result.partitions():
+                exported += len(rows)
+                yield _serialize_ndjson(table, rows) if export_format == "ndjson" else _serialize_csv(rows)
+    logger.info("Exported %s rows of %s for user %s", exported, ', '.join(tables), user_id)
+
+
+async def _zstd(body: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    compressor = zstandard.ZstdCompressor(level=3).compressobj()
+    async for chunk in body:
+        compressed = compressor.compress(chunk)
+        if compressed:
+            yield compressed
+    yield compressor.flush()
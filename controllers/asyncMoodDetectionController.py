@@ -0,0 +1,217 @@
+from uuid import UUID
+from datetime import date, timedelta
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.models import DailyMood, Moods, func
+from database.dashboards import record_mood_statement
+from schemas.moodDetectionSchemas import FaceDetectionRequest, MoodHistoryItem, MoodHistoryResponse, MoodStreak, WeeklyMood, MoodTrendsResponse
+from logging_config import logger
+from settings import settings
+from utils.pagination import decode_cursor, split_page
+from utils.moodTrends import compute_mood_trends
+from utils.metrics import track
+from utils.httpClient import open_client
+
+MAX_TREND_DAYS = 3660
+
+# Mood IDs and names by ID, the moods table is static
+_moods: dict = {}
+
+def _inference_headers() -> dict:
+    """
+    Build the headers for the mood classifier service.
+    """
+    api_key = settings.MOOD_CLASSIFIER_API_KEY
+    return {
+        "Content-Type": "application/json",
+        "Accept": "application/json",
+        "Authorization": f"Bearer {api_key}"
+    }
+
+async def _request_inference(data: FaceDetectionRequest) -> dict:
+    """
+    Send the face image to the mood classifier service without blocking the event loop.
+
+    :param data: Data to be sent for mood inference
+    :return: Raw response of the mood classifier
+    """
+    with track("classifier"):
+        response = await open_client().post(settings.MOOD_CLASSIFIER_URL, json=data.model_dump(), headers=_inference_headers())
+    response.raise_for_status()
+    return response.json()
+
+async def mood_inference(db: AsyncSession, user_id: UUID, data: FaceDetectionRequest) -> dict:
+    """
+    Perform mood inference for a user based on the provided data.
+    :param db: SQLAlchemy async session object
+    :param user_id: ID of the user for whom mood inference is to be performed
+    :param data: Data to be sent for mood inference
+    :return: Mood inference result
+    """
+
+    logger.info("User ID: %s - Processing mood inference request", user_id)
+    logger.info("Checking if mood for today has already been recorded")
+    check_mood_current_date = (await db.execute(
+        select(DailyMood.id).where(
+            DailyMood.user_id == user_id,
+            DailyMood.date == func.current_date()
+        )
+    )).first()
+    if check_mood_current_date:
+        logger.warning("Mood for user %s on current date already exists", user_id)
+        raise ValueError("Mood for today has already been recorded")
+    # Return the connection to the pool while waiting for the classifier, the writes open a new transaction
+    await db.commit()
+
+    try:
+        logger.info("Sending data for mood inference for user %s", user_id)
+        result = await _request_inference(data)
+
+        if result.get("prediction") is not None:
+            mood_level = result["prediction"]
+            mood = (await db.execute(
+                select(Moods.id, Moods.name).where(Moods.name == mood_level.capitalize())
+            )).first()
+            if mood is None:
+                raise ValueError("Mood level not found in the database")
+            daily_mood = DailyMood(
+                user_id=user_id,
+                date=func.current_date(),
+                mood_level=mood.id,
+                notes=None
+            )
+            db.add(daily_mood)
+            # Keep the dashboard summary in the same transaction as the mood
+            await db.execute(record_mood_statement(user_id, mood.name))
+            await db.commit()
+            return result
+        else:
+            logger.error("Invalid response from mood inference service")
+            raise ValueError("Invalid response from mood inference service")
+    except Exception as e:
+        await db.rollback()
+        logger.error("Failed to perform mood inference: %s", e)
+        raise ValueError(f"Failed to perform mood inference")
+
+
+async def mood_inference_trial(db: AsyncSession, data: FaceDetectionRequest) -> dict:
+    """
+    Perform mood inference for a user based on the provided data.
+    :param db: SQLAlchemy async session object
+    :param data: Data to be sent for mood inference
+    :return: Mood inference result
+    """
+    try:
+        logger.info("Sending data for mood inference trial")
+        result = await _request_inference(data)
+        if result.get("prediction") is not None:
+            return result
+        else:
+            logger.error("Invalid response from mood inference service")
+            raise ValueError("Invalid response from mood inference service")
+    except Exception as e:
+        logger.error("Failed to perform mood inference trial: %s", e)
+        raise ValueError("Failed to perform mood inference") from e
+
+
+async def get_mood_history(db: AsyncSession, user_id: UUID, limit: int, cursor: Optional[str] = None) -> MoodHistoryResponse:
+    """
+    List the recorded moods of a user, newest first, with keyset pagination on ``date``.
+
+    A user has at most one mood per day, so the date alone is a unique sort key.
+
+    :param db: SQLAlchemy async session object
+    :param user_id: ID of the user
+    :param limit: Page size
+    :param cursor: Cursor of the page to fetch, None for the first page
+    :return: Page of moods and the cursor of the next page
+    """
+    logger.info("Retrieving mood history for user %s", user_id)
+    query = select(DailyMood.date, Moods.name, DailyMood.notes).join(
+        Moods, Moods.id == DailyMood.mood_level
+    ).where(DailyMood.user_id == user_id)
+    if cursor:
+        before, = decode_cursor(cursor, date.fromisoformat)
+        query = query.where(DailyMood.date < before)
+    rows = (await db.execute(
+        query.order_by(DailyMood.date.desc()).limit(limit + 1)
+    )).all()
+    page, next_cursor = split_page(rows, limit, lambda row: (row.date,))
+    return MoodHistoryResponse(
+        items=[MoodHistoryItem(date=row.date, mood=row.name, notes=row.notes) for row in page],
+        next_cursor=next_cursor
+    )
+
+
+async def _load_moods(db: AsyncSession) -> dict:
+    if not _moods:
+        rows = (await db.execute(select(Moods.id, Moods.name).order_by(Moods.id))).all()
+        _moods.update({row.id: row.name for row in rows})
+    return _moods
+
+
+async def get_mood_trends(db: AsyncSession, user_id: UUID, start: Optional[date] = None, end: Optional[date] = None, window: int = 7) -> MoodTrendsResponse:
+    """
+    Compute the mood trends of a user over a date range.
+
+    The moods are fetched as two arrays aggregated by Postgres (day offset and
+    mood level) and the statistics are computed with NumPy, see ``utils.moodTrends``.
+
+    :param db: SQLAlchemy async session object
+    :param user_id: ID of the user
+    :param start: First day of the range, defaults to 90 days before ``end``
+    :param end: Last day of the range, defaults to today
+    :param window: Length in days of the rolling distribution
+    :return: Daily series, rolling distribution, streaks and weekly changes
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=89)
+    if start > end:
+        raise ValueError("Start date must not be after the end date")
+    days = (end - start).days + 1
+    if days > MAX_TREND_DAYS:
+        raise ValueError("Date range must not exceed ten years")
+    logger.info("Computing mood trends from %s to %s for user %s", start, end, user_id)
+    moods = await _load_moods(db)
+    columns = (await db.execute(
+        select(
+            func.array_agg(DailyMood.date - start),
+            func.array_agg(DailyMood.mood_level)
+        ).where(
+            DailyMood.user_id == user_id,
+            DailyMood.date.between(start, end),
+            DailyMood.mood_level.isnot(None)
+        )
+    )).first()
+    offsets, levels = columns[0] or [], columns[1] or []
+    mood_ids = list(moods)
+    names = [moods[mood_id] for mood_id in mood_ids]
+    trends = compute_mood_trends(offsets, levels, days, mood_ids, window=window, first_weekday=start.weekday())
+
+    def day(offset: int) -> date:
+        return start + timedelta(days=int(offset))
+
+    week_origin = start - timedelta(days=start.weekday())
+    current = trends.current_streak
+    return MoodTrendsResponse(
+        start=start,
+        end=end,
+        window_days=window,
+        totals=dict(zip(names, trends.totals.tolist())),
+        daily=[names[column] if column >= 0 else None for column in trends.daily.tolist()],
+        rolling={name: trends.rolling[:, index].tolist() for index, name in enumerate(names)},
+        longest_streaks=[
+            MoodStreak(mood=name, length=int(length), end=day(last))
+            for name, length, last in zip(names, trends.longest_streak, trends.longest_streak_end) if length
+        ],
+        current_streak=MoodStreak(mood=names[current[0]], length=current[1], end=day(current[2])) if current else None,
+        weekly=[
+            WeeklyMood(
+                week_start=max(week_origin + timedelta(weeks=index), start),
+                counts=dict(zip(names, counts)),
+                change=dict(zip(names, change)),
+                dominant=names[counts.index(max(counts))] if any(counts) else None
+            ) for index, (counts, change) in enumerate(zip(trends.weekly.tolist(), trends.weekly_change.tolist()))
+        ]
+    )
@@ -0,0 +1,85 @@
+"""
+Bulk provisioning of user accounts, e.g. the cohort of a partner organization.
+
+The usernames already taken are found with one query, the passwords are
+hashed in parallel worker processes, the accounts are loaded with ``COPY``
+into a temporary staging table and created from it by one statement, all
+in a single transaction. Each account gets its own result, so a taken
+username only rejects that account.
+"""
+from uuid import uuid4
+from typing import List
+from sqlalchemy import select, text, bindparam, any_
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import String
+from database.models import UserAuth
+from database.users import STAGING_DDL, staging_users, create_staged_users_statement
+from schemas.usersSchema import CreateUserRequest, BulkProvisionResponse, ProvisionResult
+from utils.passwordHashing import hash_passwords
+from logging_config import logger
+
+async def provision_users(db: AsyncSession, accounts: List[CreateUserRequest]) -> BulkProvisionResponse:
+    """
+    Create many user accounts at once.
+
+    :param db: SQLAlchemy async session object, bound to the asyncpg engine
+    :param accounts: Accounts to create
+    :return: Result of every account
+    """
+    results = [None] * len(accounts)
+    first_index = {}
+    for index, account in enumerate(accounts):
+        if account.username in first_index:
+            results[index] = ProvisionResult(
+                index=index, username=account.username, status="duplicate_in_batch",
+                detail=f"Same username as account {first_index[account.username]}"
+            )
+        else:
+            first_index[account.username] = index
+
+    taken = set((await db.execute(
+        select(UserAuth.username).where(
+            UserAuth.username == any_(bindparam("usernames", list(first_index), type_=ARRAY(String)))
+        )
+    )).scalars())
+    pending = []
+    for username, index in first_index.items():
+        if username in taken:
+            results[index] = ProvisionResult(index=index, username=username, status="username_exists")
+        else:
+            pending.append(index)
+
+    try:
+        if pending:
+            logger.info("Hashing %s passwords for bulk provisioning", len(pending))
+            hashes = await hash_passwords([accounts[index].password for index in pending])
+            ids = {index: uuid4() for index in pending}
+            await db.execute(text(STAGING_DDL))
+            connection = await db.connection()
+            driver_connection = (await connection.get_raw_connection()).driver_connection
+            await driver_connection.copy_records_to_table(
+                staging_users.name,
+                columns=[column.name for column in staging_users.columns],
+                records=[
+                    (ids[index], accounts[index].full_name, accounts[index].age, accounts[index].username, password_hash)
+                    for index, password_hash in zip(pending, hashes)
+                ]
+            )
+            created = {row.username: row.user_id for row in await db.execute(create_staged_users_statement())}
+            await db.commit()
+            for index in pending:
+                username = accounts[index].username
+                if username in created:
+                    results[index] = ProvisionResult(index=index, username=username, status="created", user_id=created[username])
+                else:
+                    # Registered by someone else between the check and the insert
+                    results[index] = ProvisionResult(index=index, username=username, status="username_exists")
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error provisioning users: %s", e)
+        raise ValueError("Failed to provision users") from e
+
+    created_count = sum(result.status == "created" for result in results)
+    logger.info("Bulk provisioning created %s of %s accounts", created_count, len(accounts))
+    return BulkProvisionResponse(created=created_count, conflicts=len(accounts) - created_count, results=results)
@@ -0,0 +1,493 @@
+from uuid import UUID, uuid4
+from datetime import date, datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import select, update, insert, tuple_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.concurrency import run_in_threadpool
+from database.models import Quiz, QuizAttempt, AttemptAnswer, UserCollection, DailyScore, func
+from database.grading import grade_attempt_statement
+from database.questionCache import get_questions, cache_questions
+from database.quizPersistence import build_quiz_rows, insert_quizzes
+from logging_config import logger
+from utils.pagination import decode_cursor, split_page
+from utils.leaderboard import leaderboard
+from utils.metrics import track
+from schemas.quizSchemas import *
+from nodes.quizAiAgent import quiz_agent
+
+async def generate_quiz(db: AsyncSession, quiz_data: QuizGeneratedRequest, user_id: UUID) -> QuizGeneratedResponse:
+    """
+    Generate a quiz based on the provided data and save it to the database.
+
+    :param db: SQLAlchemy async session object
+    :param quiz_data: Data for the quiz generation
+    :param user_id: ID of the user for whom the quiz is being generated
+    :return: Generated quiz response
+    """
+    try:
+        quiz_data = quiz_data.model_dump()
+        logger.info("Generating %s quiz (%s) for user %s", quiz_data.get("theme"), quiz_data.get("difficulty"), user_id)
+        if quiz_data.get("theme") == "mental_health":
+            user_condition_summary = (await db.execute(
+                select(UserCollection).where(
+                    UserCollection.user_id == user_id,
+                    UserCollection.user_condition_summary.isnot(None)
+                )
+            )).scalars().first()
+        else:
+            user_condition_summary = None
+        # Return the connection to the pool while the agent runs, the inserts open a new transaction
+        await db.commit()
+        # The LangGraph agent is blocking, run it in the threadpool
+        with track("llm"):
+            quiz_generated = await run_in_threadpool(
+                quiz_agent.generate_quiz,
+                quiz_data.get("theme"),
+                quiz_data.get("difficulty"),
+                user_condition_summary,
+                total_questions=5
+            )
+        if not quiz_generated:
+            logger.error("Quiz generation failed, no data returned from AI agent")
+            raise ValueError("Quiz generation failed, no data returned from AI agent")
+        # Quiz and questions are written in one transaction with client side IDs
+        quiz, questions = build_quiz_rows(user_id, quiz_generated)
+        await insert_quizzes(db, [(quiz, questions)])
+        await db.commit()
+        cache_questions(quiz["id"], questions)
+        response = QuizGeneratedResponse(
+            quiz_id=quiz["id"],
+            title=quiz["title"],
+            description=quiz["description"]
+        )
+        logger.info("Quiz %s with %s questions generated and saved successfully for user %s", quiz['id'], len(questions), user_id)
+        return response
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error generating quiz: %s", e)
+        raise ValueError("Failed to generate quiz") from e
+
+async def attempt_quiz(db: AsyncSession, quiz_id: UUID, user_id: UUID) -> QuizAttemptResponse:
+    """
+    Create a quiz attempt for a given quiz and user.
+
+    :param db: SQLAlchemy async session object
+    :param quiz_id: ID of the quiz
+    :param user_id: ID of the user
+    """
+    try:
+        logger.info("Creating quiz attempt for quiz %s and user %s", quiz_id, user_id)
+        questions = await get_questions(db, quiz_id)
+        if not questions:
+            logger.error("No questions found for quiz %s", quiz_id)
+            raise ValueError("No questions found for the quiz")
+
+        quiz_attempt = (await db.execute(
+            insert(QuizAttempt).values(
+                quiz_id=quiz_id,
+                user_id=user_id
+            ).returning(QuizAttempt.id, QuizAttempt.expired_at)
+        )).first()
+        await db.commit()
+        logger.info("Quiz attempt %s created successfully for user %s", quiz_attempt.id, user_id)
+        response = QuizAttemptResponse(
+            quiz_attempt_id=quiz_attempt.id,
+            quiz_id=quiz_id,
+            questions=[{
+                "question_id": question.id,
+                "question_text": question.question_text,
+                "possible_answers": question.possible_answers,
+                "question_type": question.question_type
+            } for question in questions],
+            expired_at=quiz_attempt.expired_at.strftime("%Y-%m-%d %H:%M:%S")
+        )
+        return response
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error creating quiz attempt: %s", e)
+        raise ValueError("Failed to create quiz attempt") from e
+
+async def get_quiz_attempt_id(db: AsyncSession, user_id: UUID) -> Optional[dict]:
+    """
+    Retrieve the latest quiz attempt ID for a user.
+
+    :param db: SQLAlchemy async session object
+    :param user_id: ID of the user
+    :return: QuizAttempt ID if found, else None
+    """
+    try:
+        logger.info("Retrieving latest quiz attempt for user %s", user_id)
+        quiz_attempt = (await db.execute(
+            select(QuizAttempt.id).where(
+                QuizAttempt.user_id == user_id,
+                QuizAttempt.expired_at > func.now()
+            ).order_by(QuizAttempt.attempted_at.desc()).limit(1)
+        )).first()
+
+        if not quiz_attempt:
+            logger.warning("No active quiz attempt found for user %s", user_id)
+            return None
+
+        logger.info("Latest quiz attempt ID %s retrieved for user %s", quiz_attempt.id, user_id)
+        response = {
+            "quiz_attempt_id": quiz_attempt.id
+        }
+        return response
+    except Exception as e:
+        logger.error("Error retrieving quiz attempt ID: %s", e)
+        raise ValueError("Failed to retrieve quiz attempt ID") from e
+
+async def get_quiz_questions(db: AsyncSession, quiz_attempt_id: UUID, user_id: UUID) -> CheckQuizAttemptQuestion:
+    """
+    Retrieve questions for a quiz attempt.
+
+    :param db: SQLAlchemy async session object
+    :param quiz_attempt_id: ID of the quiz attempt
+    :param user_id: ID of the user
+    :return: List of questions for the quiz attempt
+    """
+    try:
+        logger.info("Retrieving questions for quiz attempt %s by user %s", quiz_attempt_id, user_id)
+        quiz_attempt = (await db.execute(
+            select(QuizAttempt.quiz_id, QuizAttempt.expired_at).where(
+                QuizAttempt.id == quiz_attempt_id,
+                QuizAttempt.user_id == user_id,
+                QuizAttempt.expired_at > func.now()
+            )
+        )).first()
+        if not quiz_attempt:
+            logger.error("Quiz attempt %s not found for user %s", quiz_attempt_id, user_id)
+            raise ValueError("Quiz attempt not found for the user or has expired")
+
+        questions = await get_questions(db, quiz_attempt.quiz_id)
+        if not questions:
+            logger.error("No questions found for quiz attempt %s", quiz_attempt_id)
+            raise ValueError("No questions found for the quiz attempt")
+
+        response = CheckQuizAttemptQuestion(
+            questions=[{
+                "question_id": question.id,
+                "question_text": question.question_text,
+                "possible_answers": question.possible_answers,
+                "question_type": question.question_type
+            } for question in questions],
+            expired_at=quiz_attempt.expired_at.strftime("%Y-%m-%d %H:%M:%S")
+        )
+        logger.info("Questions retrieved successfully for quiz attempt %s by user %s", quiz_attempt_id, user_id)
+        return response
+    except Exception as e:
+        logger.error("Error retrieving quiz questions: %s", e)
+        raise ValueError("Failed to retrieve quiz questions") from e
+
+async def _attempt_questions(db: AsyncSession, quiz_attempt_id: UUID, user_id: UUID) -> dict:
+    """
+    Load the question types of an active attempt, the questions come from the question cache.
+
+    :param db: SQLAlchemy async session object
+    :param quiz_attempt_id: ID of the quiz attempt
+    :param user_id: ID of the user
+    :return: Question type by question ID, empty if the attempt is not active
+    """
+    quiz_attempt = (await db.execute(
+        select(QuizAttempt.quiz_id).where(
+            QuizAttempt.id == quiz_attempt_id,
+            QuizAttempt.user_id == user_id,
+            QuizAttempt.expired_at > func.now(),
+            QuizAttempt.is_completed == False
+        )
+    )).first()
+    if not quiz_attempt:
+        return {}
+    return {question.id: question.question_type for question in await get_questions(db, quiz_attempt.quiz_id)}
+
+async def _upsert_answers(db: AsyncSession, quiz_attempt_id: UUID, user_id: UUID, answers: List[BatchAnswerItem]) -> dict:
+    """
+    Validate answers against the attempt's questions and write them with a single upsert.
+
+    :param db: SQLAlchemy async session object
+    :param quiz_attempt_id: ID of the quiz attempt
+    :param user_id: ID of the user
+    :param answers: Answers to write, at most one per question
+    :return: Attempt answer ID by question ID
+    """
+    question_types = await _attempt_questions(db, quiz_attempt_id, user_id)
+    if not question_types:
+        logger.error("Quiz attempt %s not found or has expired for user %s", quiz_attempt_id, user_id)
+        raise ValueError("Quiz attempt not found or has expired")
+    seen = set()
+    for answer in answers:
+        if answer.question_id in seen:
+            logger.error("Question %s answered twice in quiz attempt %s", answer.question_id, quiz_attempt_id)
+            raise ValueError("Each question can only be answered once per submission")
+        seen.add(answer.question_id)
+        question_type = question_types.get(answer.question_id)
+        if question_type is None:
+            logger.error("Question %s not found for quiz attempt %s", answer.question_id, quiz_attempt_id)
+            raise ValueError("Question not found for the quiz attempt")
+        if question_type == "multiple_choice" and len(answer.user_answers or []) > 1:
+            logger.error("Invalid number of answers for question %s in quiz attempt %s", answer.question_id, quiz_attempt_id)
+            raise ValueError("Invalid number of answers for the question")
+
+    statement = pg_insert(AttemptAnswer).values([
+        {
+            "id": uuid4(),
+            "attempt_id": quiz_attempt_id,
+            "question_id": answer.question_id,
+            "user_answer": answer.user_answers or [],
+        } for answer in answers
+    ])
+    statement = statement.on_conflict_do_update(
+        index_elements=[AttemptAnswer.attempt_id, AttemptAnswer.question_id],
+        set_={"user_answer": statement.excluded.user_answer}
+    ).returning(AttemptAnswer.id, AttemptAnswer.question_id)
+    rows = (await db.execute(statement)).all()
+    await db.commit()
+    return {row.question_id: row.id for row in rows}
+
+async def attempt_quiz_answer(db: AsyncSession, quiz_attempt_id: UUID, user_id: UUID, question_id: UUID, answers: AttemptQuizAnswerRequest) -> AttemptQuizAnswerResponse:
+    """
+    Submit answers for a quiz attempt by one question.
+
+    :param db: SQLAlchemy async session object
+    :param quiz_attempt_id: ID of the quiz attempt
+    :param user_id: ID of the user
+    :param question_id: ID of the answered question
+    :param answers: List of answers for the quiz attempt
+    """
+    try:
+        logger.info("Submitting answers for quiz attempt %s by user %s", quiz_attempt_id, user_id)
+        answer_ids = await _upsert_answers(db, quiz_attempt_id, user_id, [
+            BatchAnswerItem(question_id=question_id, user_answers=answers.user_answers)
+        ])
+        logger.info("Answers submitted successfully for quiz attempt %s by user %s", quiz_attempt_id, user_id)
+        response = AttemptQuizAnswerResponse(
+            message="Answers submitted successfully",
+            attempt_answer_id=answer_ids[question_id]
+        )
+        return response
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error submitting answers for quiz attempt: %s", e)
+        raise ValueError("Failed to submit answers for quiz attempt") from e
+
+async def attempt_quiz_answers(db: AsyncSession, quiz_attempt_id: UUID, user_id: UUID, data: BatchAttemptQuizAnswerRequest) -> BatchAttemptQuizAnswerResponse:
+    """
+    Submit the answers of several questions of a quiz attempt at once.
+
+    :param db: SQLAlchemy async session object
+    :param quiz_attempt_id: ID of the quiz attempt
+    :param user_id: ID of the user
+    :param data: Answers of the questions
+    :return: Attempt answer ID of each submitted question
+    """
+    try:
+        logger.info("Submitting %s answers for quiz attempt %s by user %s", len(data.answers), quiz_attempt_id, user_id)
+        answer_ids = await _upsert_answers(db, quiz_attempt_id, user_id, data.answers)
+        logger.info("Answers submitted successfully for quiz attempt %s by user %s", quiz_attempt_id, user_id)
+        return BatchAttemptQuizAnswerResponse(
+            message="Answers submitted successfully",
+            answers=[
+                SubmittedAnswer(question_id=question_id, attempt_answer_id=attempt_answer_id)
+                for question_id, attempt_answer_id in answer_ids.items()
+            ]
+        )
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error submitting answers for quiz attempt: %s", e)
+        raise ValueError("Failed to submit answers for quiz attempt") from e
+
+async def get_answer_by_quiz_attempt_question_id(db: AsyncSession, quiz_attempt_id: UUID, question_id: UUID, user_id: UUID) -> dict:
+    """
+    Retrieve answers for a specific question in a quiz attempt.
+    :param db: SQLAlchemy async session object
+    :param quiz_attempt_id: ID of the quiz attempt
+    :param question_id: ID of the question
+    :param user_id: ID of the user
+    :return: List of answers for the specified question in the quiz attempt
+    """
+    try:
+        logger.info("Retrieving answers for question %s in quiz attempt %s by user %s", question_id, quiz_attempt_id, user_id)
+        answers = (await db.execute(
+            select(AttemptAnswer.id, AttemptAnswer.user_answer).where(
+                AttemptAnswer.attempt_id == quiz_attempt_id,
+                AttemptAnswer.question_id == question_id
+            )
+        )).first()
+
+        if not answers:
+            logger.error("No answers found for question %s in quiz attempt %s", question_id, quiz_attempt_id)
+            raise ValueError("No answers found for the question")
+        response = {"attempt_answer_id": answers.id, "user_answer": answers.user_answer}
+        logger.info("Answers retrieved successfully for question %s in quiz attempt %s by user %s", question_id, quiz_attempt_id, user_id)
+        return response
+    except Exception as e:
+        logger.error("Error retrieving question answers: %s", e)
+        raise ValueError("Failed to retrieve question answers") from e
+
+async def get_answer_by_answer_id(db: AsyncSession, answer_id: UUID, user_id: UUID) -> dict:
+    """
+    Retrieve an answer by its ID for a specific user.
+
+    :param db: SQLAlchemy async session object
+    :param answer_id: ID of the answer
+    :param user_id: ID of the user
+    :return: Answer of the user if found
+    """
+    try:
+        logger.info("Retrieving answer with ID %s for user %s", answer_id, user_id)
+        answer = (await db.execute(
+            select(AttemptAnswer.user_answer).where(
+                AttemptAnswer.id == answer_id
+            )
+        )).first()
+
+        if not answer:
+            logger.error("Answer with ID %s not found for user %s", answer_id, user_id)
+            raise ValueError("Answer not found")
+        response = {
+            "attempt_answer_id": answer_id,
+            "user_answer": answer.user_answer
+        }
+        logger.info("Answer retrieved successfully for user %s", user_id)
+        return response
+    except Exception as e:
+        logger.error("Error retrieving answer by ID: %s", e)
+        raise ValueError("Failed to retrieve answer by ID") from e
+
+async def evaluate_quiz(db: AsyncSession, quiz_attempt_id: UUID, user_id: UUID) -> QuizEvaluationResponse:
+    """
+    Evaluate a quiz attempt and return the score.
+
+    The answers are graded, the attempt completed and the user collection
+    updated by one set-based statement, see ``database.grading``.
+
+    :param db: SQLAlchemy async session object
+    :param quiz_attempt_id: ID of the quiz attempt
+    :param user_id: ID of the user
+    :return: QuizEvaluationResponse containing the score and evaluation details
+    """
+    try:
+        logger.info("Evaluating quiz attempt %s for user %s", quiz_attempt_id, user_id)
+        rows = (await db.execute(grade_attempt_statement(quiz_attempt_id, user_id))).all()
+        if not rows:
+            logger.error("Quiz attempt %s not found, already evaluated or has no answers for user %s", quiz_attempt_id, user_id)
+            raise ValueError("Quiz attempt not found, already evaluated or has no answers")
+        await db.commit()
+        leaderboard.update(UUID(str(user_id)), rows[0].total_points, rows[0].full_name)
+
+        answers = {row.question_id: row for row in rows if row.question_id is not None}
+        questions = await get_questions(db, rows[0].quiz_id)
+        evaluation_response = QuizEvaluationResponse(
+            quiz_attempt_id=quiz_attempt_id,
+            score=rows[0].score,
+            points_earned=rows[0].points_earned,
+            evaluation_details=[{
+                "question_id": question.id,
+                "question_text": question.question_text,
+                "possible_answers": question.possible_answers,
+                "user_answer": answers[question.id].user_answer if question.id in answers else [],
+                "correct_answer": question.correct_answer,
+                "is_correct": bool(answers[question.id].is_correct) if question.id in answers else False
+            } for question in questions]
+        )
+
+        logger.info("Quiz attempt %s evaluated successfully with score %s", quiz_attempt_id, evaluation_response.score)
+        return evaluation_response
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error evaluating quiz attempt: %s", e)
+        raise ValueError("Failed to evaluate quiz attempt") from e
+
+async def get_quiz_history(db: AsyncSession, user_id: UUID, limit: int, cursor: Optional[str] = None) -> QuizHistoryResponse:
+    """
+    List the quizzes generated for a user, newest first, with keyset pagination on ``(created_at, id)``.
+
+    :param db: SQLAlchemy async session object
+    :param user_id: ID of the user
+    :param limit: Page size
+    :param cursor: Cursor of the page to fetch, None for the first page
+    :return: Page of quizzes and the cursor of the next page
+    """
+    logger.info("Retrieving quiz history for user %s", user_id)
+    query = select(Quiz.id, Quiz.title, Quiz.description, Quiz.created_at).where(Quiz.generated_by_user_id == user_id)
+    if cursor:
+        query = query.where(tuple_(Quiz.created_at, Quiz.id) < decode_cursor(cursor, datetime.fromisoformat, UUID))
+    rows = (await db.execute(
+        query.order_by(Quiz.created_at.desc(), Quiz.id.desc()).limit(limit + 1)
+    )).all()
+    page, next_cursor = split_page(rows, limit, lambda row: (row.created_at, row.id))
+    return QuizHistoryResponse(
+        items=[QuizHistoryItem(
+            quiz_id=row.id,
+            title=row.title,
+            description=row.description,
+            created_at=row.created_at
+        ) for row in page],
+        next_cursor=next_cursor
+    )
+
+async def get_attempt_history(db: AsyncSession, user_id: UUID, limit: int, cursor: Optional[str] = None) -> AttemptHistoryResponse:
+    """
+    List the quiz attempts of a user with their scores, newest first, with keyset pagination on ``(attempted_at, id)``.
+
+    :param db: SQLAlchemy async session object
+    :param user_id: ID of the user
+    :param limit: Page size
+    :param cursor: Cursor of the page to fetch, None for the first page
+    :return: Page of attempts and the cursor of the next page
+    """
+    logger.info("Retrieving quiz attempt history for user %s", user_id)
+    query = select(
+        QuizAttempt.id, QuizAttempt.quiz_id, Quiz.title, QuizAttempt.attempted_at,
+        QuizAttempt.is_completed, QuizAttempt.score, QuizAttempt.points_earned
+    ).join(Quiz, Quiz.id == QuizAttempt.quiz_id).where(QuizAttempt.user_id == user_id)
+    if cursor:
+        query = query.where(
+            tuple_(QuizAttempt.attempted_at, QuizAttempt.id) < decode_cursor(cursor, datetime.fromisoformat, UUID)
+        )
+    rows = (await db.execute(
+        query.order_by(QuizAttempt.attempted_at.desc(), QuizAttempt.id.desc()).limit(limit + 1)
+    )).all()
+    page, next_cursor = split_page(rows, limit, lambda row: (row.attempted_at, row.id))
+    return AttemptHistoryResponse(
+        items=[AttemptHistoryItem(
+            quiz_attempt_id=row.id,
+            quiz_id=row.quiz_id,
+            quiz_title=row.title,
+            attempted_at=row.attempted_at,
+            is_completed=bool(row.is_completed),
+            score=row.score,
+            points_earned=row.points_earned
+        ) for row in page],
+        next_cursor=next_cursor
+    )
+
+async def get_daily_scores(db: AsyncSession, user_id: UUID, start: Optional[date] = None, end: Optional[date] = None) -> DailyScoreResponse:
+    """
+    Retrieve the daily quiz scores of a user from the ``daily_scores`` rollup.
+
+    :param db: SQLAlchemy async session object
+    :param user_id: ID of the user
+    :param start: First day of the range, defaults to 30 days before ``end``
+    :param end: Last day of the range, defaults to today
+    :return: Score of each day with a completed quiz in the range
+    """
+    end = end or date.today()
+    start = start or end - timedelta(days=29)
+    if start > end:
+        raise ValueError("Start date must not be after the end date")
+    if (end - start).days > 366:
+        raise ValueError("Date range must not exceed one year")
+    logger.info("Retrieving daily scores from %s to %s for user %s", start, end, user_id)
+    rows = (await db.execute(
+        select(DailyScore.date, DailyScore.score).where(
+            DailyScore.user_id == user_id,
+            DailyScore.date.between(start, end)
+        ).order_by(DailyScore.date)
+    )).all()
+    return DailyScoreResponse(
+        start=start,
+        end=end,
+        scores=[DailyScoreItem(date=row.date, score=row.score) for row in rows]
+    )
@@ -0,0 +1,105 @@
+from uuid import UUID, uuid4
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.models import UserAuth
+from database.users import create_user_statement
+from database.dashboards import fetch_dashboard_statement
+from schemas.usersSchema import CreateUserRequest, CreateUserResponse, FetchedInfoResponse, MonthlyMood
+from controllers.usersController import ActiveQuizAttemptError
+from utils.auth import create_access_token
+from utils.passwordHashing import HashingPoolBusyError, hash_password, verify_password
+from logging_config import logger
+
+async def create_users(db: AsyncSession, user_data: CreateUserRequest) -> CreateUserResponse:
+    """
+    Create a new user in the database.
+
+    :param db: SQLAlchemy async session object
+    :param user_data: User data to be created
+    :return: Created User object
+    :raises HashingPoolBusyError: If the password hashing pool is full
+    """
+    try:
+        logger.info("Attempting to create user with username: %s", user_data.username)
+        # bcrypt is CPU bound, it runs in the password hashing processes
+        hashed_password = await hash_password(user_data.password)
+        # One statement, a taken username is resolved by ON CONFLICT instead of a pre-check
+        created = (await db.execute(create_user_statement(
+            uuid4(), user_data.full_name, user_data.age, user_data.username, hashed_password
+        ))).first()
+        if created is None:
+            raise ValueError("Username already exists")
+        await db.commit()
+        response = CreateUserResponse(
+            id=created.user_id,
+            full_name=user_data.full_name,
+            username=created.username,
+            age=user_data.age
+        )
+        return response
+    except HashingPoolBusyError:
+        raise
+    except Exception as e:
+        await db.rollback()
+        logger.error("Error creating user: %s", e)
+        raise ValueError("Failed to create user") from e
+
+async def login_users(db: AsyncSession, username: str, password: str) -> str:
+    """
+    Log in a user by verifying the username and password.
+
+    :param db: SQLAlchemy async session object
+    :param username: Username of the user
+    :param password: Password of the user
+    :return: Access token if login is successful
+    :raises HashingPoolBusyError: If the password hashing pool is full
+    """
+    try:
+        logger.info("User login attempt with username: %s", username)
+        user_auth = (await db.execute(
+            select(UserAuth.user_id, UserAuth.username, UserAuth.password).where(UserAuth.username == username)
+        )).first()
+        if not user_auth:
+            raise ValueError("Invalid username or password")
+        is_valid, new_hash = await verify_password(password, user_auth.password)
+        if not is_valid:
+            raise ValueError("Invalid username or password")
+        if new_hash:
+            # The stored hash uses an outdated cost factor, replace it while the password is at hand
+            await db.execute(
+                update(UserAuth).where(UserAuth.user_id == user_auth.user_id).values(password=new_hash)
+            )
+            await db.commit()
+            logger.info("Password hash of user %s upgraded to the current cost factor", user_auth.user_id)
+        access_token = create_access_token(data={"user_id": str(user_auth.user_id), "username": user_auth.username})
+        return access_token
+    except HashingPoolBusyError:
+        raise
+    except Exception as e:
+        logger.error("Error during user login: %s", e)
+        raise ValueError("Login failed") from e
+
+async def fetch_user_info(db: AsyncSession, user_id: UUID) -> FetchedInfoResponse:
+    """
+    Fetch the dashboard information of a user from the ``user_dashboards`` summary in one query.
+
+    :param db: SQLAlchemy async session object
+    :param user_id: ID of the user
+    :return: User information including full name, age, and mood statistics
+    :raises ActiveQuizAttemptError: If the user still has an active quiz attempt
+    """
+    logger.info("Fetching user info for user ID: %s", user_id)
+    dashboard = (await db.execute(fetch_dashboard_statement(user_id))).first()
+    if dashboard is None:
+        raise ValueError("User not found")
+    if dashboard.active_quiz_attempt_id:
+        logger.warning("User has an active quiz attempt that is not completed.")
+        raise ActiveQuizAttemptError(dashboard.active_quiz_attempt_id)
+    return FetchedInfoResponse(
+        full_name=dashboard.full_name,
+        age=dashboard.age,
+        today_mood=dashboard.today_mood,
+        monthly_mood=MonthlyMood(**dashboard.monthly_mood),
+        score=dashboard.score,
+        point_earned=dashboard.point_earned
+    )
@@ -17,7 +17,7 @@ def chat_trial(db: Session, data: ChatTrialRequest) -> ChatAzureMentalCareRespon
     """
     try:
         data = data.model_dump()
-        logger.info(f"Sending chat trial request with message: {data.get('message')}...")
+        logger.info("Sending chat trial request with a %s character message", len(data.get('message') or ""))
         if len(data.get('message_history')) > 7:
             logger.warning("Chat trial message history exceeds 3 messages, truncating to last 3")
             raise ProcessLookupError("Chat trial message history exceeds 3 messages")
@@ -30,7 +30,7 @@ def chat_trial(db: Session, data: ChatTrialRequest) -> ChatAzureMentalCareRespon
         logger.info("Chat trial successful")
         return response
     except Exception as e:
-        logger.exception(f"Error in chat_trial function: {str(e)}")
+        logger.exception("Error in chat_trial function: %s", e)
         raise ValueError("Chat trial failed due to an error") from e
 
 def chat(db: Session, user_id: UUID, data: ChatRequest) -> ChatAzureMentalCareResponse:
@@ -46,7 +46,7 @@ def chat(db: Session, user_id: UUID, data: ChatRequest) -> ChatAzureMentalCareRe
         data = data.model_dump()
         user = db.query(User).filter(User.id == user_id).first()
         if not user:
-            logger.error(f"User not found with ID: {user_id}")
+            logger.error("User not found with ID: %s", user_id)
             raise ValueError("User not found")
         
         current_mood = db.query(DailyMood, Moods.name.label("mood_name")).join(
@@ -57,7 +57,7 @@ def chat(db: Session, user_id: UUID, data: ChatRequest) -> ChatAzureMentalCareRe
         ).first()._asdict()
 
         if not current_mood:
-            logger.error(f"Current mood not found for user ID: {user_id}")
+            logger.error("Current mood not found for user ID: %s", user_id)
             raise ValueError("Current mood not found for the user")
         
         user_collection = db.query(UserCollection).filter(
@@ -69,11 +69,11 @@ def chat(db: Session, user_id: UUID, data: ChatRequest) -> ChatAzureMentalCareRe
         data['notes'] = current_mood.get('notes') if current_mood.get('notes') else None
         data['user_condition_summary'] = user_collection.user_condition_summary if user_collection else None
         
-        logger.info(f"Sending chat request for user: {user_id} with mood: {data.get('current_mood')}")
+        logger.info("Sending chat request for user: %s with mood: %s", user_id, data.get('current_mood'))
         response = chat_azure.chat(data)
 
         if not response:
-            logger.error(f"Chat failed to get a response for user ID: {user_id}")
+            logger.error("Chat failed to get a response for user ID: %s", user_id)
             raise ValueError("Chat failed to get a response")
         
         db.query(DailyMood).filter(
@@ -93,8 +93,8 @@ def chat(db: Session, user_id: UUID, data: ChatRequest) -> ChatAzureMentalCareRe
         )
         db.commit()
 
-        logger.info(f"Chat successful for user ID: {user_id}")
+        logger.info("Chat successful for user ID: %s", user_id)
         return response
     except Exception as e:
-        logger.exception(f"Error in chat function: {str(e)}")
+        logger.exception("Error in chat function: %s", e)
         raise ValueError("Chat failed due to an error") from e
\ No newline at end of file
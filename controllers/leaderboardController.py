@@ -0,0 +1,39 @@
+from uuid import UUID
+from schemas.leaderboardSchemas import LeaderboardEntryResponse, LeaderboardResponse, MyRankResponse
+from utils.leaderboard import leaderboard
+from logging_config import logger
+
+def get_top(limit: int) -> LeaderboardResponse:
+    """
+    Get the users with the most points.
+
+    :param limit: Number of users to return
+    :return: Top of the leaderboard
+    """
+    if not leaderboard.loaded:
+        raise ValueError("Leaderboard is not loaded yet")
+    return LeaderboardResponse(
+        entries=[LeaderboardEntryResponse(**entry._asdict()) for entry in leaderboard.top(limit)],
+        total_users=len(leaderboard)
+    )
+
+def get_user_rank(user_id: UUID, radius: int) -> MyRankResponse:
+    """
+    Get the rank of a user with its neighbors on the leaderboard.
+
+    :param user_id: ID of the user
+    :param radius: Number of neighbors above and below the user
+    :return: Rank of the user and the surrounding entries
+    """
+    if not leaderboard.loaded:
+        raise ValueError("Leaderboard is not loaded yet")
+    logger.info("Retrieving leaderboard rank for user %s", user_id)
+    user_id = UUID(str(user_id))
+    entries = leaderboard.around(user_id, radius)
+    own = next((entry for entry in entries if entry.user_id == user_id), None)
+    return MyRankResponse(
+        rank=own.rank if own else None,
+        point_earned=own.point_earned if own else 0,
+        entries=[LeaderboardEntryResponse(**entry._asdict()) for entry in entries],
+        total_users=len(leaderboard)
+    )
@@ -1,14 +1,13 @@
 from uuid import UUID
 from typing import List, Optional
 from database.models import User, DailyMood, Moods, func
+from database.dashboards import record_mood_statement
 from schemas.moodDetectionSchemas import FaceDetectionRequest
 from sqlalchemy.orm import Session
-from dotenv import load_dotenv
-from os import getenv
 import requests
 import json
 from logging_config import logger
-load_dotenv()
+from settings import settings
 
 
 def mood_inference(db: Session, user_id: UUID, data:FaceDetectionRequest) -> str:
@@ -20,17 +19,17 @@ def mood_inference(db: Session, user_id: UUID, data:FaceDetectionRequest) -> str
     :return: Mood inference result as a string
     """
 
-    logger.info(f"User ID: {user_id} - Processing mood inference request")
+    logger.info("User ID: %s - Processing mood inference request", user_id)
     logger.info("Checking if mood for today has already been recorded")
     check_mood_current_date = db.query(DailyMood).filter(
         DailyMood.user_id == user_id,
         DailyMood.date == func.current_date()
     ).first()
     if check_mood_current_date:
-        logger.warning(f"Mood for user {user_id} on current date already exists")
+        logger.warning("Mood for user %s on current date already exists", user_id)
         raise ValueError("Mood for today has already been recorded")
-    inference_url = "https://moodclassifier.eastasia.inference.ml.azure.com/score"
-    api_key = getenv("MOOD_CLASSIFIER_API_KEY")
+    inference_url = settings.MOOD_CLASSIFIER_URL
+    api_key = settings.MOOD_CLASSIFIER_API_KEY
     headers = {
         "Content-Type": "application/json",
         "Accept": "application/json",
@@ -38,7 +37,7 @@ def mood_inference(db: Session, user_id: UUID, data:FaceDetectionRequest) -> str
     }
 
     try:
-        logger.info(f"Sending data for mood inference for user {user_id}")
+        logger.info("Sending data for mood inference for user %s", user_id)
         response = requests.post(inference_url, json=data.model_dump(), headers=headers)
         response.raise_for_status()
         result = response.json()
@@ -55,13 +54,15 @@ def mood_inference(db: Session, user_id: UUID, data:FaceDetectionRequest) -> str
                 notes=None
             )
             db.add(daily_mood)
+            # Same transaction as the daily mood, so the dashboard never misses a record
+            db.execute(record_mood_statement(user_id, mood.name))
             db.commit()
             return result
         else:
             logger.error("Invalid response from mood inference service")
             raise ValueError("Invalid response from mood inference service")
     except Exception as e:
-        logger.error(f"Failed to perform mood inference: {str(e)}")
+        logger.error("Failed to perform mood inference: %s", e)
         raise ValueError(f"Failed to perform mood inference")
 
 
@@ -72,8 +73,8 @@ def mood_inference_trial(db: Session, data: FaceDetectionRequest) -> str:
     :param data: Data to be sent for mood inference
     :return: Mood inference result as a string
     """
-    inference_url = "https://moodclassifier.eastasia.inference.ml.azure.com/score"
-    api_key = getenv("MOOD_CLASSIFIER_API_KEY")
+    inference_url = settings.MOOD_CLASSIFIER_URL
+    api_key = settings.MOOD_CLASSIFIER_API_KEY
     headers = {
         "Content-Type": "application/json",
         "Accept": "application/json",
@@ -81,7 +82,7 @@ def mood_inference_trial(db: Session, data: FaceDetectionRequest) -> str:
     }
 
     try:
-        logger.info(f"Sending data for mood inference trial")
+        logger.info("Sending data for mood inference trial")
         response = requests.post(inference_url, json=data.model_dump(), headers=headers)
         response.raise_for_status()
         result = response.json()
@@ -91,5 +92,5 @@ def mood_inference_trial(db: Session, data: FaceDetectionRequest) -> str:
             logger.error("Invalid response from mood inference service")
             raise ValueError("Invalid response from mood inference service")
     except Exception as e:
-        logger.error(f"Failed to perform mood inference trial: {str(e)}")
+        logger.error("Failed to perform mood inference trial: %s", e)
         raise ValueError("Failed to perform mood inference") from e
@@ -1,11 +1,13 @@
 from uuid import UUID
 from typing import List, Optional
 from database.models import Quiz, QuizAttempt, AttemptAnswer, UserCollection, Question, func
+from sqlalchemy import select
 from sqlalchemy.orm import Session
+from database.grading import grade_attempt_statement, grade_attempts_statement
 from logging_config import logger
 from schemas.quizSchemas import *
+from utils.leaderboard import leaderboard
 from nodes.quizAiAgent import quiz_agent
-from os import getenv
 
 def generate_quiz(db: Session, quiz_data: QuizGeneratedRequest, user_id: UUID):
     """
@@ -18,7 +20,7 @@ def generate_quiz(db: Session, quiz_data: QuizGeneratedRequest, user_id: UUID):
     """
     try:
         quiz_data = quiz_data.model_dump()
-        logger.info(f"Generating quiz with data: {quiz_data} for user {user_id}")
+        logger.info("Generating %s quiz (%s) for user %s", quiz_data.get("theme"), quiz_data.get("difficulty"), user_id)
         if quiz_data.get("theme") == "mental_health":
             user_condition_summary = db.query(UserCollection).filter(
                 UserCollection.user_id == user_id,
@@ -41,7 +43,7 @@ def generate_quiz(db: Session, quiz_data: QuizGeneratedRequest, user_id: UUID):
         db.add(quiz)
         db.commit()
         db.refresh(quiz)
-        logger.info(f"Quiz {quiz.id} generated successfully for user {user_id}")
+        logger.info("Quiz %s generated successfully for user %s", quiz.id, user_id)
         for question_data in quiz_generated.get("questions", []):
             question = Question(
                 quiz_id=quiz.id,
@@ -57,10 +59,10 @@ def generate_quiz(db: Session, quiz_data: QuizGeneratedRequest, user_id: UUID):
             title=quiz.title,
             description=quiz.description
         )
-        logger.info(f"Quiz {quiz.id} generated and saved successfully")
+        logger.info("Quiz %s generated and saved successfully", quiz.id)
         return response
     except Exception as e:
-        logger.error(f"Error generating quiz: {e}")
+        logger.error("Error generating quiz: %s", e)
         raise ValueError("Failed to generate quiz") from e
     
 def attempt_quiz(db: Session, quiz_id: UUID, user_id: UUID) -> QuizAttemptResponse:
@@ -72,10 +74,10 @@ def attempt_quiz(db: Session, quiz_id: UUID, user_id: UUID) -> QuizAttemptRespon
     :param user_id: ID of the user
     """
     try:
-        logger.info(f"Creating quiz attempt for quiz {quiz_id} and user {user_id}")
+        logger.info("Creating quiz attempt for quiz %s and user %s", quiz_id, user_id)
         questions = db.query(Question).filter(Question.quiz_id == quiz_id).all()
         if not questions:
-            logger.error(f"No questions found for quiz {quiz_id}")
+            logger.error("No questions found for quiz %s", quiz_id)
             raise ValueError("No questions found for the quiz")
         
         quiz_attempt = QuizAttempt(
@@ -85,7 +87,7 @@ def attempt_quiz(db: Session, quiz_id: UUID, user_id: UUID) -> QuizAttemptRespon
         db.add(quiz_attempt)
         db.commit()
         db.refresh(quiz_attempt)
-        logger.info(f"Quiz attempt {quiz_attempt.id} created successfully for user {user_id}")
+        logger.info("Quiz attempt %s created successfully for user %s", quiz_attempt.id, user_id)
         response = QuizAttemptResponse(
             quiz_attempt_id=quiz_attempt.id,
             quiz_id=quiz_id,
@@ -99,7 +101,7 @@ def attempt_quiz(db: Session, quiz_id: UUID, user_id: UUID) -> QuizAttemptRespon
         )
         return response
     except Exception as e:
-        logger.error(f"Error creating quiz attempt: {e}")
+        logger.error("Error creating quiz attempt: %s", e)
         raise ValueError("Failed to create quiz attempt") from e
     
 def get_quiz_attempt_id(db: Session, user_id: UUID) -> AttemptIdResponse:
@@ -111,23 +113,23 @@ def get_quiz_attempt_id(db: Session, user_id: UUID) -> AttemptIdResponse:
     :return: QuizAttempt ID if found, else None
     """
     try:
-        logger.info(f"Retrieving latest quiz attempt for user {user_id}")
+        logger.info("Retrieving latest quiz attempt for user %s", user_id)
         quiz_attempt = db.query(QuizAttempt).filter(
             QuizAttempt.user_id == user_id,
             QuizAttempt.expired_at > func.now()
         ).order_by(QuizAttempt.attempted_at.desc()).first()
         
         if not quiz_attempt:
-            logger.warning(f"No active quiz attempt found for user {user_id}")
+            logger.warning("No active quiz attempt found for user %s", user_id)
             return None
         
-        logger.info(f"Latest quiz attempt ID {quiz_attempt.id} retrieved for user {user_id}")
+        logger.info("Latest quiz attempt ID %s retrieved for user %s", quiz_attempt.id, user_id)
         response = {
             "quiz_attempt_id": quiz_attempt.id
         }
         return response
     except Exception as e:
-        logger.error(f"Error retrieving quiz attempt ID: {e}")
+        logger.error("Error retrieving quiz attempt ID: %s", e)
         raise ValueError("Failed to retrieve quiz attempt ID") from e
     
 def get_quiz_questions(db: Session, quiz_attempt_id: UUID, user_id: UUID) -> CheckQuizAttemptQuestion:
@@ -140,15 +142,15 @@ def get_quiz_questions(db: Session, quiz_attempt_id: UUID, user_id: UUID) -> Che
     :return: List of questions for the quiz attempt
     """
     try:
-        logger.info(f"Retrieving questions for quiz attempt {quiz_attempt_id} by user {user_id}")
+        logger.info("Retrieving questions for quiz attempt %s by user %s", quiz_attempt_id, user_id)
         quiz_attempt = db.query(QuizAttempt).filter(QuizAttempt.id == quiz_attempt_id, QuizAttempt.user_id == user_id, QuizAttempt.expired_at > func.now()).first()
         if not quiz_attempt:
-            logger.error(f"Quiz attempt {quiz_attempt_id} not found for user {user_id}")
+            logger.error("Quiz attempt %s not found for user %s", quiz_attempt_id, user_id)
             raise ValueError("Quiz attempt not found for the user or has expired")
         
         questions = db.query(Question).filter(Question.quiz_id == quiz_attempt.quiz_id).all()
         if not questions:
-            logger.error(f"No questions found for quiz attempt {quiz_attempt_id}")
+            logger.error("No questions found for quiz attempt %s", quiz_attempt_id)
             raise ValueError("No questions found for the quiz attempt")
         
         response = CheckQuizAttemptQuestion(
@@ -161,10 +163,10 @@ def get_quiz_questions(db: Session, quiz_attempt_id: UUID, user_id: UUID) -> Che
             expired_at=quiz_attempt.expired_at.strftime("%Y-%m-%d %H:%M:%S")
         )
         print(response)
-        logger.info(f"Questions retrieved successfully for quiz attempt {quiz_attempt_id} by user {user_id}")
+        logger.info("Questions retrieved successfully for quiz attempt %s by user %s", quiz_attempt_id, user_id)
         return response
     except Exception as e:
-        logger.error(f"Error retrieving quiz questions: {e}")
+        logger.error("Error retrieving quiz questions: %s", e)
         raise ValueError("Failed to retrieve quiz questions") from e
 
     
@@ -178,7 +180,7 @@ def attempt_quiz_answer(db: Session, quiz_attempt_id: UUID, user_id: UUID, quest
     :param answers: List of answers for the quiz attempt
     """
     try:
-        logger.info(f"Submitting answers for quiz attempt {quiz_attempt_id} by user {user_id}")
+        logger.info("Submitting answers for quiz attempt %s by user %s", quiz_attempt_id, user_id)
         quiz_attempt = db.query(QuizAttempt).filter(
             QuizAttempt.id == quiz_attempt_id,
             QuizAttempt.user_id == user_id,
@@ -186,14 +188,14 @@ def attempt_quiz_answer(db: Session, quiz_attempt_id: UUID, user_id: UUID, quest
             QuizAttempt.is_completed == False
         ).first()
         if not quiz_attempt:
-            logger.error(f"Quiz attempt {quiz_attempt_id} not found or has expired for user {user_id}")
+            logger.error("Quiz attempt %s not found or has expired for user %s", quiz_attempt_id, user_id)
             raise ValueError("Quiz attempt not found or has expired")
         question = db.query(Question).filter(Question.id == question_id).first()
         if not question:
-            logger.error(f"Question {question_id} not found for quiz attempt {quiz_attempt_id}")
+            logger.error("Question %s not found for quiz attempt %s", question_id, quiz_attempt_id)
             raise ValueError("Question not found for the quiz attempt")
         if question.question_type == "multiple_choice" and len(answers.user_answers) > 1:
-            logger.error(f"Invalid number of answers for question {question_id} in quiz attempt {quiz_attempt_id}")
+            logger.error("Invalid number of answers for question %s in quiz attempt %s", question_id, quiz_attempt_id)
             raise ValueError("Invalid number of answers for the question")
         check_answer = db.query(AttemptAnswer).filter(
             AttemptAnswer.attempt_id == quiz_attempt_id,
@@ -208,7 +210,7 @@ def attempt_quiz_answer(db: Session, quiz_attempt_id: UUID, user_id: UUID, quest
             )
             db.commit()
         else:
-            logger.info(f"Creating new answer record for question {question_id} in quiz attempt {quiz_attempt_id}")
+            logger.info("Creating new answer record for question %s in quiz attempt %s", question_id, quiz_attempt_id)
             answer = AttemptAnswer(
                 attempt_id=quiz_attempt_id,
                 question_id=question_id,
@@ -217,14 +219,14 @@ def attempt_quiz_answer(db: Session, quiz_attempt_id: UUID, user_id: UUID, quest
             db.add(answer)
             db.commit()
             db.refresh(answer)
-        logger.info(f"Answers submitted successfully for quiz attempt {quiz_attempt_id} by user {user_id}")
+        logger.info("Answers submitted successfully for quiz attempt %s by user %s", quiz_attempt_id, user_id)
         response = AttemptQuizAnswerResponse(
             message="Answers submitted successfully",
             attempt_answer_id=check_answer.id if check_answer else answer.id
         )
         return response
     except Exception as e:
-        logger.error(f"Error submitting answers for quiz attempt: {e}")
+        logger.error("Error submitting answers for quiz attempt: %s", e)
         raise ValueError("Failed to submit answers for quiz attempt") from e
     
 def get_answer_by_quiz_attempt_question_id(db: Session, quiz_attempt_id: UUID, question_id:UUID, user_id: UUID) -> UserAnswer:
@@ -237,20 +239,20 @@ def get_answer_by_quiz_attempt_question_id(db: Session, quiz_attempt_id: UUID, q
     :return: List of answers for the specified question in the quiz attempt
     """
     try:
-        logger.info(f"Retrieving answers for question {question_id} in quiz attempt {quiz_attempt_id} by user {user_id}")
+        logger.info("Retrieving answers for question %s in quiz attempt %s by user %s", question_id, quiz_attempt_id, user_id)
         answers = db.query(AttemptAnswer).filter(
             AttemptAnswer.attempt_id == quiz_attempt_id,
             AttemptAnswer.question_id == question_id
         ).first()
         
         if not answers:
-            logger.error(f"No answers found for question {question_id} in quiz attempt {quiz_attempt_id}")
+            logger.error("No answers found for question %s in quiz attempt %s", question_id, quiz_attempt_id)
             raise {"attempt_answer_id": None, "user_answer": []}
         response = {"attempt_answer_id": answers.id ,"user_answer": answers.user_answer}
-        logger.info(f"Answers retrieved successfully for question {question_id} in quiz attempt {quiz_attempt_id} by user {user_id}")
+        logger.info("Answers retrieved successfully for question %s in quiz attempt %s by user %s", question_id, quiz_attempt_id, user_id)
         return response
     except Exception as e:
-        logger.error(f"Error retrieving question answers: {e}")
+        logger.error("Error retrieving question answers: %s", e)
         raise ValueError("Failed to retrieve question answers") from e
     
 def get_answer_by_answer_id(db: Session, answer_id: UUID, user_id: UUID) -> UserAnswer:
@@ -263,27 +265,30 @@ def get_answer_by_answer_id(db: Session, answer_id: UUID, user_id: UUID) -> User
     :return: AttemptAnswer object if found, else None
     """
     try:
-        logger.info(f"Retrieving answer with ID {answer_id} for user {user_id}")
+        logger.info("Retrieving answer with ID %s for user %s", answer_id, user_id)
         answer = db.query(AttemptAnswer).filter(
             AttemptAnswer.id == answer_id
         ).first()
         
         if not answer:
-            logger.error(f"Answer with ID {answer_id} not found for user {user_id}")
+            logger.error("Answer with ID %s not found for user %s", answer_id, user_id)
             raise {"attempt_answer_id": None, "user_answer": []}
         response = {
             "attempt_answer_id": answer_id,
             "user_answer": answer.user_answer
         }
-        logger.info(f"Answer retrieved successfully for user {user_id}")
+        logger.info("Answer retrieved successfully for user %s", user_id)
         return response
     except Exception as e:
-        logger.error(f"Error retrieving answer by ID: {e}")
+        logger.error("Error retrieving answer by ID: %s", e)
         raise ValueError("Failed to retrieve answer by ID") from e
     
 def evaluate_quiz(db: Session, quiz_attempt_id: UUID, user_id: UUID) -> QuizEvaluationResponse:
     """
     Evaluate a quiz attempt and return the score.
+
+    Graded by the same set-based statement as the async controller, see
+    ``database.grading``, so the user collection and dashboard stay in sync.
     
     :param db: SQLAlchemy session object
     :param quiz_attempt_id: ID of the quiz attempt
@@ -291,167 +296,60 @@ def evaluate_quiz(db: Session, quiz_attempt_id: UUID, user_id: UUID) -> QuizEval
     :return: QuizEvaluationResponse containing the score and evaluation details
     """
     try:
-        logger.info(f"Evaluating quiz attempt {quiz_attempt_id} for user {user_id}")
-        quiz_attempt = db.query(QuizAttempt).filter(
-            QuizAttempt.id == quiz_attempt_id,
-            QuizAttempt.is_completed == False
-        ).first()
-        
-        if not quiz_attempt:
-            logger.error(f"Quiz attempt {quiz_attempt_id} not found or has expired for user {user_id}")
-            raise ValueError("Quiz attempt not found or has expired")
-        
-        answers = db.query(AttemptAnswer).filter(AttemptAnswer.attempt_id == quiz_attempt_id).all()
-        if not answers:
-            logger.error(f"No answers found for quiz attempt {quiz_attempt_id}")
-            raise ValueError("No answers found for the quiz attempt")
-        
-        score = 0
-        point = 0
-        evaluation_details = []
+        logger.info("Evaluating quiz attempt %s for user %s", quiz_attempt_id, user_id)
+        rows = db.execute(grade_attempt_statement(quiz_attempt_id, user_id)).all()
+        if not rows:
+            logger.error("Quiz attempt %s not found, already evaluated or has no answers for user %s", quiz_attempt_id, user_id)
+            raise ValueError("Quiz attempt not found, already evaluated or has no answers")
+        db.commit()
+        leaderboard.update(UUID(str(user_id)), rows[0].total_points, rows[0].full_name)
 
+        answers = {row.question_id: row for row in rows if row.question_id is not None}
         questions = db.query(Question).filter(
-            Question.quiz_id == quiz_attempt.quiz_id
+            Question.quiz_id == rows[0].quiz_id
         ).all()
-
-        for question in questions:
-            answer = next((a for a in answers if a.question_id == question.id), None)
-            is_correct = False
-            if answer is not None:
-                is_correct = set(answer.user_answer) == set(question.correct_answer)
-                # Update the answer record
-                db.query(AttemptAnswer).filter(
-                    AttemptAnswer.id == answer.id
-                ).update(
-                    {AttemptAnswer.is_correct: is_correct},
-                    synchronize_session=False
-                )
-            
-            # Add points if correct
-            if is_correct:
-                score += 1
-                point += 1
-            
-            # Add to evaluation details regardless of whether answer exists
-            evaluation_details.append({
-            "question_id": question.id,
-            "question_text": question.question_text,
-            "possible_answers": question.possible_answers,
-            "user_answer": answer.user_answer if answer else [],
-            "correct_answer": question.correct_answer,
-            "is_correct": is_correct
-            })
-        score_in_percentage = (score / len(questions)) * 100
-        db.query(QuizAttempt).filter(
-            QuizAttempt.id == quiz_attempt_id
-        ).update(
-            {QuizAttempt.is_completed: True, QuizAttempt.score: score_in_percentage, QuizAttempt.points_earned: point},
-            synchronize_session=False
-        )
-        user_collection = db.query(UserCollection).filter(
-            UserCollection.user_id == user_id
-        ).first()
-        if user_collection:
-            user_collection.score = int((user_collection.score + score_in_percentage) / (user_collection.num_quiz_attempt + 1))
-            user_collection.point_earned += point
-            user_collection.num_quiz_attempt += 1
-            db.commit()
-        else:
-            user_collection = UserCollection(
-                user_id=user_id,
-                score=(score_in_percentage / 1),
-                point_earned=point,
-                num_quiz_attempt=1
-            )
-            db.add(user_collection)
-            db.commit()
-        
-        
         evaluation_response = QuizEvaluationResponse(
-            quiz_attempt_id=quiz_attempt.id,
-            score=score_in_percentage,
-            points_earned=point,
-            evaluation_details=evaluation_details
+            quiz_attempt_id=quiz_attempt_id,
+            score=rows[0].score,
+            points_earned=rows[0].points_earned,
+            evaluation_details=[{
+                "question_id": question.id,
+                "question_text": question.question_text,
+                "possible_answers": question.possible_answers,
+                "user_answer": answers[question.id].user_answer if question.id in answers else [],
+                "correct_answer": question.correct_answer,
+                "is_correct": bool(answers[question.id].is_correct) if question.id in answers else False
+            } for question in questions]
         )
         
-        logger.info(f"Quiz attempt {quiz_attempt_id} evaluated successfully with score {evaluation_response.score}")
+        logger.info("Quiz attempt %s evaluated successfully with score %s", quiz_attempt_id, evaluation_response.score)
         return evaluation_response
     except Exception as e:
-        logger.error(f"Error evaluating quiz attempt: {e}")
+        db.rollback()
+        logger.error("Error evaluating quiz attempt: %s", e)
         raise ValueError("Failed to evaluate quiz attempt") from e
 
 
 
 def update_quiz_abandoned(db: Session, user_id: UUID) -> None:
     """
-    Update the quiz attempt that abandoned from user for a given quiz and user.
+    Grade the expired attempts a user abandoned, with the same statement as the abandoned quiz sweeper.
     
     :param db: SQLAlchemy session object
-    :param quiz_id: ID of the quiz
     :param user_id: ID of the user
     """
     try:
-        check_abandoned_quiz = db\
-            .query(QuizAttempt)\
-                .filter(QuizAttempt.user_id == user_id, 
-                        QuizAttempt.is_completed == False,
-                        QuizAttempt.expired_at < func.now())\
-                            .all()
-        
-        for quiz_attempt in check_abandoned_quiz:
-            logger.info(f"Updating quiz {quiz_attempt.id} for user {user_id} to abandoned status")
-            questions = db.query(Question).filter(Question.quiz_id == quiz_attempt.quiz_id).all()
-            answers = db.query(AttemptAnswer).filter(
-                AttemptAnswer.attempt_id == quiz_attempt.id
-            ).all()
-
-            score = 0
-            point = 0
-
-            for question in questions:
-                answer = next((a for a in answers if a.question_id == question.id), None)
-                is_correct = False
-                if answer is not None:
-                    is_correct = set(answer.user_answer) == set(question.correct_answer)
-                    # Update the answer record
-                    db.query(AttemptAnswer).filter(
-                        AttemptAnswer.id == answer.id
-                    ).update(
-                        {AttemptAnswer.is_correct: is_correct},
-                        synchronize_session=False
-                    )
-                
-                # Add points if correct
-                if is_correct:
-                    score += 1
-                    point += 1
-            score_in_percentage = (score / len(questions)) * 100 if questions else 0
-            db.query(QuizAttempt).filter(
-                QuizAttempt.id == quiz_attempt.id
-            ).update(
-                {QuizAttempt.is_completed: True, QuizAttempt.score: score_in_percentage, QuizAttempt.points_earned: point},
-                synchronize_session=False
-            )
-            db.commit()
-            user_collection = db.query(UserCollection).filter(
-            UserCollection.user_id == user_id
-            ).first()
-            if user_collection:
-                user_collection.score = int((user_collection.score + score_in_percentage) / (user_collection.num_quiz_attempt + 1))
-                user_collection.point_earned += point
-                user_collection.num_quiz_attempt += 1
-                db.commit()
-            else:
-                user_collection = UserCollection(
-                    user_id=user_id,
-                    score=(score_in_percentage / 1),
-                    point_earned=point,
-                    num_quiz_attempt=1
-                )
-                db.add(user_collection)
-                db.commit()
-            logger.info(f"Quiz {quiz_attempt.id} for user {user_id} updated to abandoned status successfully")
-            return
+        expired_attempts = select(QuizAttempt.id, QuizAttempt.quiz_id, QuizAttempt.user_id).where(
+            QuizAttempt.user_id == user_id,
+            QuizAttempt.is_completed == False,
+            QuizAttempt.expired_at < func.now()
+        ).with_for_update(skip_locked=True)
+        graded = db.execute(grade_attempts_statement(expired_attempts)).all()
+        db.commit()
+        for attempt in graded:
+            logger.info("Quiz %s for user %s updated to abandoned status successfully", attempt.id, user_id)
+            leaderboard.update(attempt.user_id, attempt.total_points, attempt.full_name)
     except Exception as e:
-        logger.error(f"Error updating quiz attempt: {e}")
-        raise ValueError("Failed to update quiz attempt") from e
\ No newline at end of file
+        db.rollback()
+        logger.error("Error updating quiz attempt: %s", e)
+        raise ValueError("Failed to update quiz attempt") from e
@@ -1,11 +1,20 @@
-from uuid import UUID
+from uuid import UUID, uuid4
 from typing import List, Optional
-from database.models import User, UserAuth, func
+from database.models import User, UserAuth, DailyMood, Moods, QuizAttempt, UserCollection, func
 from sqlalchemy.orm import Session
-from schemas.usersSchema import CreateUserRequest, CreateUserResponse
+from database.users import create_user_statement
+from schemas.usersSchema import CreateUserRequest, CreateUserResponse, FetchedInfoResponse, MonthlyMood
 from utils.auth import get_password_hash, verify_password, create_access_token
 from logging_config import logger
 
+class ActiveQuizAttemptError(Exception):
+    """
+    Raised when the user still has an active quiz attempt that is not completed.
+    """
+    def __init__(self, quiz_attempt_id: UUID):
+        super().__init__("You have an active quiz attempt that is not completed.")
+        self.quiz_attempt_id = quiz_attempt_id
+
 def create_users(db:Session, user_data:CreateUserRequest) -> User:
     """
     Create a new user in the database.
@@ -15,36 +24,25 @@ def create_users(db:Session, user_data:CreateUserRequest) -> User:
     :return: Created User object
     """
     try:
-        # Check if the username already exists
-        logger.info(f"Attempting to create user with username: {user_data.username}")
-        existing_user = db.query(UserAuth).filter(UserAuth.username == user_data.username).first()
-        if existing_user:
-            raise ValueError("Username already exists")
+        logger.info("Attempting to create user with username: %s", user_data.username)
         hashed_password = get_password_hash(user_data.password)
-        db_user = User(
-            full_name=user_data.full_name,
-            age=user_data.age
-        )
-        db.add(db_user)
-        db.commit()
-        db_user_auth = UserAuth(
-            user_id=db_user.id,
-            username=user_data.username,
-            password=hashed_password
-        )
-        db.add(db_user_auth)
+        # One statement, a taken username is resolved by ON CONFLICT instead of a pre-check
+        created = db.execute(create_user_statement(
+            uuid4(), user_data.full_name, user_data.age, user_data.username, hashed_password
+        )).first()
+        if created is None:
+            raise ValueError("Username already exists")
         db.commit()
-        db.refresh(db_user)
-        db.refresh(db_user_auth)
         response = CreateUserResponse(
-            id=db_user.id,
-            full_name=db_user.full_name,
-            username=db_user_auth.username,
-            age=db_user.age
+            id=created.user_id,
+            full_name=user_data.full_name,
+            username=created.username,
+            age=user_data.age
         )
         return response
     except Exception as e:
-        logger.error(f"Error creating user: {e}")
+        db.rollback()
+        logger.error("Error creating user: %s", e)
         raise ValueError("Failed to create user") from e
 
 def login_users(db: Session, username: str, password: str) -> str:
@@ -57,7 +55,7 @@ def login_users(db: Session, username: str, password: str) -> str:
     :return: UserAuth object if login is successful
     """
     try:
-        logger.info(f"User login attempt with username: {username}")
+        logger.info("User login attempt with username: %s", username)
         user_auth = db.query(UserAuth).filter(UserAuth.username == username).first()
         user_hashed_password = user_auth.password if user_auth else None
         if not user_auth or not verify_password(password, user_hashed_password):
@@ -65,6 +63,58 @@ def login_users(db: Session, username: str, password: str) -> str:
         access_token = create_access_token(data={"user_id": str(user_auth.user_id), "username": user_auth.username})
         return access_token
     except Exception as e:
-        logger.error(f"Error during user login: {e}")
+        logger.error("Error during user login: %s", e)
         raise ValueError("Login failed") from e
-    
+
+def fetch_user_info(db: Session, user_id: UUID) -> FetchedInfoResponse:
+    """
+    Fetch the dashboard information of a user.
+
+    :param db: SQLAlchemy session object
+    :param user_id: ID of the user
+    :return: User information including full name, age, and mood statistics
+    :raises ActiveQuizAttemptError: If the user still has an active quiz attempt
+    """
+    logger.info("Fetching user info for user ID: %s", user_id)
+    user_info = db.query(User).filter(User.id == user_id).first()
+    # Cek if the user still has active quiz attempts
+    quiz_attempt = db.query(QuizAttempt).filter(
+        QuizAttempt.user_id == user_id,
+        QuizAttempt.expired_at > func.now(),
+        QuizAttempt.is_completed == False
+    ).first()
+    if quiz_attempt:
+        logger.warning("User has an active quiz attempt that is not completed.")
+        raise ActiveQuizAttemptError(quiz_attempt.id)
+    today_mood = db.query(
+        Moods.name
+    ).join(
+        DailyMood,
+        Moods.id == DailyMood.mood_level
+    ).filter(
+        DailyMood.user_id == user_id,
+        DailyMood.date == func.current_date()
+    ).first()
+    monthly_mood = db.query(
+        Moods.name,
+        func.count(DailyMood.mood_level).label('mood_count')
+    ).join(
+        DailyMood,
+        Moods.id == DailyMood.mood_level
+    ).filter(
+        DailyMood.user_id == user_id,
+        DailyMood.date >= func.date_trunc('month', func.current_date())
+    ).group_by(Moods.name).all()
+    monthly_mood_dict = {mood.name: mood.mood_count for mood in monthly_mood}
+    score_and_points = db.query(
+        UserCollection.score,
+        UserCollection.point_earned
+    ).filter(UserCollection.user_id == user_id).first()
+    return FetchedInfoResponse(
+        full_name=user_info.full_name,
+        age=user_info.age,
+        today_mood=today_mood[0] if today_mood else None,
+        monthly_mood=MonthlyMood(**monthly_mood_dict),
+        score=score_and_points.score if score_and_points else 0,
+        point_earned=score_and_points.point_earned if score_and_points else 0
+    )
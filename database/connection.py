@@ -1,17 +1,102 @@
 from sqlalchemy import create_engine
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from dotenv import load_dotenv
-from os import getenv
+from database.poolMetrics import InstrumentedQueuePool, InstrumentedAsyncQueuePool, instrument_engine
+from database.queryMetrics import instrument_queries
+from settings import settings
 
-load_dotenv(override=True)
+POSTGRESQL_URL = settings.POSTGRE_URL
+POSTGRESQL_REPLICA_URL = settings.POSTGRE_REPLICA_URL
 
-POSTGRESQL_URL = getenv("POSTGRE_URL")
 
-engine = create_engine(POSTGRESQL_URL)
+def to_async_url(url: str):
+    """
+    Convert a sync PostgreSQL URL (psycopg2) into its asyncpg equivalent.
+
+    asyncpg does not understand libpq's ``sslmode`` query parameter, so it is
+    translated to the ``ssl`` parameter asyncpg expects.
+
+    :param url: Sync database URL
+    :return: SQLAlchemy URL object using the asyncpg driver
+    """
+    async_url = make_url(url).set(drivername="postgresql+asyncpg")
+    query = dict(async_url.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    return async_url.set(query=query)
+
+
+def pool_options() -> dict:
+    """
+    Connection pool options shared by the sync and the async engine.
+    """
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+
+def connect_args(is_async: bool) -> dict:
+    """
+    Driver specific connection arguments applying the statement timeout.
+
+    :param is_async: True for asyncpg, False for psycopg2
+    """
+    if not settings.DB_STATEMENT_TIMEOUT_MS:
+        return {}
+    if is_async:
+        return {"server_settings": {"statement_timeout": str(settings.DB_STATEMENT_TIMEOUT_MS)}}
+    return {"options": f"-c statement_timeout={settings.DB_STATEMENT_TIMEOUT_MS}"}
+
+
+# Sync engine, kept for scripts and maintenance jobs
+engine = create_engine(
+    POSTGRESQL_URL,
+    poolclass=InstrumentedQueuePool,
+    pool_logging_name="primary-sync",
+    connect_args=connect_args(is_async=False),
+    **pool_options()
+)
+instrument_engine(engine)
+instrument_queries(engine)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# Async engine, used by the API routes
+async_engine = create_async_engine(
+    to_async_url(POSTGRESQL_URL),
+    poolclass=InstrumentedAsyncQueuePool,
+    pool_logging_name="primary-async",
+    connect_args=connect_args(is_async=True),
+    **pool_options()
+)
+instrument_engine(async_engine.sync_engine)
+instrument_queries(async_engine.sync_engine)
+
+AsyncSessionLocal = async_sessionmaker(bind=async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
+# Optional read replica, see database.replica for the routing and the lag check
+replica_async_engine = None
+ReplicaSessionLocal = None
+if POSTGRESQL_REPLICA_URL:
+    replica_async_engine = create_async_engine(
+        to_async_url(POSTGRESQL_REPLICA_URL),
+        poolclass=InstrumentedAsyncQueuePool,
+        pool_logging_name="replica-async",
+        connect_args=connect_args(is_async=True),
+        **pool_options()
+    )
+    instrument_engine(replica_async_engine.sync_engine)
+    instrument_queries(replica_async_engine.sync_engine)
+    ReplicaSessionLocal = async_sessionmaker(
+        bind=replica_async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False
+    )
+
 Base = declarative_base()
 
 
@@ -20,4 +105,9 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,154 @@
+"""
+Incrementally maintained dashboard summary served by ``/fetch_stat``.
+
+``user_dashboards`` keeps one compact row per user: today's mood, the mood
+counts of the current month, score and points. Writers update it in the
+same transaction as the source tables (mood inference, quiz grading), so
+the dashboard is a single-row read.
+
+Day and month rollover happens on read: today's mood is only returned
+when ``mood_date`` is the current date, and the counts only when
+``month`` is the current month. The next mood write resets a stale month.
+"""
+from uuid import UUID
+from sqlalchemy import select, case, cast, func, literal, type_coerce, Date, Integer, String
+from sqlalchemy.dialects.postgresql import insert as pg_insert, JSONB, array
+from database.models import User, UserDashboard, UserCollection, DailyMood, Moods, QuizAttempt
+
+
+def _current_month():
+    return cast(func.date_trunc('month', func.current_date()), Date)
+
+
+def record_mood_statement(user_id: UUID, mood_name: str):
+    """
+    Add today's mood of a user to the dashboard, resetting the counts when a new month started.
+
+    :param user_id: ID of the user
+    :param mood_name: Name of the recorded mood, e.g. ``Happy``
+    :return: Upsert statement
+    """
+    upsert = pg_insert(UserDashboard).values(
+        user_id=user_id,
+        month=_current_month(),
+        mood_counts=func.jsonb_build_object(mood_name, 1),
+        mood_date=func.current_date(),
+        today_mood=mood_name
+    )
+    incremented = func.jsonb_set(
+        UserDashboard.mood_counts,
+        array([literal(mood_name, String)]),
+        func.to_jsonb(func.coalesce(cast(UserDashboard.mood_counts[mood_name].astext, Integer), 0) + 1)
+    )
+    return upsert.on_conflict_do_update(
+        index_elements=[UserDashboard.user_id],
+        set_={
+            "mood_counts": case(
+                (UserDashboard.month == upsert.excluded.month, incremented),
+                else_=upsert.excluded.mood_counts
+            ),
+            "month": upsert.excluded.month,
+            "mood_date": upsert.excluded.mood_date,
+            "today_mood": upsert.excluded.today_mood,
+        }
+    )
+
+
+def record_scores_statement(collections):
+    """
+    Copy the score and points of updated user collections to the dashboard.
+
+    :param collections: Selectable with the ``user_id``, ``score`` and ``point_earned`` of the updated collections
+    :return: Upsert statement
+    """
+    upsert = pg_insert(UserDashboard).from_select(
+        ["user_id", "score", "point_earned"],
+        select(collections.c.user_id, collections.c.score, collections.c.point_earned)
+    )
+    return upsert.on_conflict_do_update(
+        index_elements=[UserDashboard.user_id],
+        set_={"score": upsert.excluded.score, "point_earned": upsert.excluded.point_earned}
+    )
+
+
+def fetch_dashboard_statement(user_id: UUID):
+    """
+    Read everything ``/fetch_stat`` needs in one statement.
+
+    :param user_id: ID of the user
+    :return: Select returning one row, or none if the user does not exist
+    """
+    active_attempt = (
+        select(QuizAttempt.id)
+        .where(
+            QuizAttempt.user_id == user_id,
+            QuizAttempt.expired_at > func.now(),
+            QuizAttempt.is_completed == False
+        )
+        .limit(1)
+        .scalar_subquery()
+    )
+    return (
+        select(
+            User.full_name,
+            User.age,
+            active_attempt.label("active_quiz_attempt_id"),
+            case((UserDashboard.mood_date == func.current_date(), UserDashboard.today_mood)).label("today_mood"),
+            case(
+                (UserDashboard.month == _current_month(), UserDashboard.mood_counts),
+                else_=type_coerce({}, JSONB)
+            ).label("monthly_mood"),
+            func.coalesce(UserDashboard.score, 0).label("score"),
+            func.coalesce(UserDashboard.point_earned, 0).label("point_earned")
+        )
+        .outerjoin(UserDashboard, UserDashboard.user_id == User.id)
+        .where(User.id == user_id)
+    )
+
+
+def rebuild_dashboards_statement():
+    """
+    Rebuild the dashboard of every user from the source tables, used to backfill or repair it.
+
+    :return: Upsert statement
+    """
+    month_counts = (
+        select(DailyMood.user_id, Moods.name, func.count().label("mood_count"))
+        .join(Moods, Moods.id == DailyMood.mood_level)
+        .where(DailyMood.date >= _current_month())
+        .group_by(DailyMood.user_id, Moods.name)
+        .subquery()
+    )
+    monthly = (
+        select(month_counts.c.user_id, func.jsonb_object_agg(month_counts.c.name, month_counts.c.mood_count).label("mood_counts"))
+        .group_by(month_counts.c.user_id)
+        .subquery()
+    )
+    today = (
+        select(DailyMood.user_id, Moods.name)
+        .join(Moods, Moods.id == DailyMood.mood_level)
+        .where(DailyMood.date == func.current_date())
+        .subquery()
+    )
+    rows = (
+        select(
+            User.id,
+            _current_month(),
+            func.coalesce(monthly.c.mood_counts, type_coerce({}, JSONB)),
+            case((today.c.name.isnot(None), func.current_date())),
+            today.c.name,
+            func.coalesce(UserCollection.score, 0),
+            func.coalesce(UserCollection.point_earned, 0)
+        )
+        .outerjoin(monthly, monthly.c.user_id == User.id)
+        .outerjoin(today, today.c.user_id == User.id)
+        .outerjoin(UserCollection, UserCollection.user_id == User.id)
+    )
+    upsert = pg_insert(UserDashboard).from_select(
+        ["user_id", "month", "mood_counts", "mood_date", "today_mood", "score", "point_earned"], rows
+    )
+    return upsert.on_conflict_do_update(
+        index_elements=[UserDashboard.user_id],
+        set_={column: upsert.excluded[column] for column in
+              ("month", "mood_counts", "mood_date", "today_mood", "score", "point_earned")}
+    )
@@ -0,0 +1,164 @@
+"""
+Set-based grading of quiz attempts.
+
+An attempt is graded with a single statement: the answers are marked
+correct by joining ``attempt_answers`` to ``questions``, the attempt is
+completed with its score and points, and the totals are added to
+``user_collections`` and copied to the ``user_dashboards`` summary. An
+answer is correct when it holds exactly the same options as the correct
+answer (both JSONB arrays contain each other).
+
+The statements are plain SQLAlchemy Core, so they run on both the sync
+``Session`` and the ``AsyncSession``.
+"""
+from uuid import UUID
+from sqlalchemy import select, update, exists, and_, case, cast, func, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from database.models import AttemptAnswer, Question, QuizAttempt, User, UserCollection, UserDashboard
+from database.dashboards import record_scores_statement
+
+
+def _grade(targets):
+    """
+    Build the CTEs grading the attempts selected by ``targets``.
+
+    :param targets: CTE with the ``id``, ``quiz_id`` and ``user_id`` of the attempts to grade
+    :return: Tuple of the ``graded`` answers, ``completed`` attempts, ``collections`` and ``dashboards`` upsert CTEs
+    """
+    graded = (
+        update(AttemptAnswer)
+        .where(
+            AttemptAnswer.question_id == Question.id,
+            AttemptAnswer.attempt_id.in_(select(targets.c.id))
+        )
+        .values(is_correct=and_(
+            AttemptAnswer.user_answer.contains(Question.correct_answer),
+            Question.correct_answer.contains(AttemptAnswer.user_answer)
+        ))
+        .returning(AttemptAnswer.attempt_id, AttemptAnswer.question_id, AttemptAnswer.user_answer, AttemptAnswer.is_correct)
+        .cte("graded")
+    )
+
+    total = func.count(Question.id)
+    correct = func.count().filter(graded.c.is_correct)
+    scores = (
+        select(targets.c.id.label("attempt_id"), total.label("total"), correct.label("correct"))
+        .select_from(
+            targets
+            .outerjoin(Question, Question.quiz_id == targets.c.quiz_id)
+            .outerjoin(graded, and_(graded.c.attempt_id == targets.c.id, graded.c.question_id == Question.id))
+        )
+        .group_by(targets.c.id)
+        .cte("scores")
+    )
+
+    completed = (
+        update(QuizAttempt)
+        .where(QuizAttempt.id == scores.c.attempt_id, QuizAttempt.is_completed == False)
+        .values(
+            is_completed=True,
+            completed_at=func.now(),
+            score=case((scores.c.total > 0, func.round(scores.c.correct * 100.0 / scores.c.total)), else_=0),
+            points_earned=scores.c.correct
+        )
+        .returning(QuizAttempt.id, QuizAttempt.quiz_id, QuizAttempt.user_id, QuizAttempt.score, QuizAttempt.points_earned)
+        .cte("completed")
+    )
+
+    attempts = func.count()
+    per_user = (
+        select(
+            completed.c.user_id,
+            cast(func.floor(func.sum(completed.c.score) / attempts), Integer).label("score"),
+            func.sum(completed.c.points_earned).label("point_earned"),
+            attempts.label("num_quiz_attempt")
+        )
+        .group_by(completed.c.user_id)
+    )
+    upsert = pg_insert(UserCollection).from_select(
+        ["user_id", "score", "point_earned", "num_quiz_attempt"], per_user
+    )
+    previous_attempts = func.coalesce(UserCollection.num_quiz_attempt, 0)
+    collections = upsert.on_conflict_do_update(
+        index_elements=[UserCollection.user_id],
+        set_={
+            # Same running formula as the per-attempt update, applied to a batch of attempts
+            "score": cast(func.floor(
+                (func.coalesce(UserCollection.score, 0) + upsert.excluded.score * upsert.excluded.num_quiz_attempt)
+                / (previous_attempts + upsert.excluded.num_quiz_attempt)
+            ), Integer),
+            "point_earned": func.coalesce(UserCollection.point_earned, 0) + upsert.excluded.point_earned,
+            "num_quiz_attempt": previous_attempts + upsert.excluded.num_quiz_attempt,
+        }
+    ).returning(UserCollection.user_id, UserCollection.score, UserCollection.point_earned).cte("collections")
+    dashboards = record_scores_statement(collections).returning(UserDashboard.user_id).cte("dashboards")
+
+    return graded, completed, collections, dashboards
+
+
+def grade_attempt_statement(quiz_attempt_id: UUID, user_id: UUID):
+    """
+    Grade one attempt of a user and return its evaluation in the same round trip.
+
+    The attempt is only graded if it is not completed yet and has at least one answer.
+
+    :param quiz_attempt_id: ID of the quiz attempt
+    :param user_id: ID of the user owning the attempt
+    :return: Statement returning the score of the attempt, the new ``total_points`` and the ``full_name`` of the
+        user with one row per graded answer, empty if nothing was graded
+    """
+    targets = (
+        select(QuizAttempt.id, QuizAttempt.quiz_id, QuizAttempt.user_id)
+        .where(
+            QuizAttempt.id == quiz_attempt_id,
+            QuizAttempt.user_id == user_id,
+            QuizAttempt.is_completed == False,
+            exists().where(AttemptAnswer.attempt_id == QuizAttempt.id)
+        )
+        .cte("targets")
+    )
+    graded, completed, collections, dashboards = _grade(targets)
+    # The question texts and options come from the question cache, only the answers are returned
+    return (
+        select(
+            completed.c.quiz_id,
+            completed.c.score,
+            completed.c.points_earned,
+            graded.c.question_id,
+            graded.c.user_answer,
+            graded.c.is_correct,
+            collections.c.point_earned.label("total_points"),
+            User.full_name
+        )
+        .select_from(
+            completed
+            .join(collections, collections.c.user_id == completed.c.user_id)
+            .join(User, User.id == completed.c.user_id)
+            .outerjoin(graded, graded.c.attempt_id == completed.c.id)
+        )
+        .add_cte(collections)
+        .add_cte(dashboards)
+    )
+
+
+def grade_attempts_statement(attempts):
+    """
+    Grade many attempts at once, e.g. the expired attempts found by a sweep.
+
+    :param attempts: Select of the ``id``, ``quiz_id`` and ``user_id`` of the attempts to grade
+    :return: Statement returning the ``id``, ``user_id``, ``score`` and ``points_earned`` of each graded attempt,
+        with the new ``total_points`` and the ``full_name`` of the user
+    """
+    targets = attempts.cte("targets")
+    graded, completed, collections, dashboards = _grade(targets)
+    return (
+        select(
+            completed.c.id, completed.c.user_id, completed.c.score, completed.c.points_earned,
+            collections.c.point_earned.label("total_points"), User.full_name
+        )
+        .join(collections, collections.c.user_id == completed.c.user_id)
+        .join(User, User.id == completed.c.user_id)
+        .add_cte(graded)
+        .add_cte(collections)
+        .add_cte(dashboards)
+    )
@@ -0,0 +1,85 @@
+"""
+Schema management commands, kept out of the import path of the application.
+
+Usage:
+    python -m database.manage create-all
+    python -m database.manage migrate
+    python -m database.manage rebuild-dashboards
+    python -m database.manage seed-moods
+"""
+import argparse
+from pathlib import Path
+from database.connection import Base, engine
+from sqlalchemy import insert
+from database.dashboards import rebuild_dashboards_statement
+from database.models import Moods
+from logging_config import logger
+import database.models  # noqa: F401 registers the tables on Base.metadata
+
+
+def create_all() -> None:
+    """
+    Create the tables that do not exist yet.
+    """
+    logger.info("Creating missing tables")
+    Base.metadata.create_all(engine)
+    logger.info("Tables created")
+
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent / "migrations"
+
+
+def migrate() -> None:
+    """
+    Apply the SQL migrations of existing databases in order.
+
+    Every migration is idempotent, so the command can be run on each deploy.
+    """
+    for migration in sorted(MIGRATIONS_DIR.glob("*.sql")):
+        logger.info("Applying migration %s", migration.name)
+        with engine.begin() as connection:
+            connection.exec_driver_sql(migration.read_text())
+    logger.info("Migrations applied")
+
+
+def rebuild_dashboards() -> None:
+    """
+    Rebuild the ``user_dashboards`` summary from the source tables.
+
+    Run once after creating the table, and whenever the summary needs a repair.
+    """
+    logger.info("Rebuilding user dashboards")
+    with engine.begin() as connection:
+        connection.execute(rebuild_dashboards_statement())
+    logger.info("User dashboards rebuilt")
+
+
+# Labels of the mood classifier, stored capitalized
+MOODS = ("Happy", "Surprise", "Sad", "Anger", "Disgust", "Fear", "Neutral")
+
+
+def seed_moods() -> None:
+    """
+    Insert the moods predicted by the mood classifier into an empty ``moods`` table, e.g. of a test database.
+    """
+    with engine.begin() as connection:
+        if connection.execute(Moods.__table__.select().limit(1)).first() is not None:
+            logger.info("Moods already present, nothing to seed")
+            return
+        connection.execute(insert(Moods), [{"id": index, "name": name} for index, name in enumerate(MOODS, start=1)])
+    logger.info("Seeded %s moods", len(MOODS))
+
+
+COMMANDS = {
+    "create-all": create_all,
+    "migrate": migrate,
+    "rebuild-dashboards": rebuild_dashboards,
+    "seed-moods": seed_moods,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Database schema management")
+    parser.add_argument("command", choices=sorted(COMMANDS))
+    args = parser.parse_args()
+    COMMANDS[args.command]()
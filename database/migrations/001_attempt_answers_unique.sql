@@ -0,0 +1,10 @@
+-- One answer per question and attempt, required by the batch answer upsert
+-- (INSERT ... ON CONFLICT (attempt_id, question_id)).
+DELETE FROM attempt_answers older
+USING attempt_answers newer
+WHERE older.attempt_id = newer.attempt_id
+  AND older.question_id = newer.question_id
+  AND older.ctid < newer.ctid;
+
+CREATE UNIQUE INDEX IF NOT EXISTS attempt_answers_attempt_id_question_id_key
+    ON attempt_answers (attempt_id, question_id);
@@ -0,0 +1,2 @@
+-- Collections are created by quiz grading before any chat wrote a condition summary.
+ALTER TABLE user_collections ALTER COLUMN user_condition_summary DROP NOT NULL;
@@ -0,0 +1,4 @@
+-- Keyset pagination of the history endpoints, see utils/pagination.py.
+-- daily_moods is already covered by its (user_id, date) unique constraint.
+CREATE INDEX IF NOT EXISTS ix_quizzes_user_created_at_id ON quizzes (generated_by_user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS ix_quiz_attempts_user_attempted_at_id ON quiz_attempts (user_id, attempted_at, id);
@@ -0,0 +1,10 @@
+-- Completion time of the graded attempts, read by the daily score rollup (jobs/dailyScoreRollup.py).
+-- Attempts completed before the column existed are dated by their start.
+ALTER TABLE quiz_attempts ADD COLUMN IF NOT EXISTS completed_at TIMESTAMP;
+UPDATE quiz_attempts SET completed_at = attempted_at WHERE is_completed AND completed_at IS NULL;
+CREATE INDEX IF NOT EXISTS ix_quiz_attempts_completed_at ON quiz_attempts (completed_at);
+
+CREATE TABLE IF NOT EXISTS job_watermarks (
+    name VARCHAR(100) PRIMARY KEY,
+    watermark TIMESTAMP NOT NULL
+);
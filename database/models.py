@@ -1,7 +1,7 @@
-from sqlalchemy import Column, String, Integer, SmallInteger, Boolean, Date, DateTime, ForeignKey, UniqueConstraint, func, text
+from sqlalchemy import Column, String, Integer, SmallInteger, Boolean, Date, DateTime, ForeignKey, UniqueConstraint, Index, func, text
 from sqlalchemy.dialects.postgresql import UUID, JSONB
 import uuid
-from database.connection import Base, engine
+from database.connection import Base
 
 class User(Base):
     __tablename__ = "users"
@@ -37,6 +37,8 @@ class Quiz(Base):
     title = Column(String(255), nullable=False)
     description = Column(String)
     created_at = Column(DateTime, default=func.now())
+    # Keyset pagination of the quiz history
+    __table_args__ = (Index('ix_quizzes_user_created_at_id', 'generated_by_user_id', 'created_at', 'id'),)
 
 class Question(Base):
     __tablename__ = "questions"
@@ -55,8 +57,15 @@ class QuizAttempt(Base):
     attempted_at = Column(DateTime, default=func.now())
     expired_at = Column(DateTime, server_default=func.now() + text("interval '20 minutes'"))
     is_completed = Column(Boolean, default=False)
+    completed_at = Column(DateTime)
     score = Column(Integer)
     points_earned = Column(Integer)
+    __table_args__ = (
+        # Keyset pagination of the attempt history
+        Index('ix_quiz_attempts_user_attempted_at_id', 'user_id', 'attempted_at', 'id'),
+        # Incremental daily score rollup
+        Index('ix_quiz_attempts_completed_at', 'completed_at'),
+    )
 
 class AttemptAnswer(Base):
     __tablename__ = "attempt_answers"
@@ -65,6 +74,7 @@ class AttemptAnswer(Base):
     question_id = Column(UUID(as_uuid=True), ForeignKey('questions.id', ondelete='CASCADE'))
     user_answer = Column(JSONB)
     is_correct = Column(Boolean)
+    __table_args__ = (UniqueConstraint('attempt_id', 'question_id'),)
 
 class DailyScore(Base):
     __tablename__ = "daily_scores"
@@ -74,18 +84,31 @@ class DailyScore(Base):
     score = Column(Integer, nullable=False)
     __table_args__ = (UniqueConstraint('user_id', 'date'),)
 
+class JobWatermark(Base):
+    __tablename__ = "job_watermarks"
+    name = Column(String(100), primary_key=True)
+    watermark = Column(DateTime, nullable=False)
+
 class UserPreference(Base):
     __tablename__ = "user_preferences"
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
     user_preferences = Column(JSONB)
     
 
+class UserDashboard(Base):
+    __tablename__ = "user_dashboards"
+    user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    month = Column(Date)  # first day of the month counted in mood_counts
+    mood_counts = Column(JSONB, nullable=False, server_default=text("'{}'::jsonb"))
+    mood_date = Column(Date)
+    today_mood = Column(String)
+    score = Column(Integer, nullable=False, server_default=text("0"))
+    point_earned = Column(Integer, nullable=False, server_default=text("0"))
+
 class UserCollection(Base):
     __tablename__ = "user_collections"
     user_id = Column(UUID(as_uuid=True), ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
     score = Column(Integer, nullable=False)
     point_earned = Column(Integer, nullable=False)
-    user_condition_summary = Column(JSONB, nullable=False)
-    num_quiz_attempt = Column(Integer, default=0)
-
-Base.metadata.create_all(engine)
\ No newline at end of file
+    user_condition_summary = Column(JSONB)
+    num_quiz_attempt = Column(Integer, default=0)
\ No newline at end of file
@@ -0,0 +1,153 @@
+import time
+from threading import Lock
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool, AsyncAdaptedQueuePool
+
+# Upper bounds (seconds) of the checkout wait buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0, float("inf"))
+
+
+class PoolMetrics:
+    """
+    Telemetry of one connection pool: checkout wait time, checked out
+    connections, overflow usage and connection age.
+    """
+    def __init__(self, name: str):
+        self.name = name
+        self.pool = None
+        self.checkouts = 0
+        self.timeouts = 0
+        self.errors = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.wait_buckets = [0] * len(WAIT_BUCKETS)
+        self._connected_at = {}
+        self._lock = Lock()
+
+    def observe_wait(self, seconds: float, timed_out: bool = False) -> None:
+        """
+        Record a checkout.
+
+        :param seconds: Time the caller waited for a connection
+        :param timed_out: True when no connection was available within ``pool_timeout``
+        """
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+                return
+            self.checkouts += 1
+            self.wait_total += seconds
+            self.wait_max = max(self.wait_max, seconds)
+            for index, bound in enumerate(WAIT_BUCKETS):
+                if seconds <= bound:
+                    self.wait_buckets[index] += 1
+                    break
+
+    def observe_error(self) -> None:
+        """
+        Record a checkout that failed for another reason than the pool timeout, e.g. the connect failing.
+        """
+        with self._lock:
+            self.errors += 1
+
+    def snapshot(self) -> dict:
+        """
+        Return the current state of the pool and the accumulated counters.
+        """
+        now = time.monotonic()
+        with self._lock:
+            ages = [now - connected_at for connected_at in self._connected_at.values()]
+            checkouts = self.checkouts
+            wait_total = self.wait_total
+            state = {
+                "checkouts": checkouts,
+                "checkout_timeouts": self.timeouts,
+                "checkout_errors": self.errors,
+                "checkout_wait_avg_ms": (wait_total / checkouts * 1000) if checkouts else 0.0,
+                "checkout_wait_max_ms": self.wait_max * 1000,
+                "checkout_wait_buckets": {
+                    ("+Inf" if bound == float("inf") else str(bound)): count
+                    for bound, count in zip(WAIT_BUCKETS, self.wait_buckets)
+                },
+            }
+        pool = self.pool
+        if pool is not None:
+            state.update({
+                "pool_size": pool.size(),
+                "checked_out": pool.checkedout(),
+                "checked_in": pool.checkedin(),
+                "overflow": max(pool.overflow(), 0),
+                "max_overflow": pool._max_overflow,
+            })
+        state.update({
+            "open_connections": len(ages),
+            "connection_age_max_s": max(ages) if ages else 0.0,
+            "connection_age_avg_s": (sum(ages) / len(ages)) if ages else 0.0,
+        })
+        return state
+
+
+# Metrics by pool logging name, survives ``engine.dispose()`` recreating the pool
+pool_metrics: dict[str, PoolMetrics] = {}
+
+
+def _metrics_for(pool) -> PoolMetrics:
+    name = pool._orig_logging_name or "default"
+    metrics = pool_metrics.get(name)
+    if metrics is None:
+        metrics = pool_metrics.setdefault(name, PoolMetrics(name))
+    metrics.pool = pool
+    return metrics
+
+
+class _InstrumentedPoolMixin:
+    """
+    Time how long a caller waits to get a connection out of the pool.
+    """
+    # Log under the sqlalchemy namespace so the pool follows SQLAlchemy's log level
+    _sqla_logger_namespace = "sqlalchemy.pool.impl.QueuePool"
+
+    def _do_get(self):
+        metrics = _metrics_for(self)
+        started = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except PoolTimeoutError:
+            metrics.observe_wait(time.perf_counter() - started, timed_out=True)
+            raise
+        except Exception:
+            # Connect failures and the like, not a pool exhausted for pool_timeout
+            metrics.observe_error()
+            raise
+        metrics.observe_wait(time.perf_counter() - started)
+        return connection
+
+
+class InstrumentedQueuePool(_InstrumentedPoolMixin, QueuePool):
+    pass
+
+
+class InstrumentedAsyncQueuePool(_InstrumentedPoolMixin, AsyncAdaptedQueuePool):
+    pass
+
+
+def instrument_engine(engine) -> None:
+    """
+    Track the age of the connections opened by an engine created with one of the instrumented pools.
+
+    :param engine: Sync engine (use ``AsyncEngine.sync_engine`` for async engines)
+    """
+    @event.listens_for(engine, "connect")
+    def _on_connect(dbapi_connection, connection_record):
+        metrics = _metrics_for(engine.pool)
+        with metrics._lock:
+            metrics._connected_at[id(connection_record)] = time.monotonic()
+
+    @event.listens_for(engine, "close")
+    def _on_close(dbapi_connection, connection_record):
+        metrics = _metrics_for(engine.pool)
+        with metrics._lock:
+            metrics._connected_at.pop(id(connection_record), None)
+
+    _metrics_for(engine.pool)
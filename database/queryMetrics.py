@@ -0,0 +1,130 @@
+"""
+Statement timing and per-request query counting.
+
+Every statement run by an instrumented engine is timed as ``db``
+dependency time (see ``utils.metrics``) and counted in the ``QueryStats``
+of the current context. The metrics middleware opens one per request to
+report the query count in ``Server-Timing`` and to warn about statements
+repeated within the request, the usual sign of an N+1 loop. ``QueryBudget``
+opens one around any block and fails when the block runs more queries than
+allowed, so tests can pin the number of queries of an endpoint.
+
+Statements are compared by their SQL text, which SQLAlchemy renders with
+bound parameters, so the same query with different values has the same
+shape. An ``executemany`` counts as one query.
+"""
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+from sqlalchemy import event
+from utils.metrics import add_dependency_time
+
+
+class QueryStats:
+    """
+    Queries run while this object is the current one, and in its parents.
+    """
+    __slots__ = ("count", "seconds", "statements", "parent")
+
+    def __init__(self, parent: Optional["QueryStats"] = None):
+        self.count = 0
+        self.seconds = 0.0
+        self.statements = Counter()
+        self.parent = parent
+
+    def record(self, statement: str, seconds: float) -> None:
+        stats = self
+        while stats is not None:
+            stats.count += 1
+            stats.seconds += seconds
+            stats.statements[statement] += 1
+            stats = stats.parent
+
+    def repeated(self, threshold: int) -> list[tuple[str, int]]:
+        """
+        Return the statements run at least ``threshold`` times, most repeated first.
+        """
+        return [(statement, count) for statement, count in self.statements.most_common() if count >= threshold]
+
+
+_query_stats: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+
+def start_query_stats() -> QueryStats:
+    """
+    Count the queries of the current context (e.g. a request) in a new ``QueryStats``.
+    """
+    stats = QueryStats()
+    _query_stats.set(stats)
+    return stats
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+class QueryBudget:
+    """
+    Fail when the enclosed block runs more queries than allowed::
+
+        with QueryBudget(max_queries=2, max_repeats=1):
+            await fetch_user_info(db, user_id)
+
+    Works around awaited code too, as long as the queries run in the same task.
+
+    :param max_queries: Queries allowed in the block, None for no limit
+    :param max_repeats: Times the same statement may run in the block, None for no limit
+    """
+    def __init__(self, max_queries: Optional[int] = None, max_repeats: Optional[int] = None):
+        self.max_queries = max_queries
+        self.max_repeats = max_repeats
+        self.stats: Optional[QueryStats] = None
+        self._token = None
+
+    def __enter__(self) -> "QueryBudget":
+        self.stats = QueryStats(parent=_query_stats.get())
+        self._token = _query_stats.set(self.stats)
+        return self
+
+    def __exit__(self, exc_type, exc, traceback) -> None:
+        _query_stats.reset(self._token)
+        if exc_type is not None:
+            return
+        if self.max_queries is not None and self.stats.count > self.max_queries:
+            raise QueryBudgetExceeded(
+                f"{self.stats.count} queries run, the budget is {self.max_queries}:\n"
+                + "\n".join(f"{count}x {statement}" for statement, count in self.stats.statements.most_common())
+            )
+        if self.max_repeats is not None:
+            repeated = self.stats.repeated(self.max_repeats + 1)
+            if repeated:
+                statement, count = repeated[0]
+                raise QueryBudgetExceeded(f"Statement run {count}x, at most {self.max_repeats} allowed: {statement}")
+
+
+def instrument_queries(engine) -> None:
+    """
+    Time and count every statement run by an engine.
+
+    :param engine: Sync engine (use ``AsyncEngine.sync_engine`` for async engines)
+    """
+    def _finish(connection, statement: str) -> None:
+        seconds = time.perf_counter() - connection.info["query_started"].pop()
+        add_dependency_time("db", seconds)
+        stats = _query_stats.get()
+        if stats is not None:
+            stats.record(statement, seconds)
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def _before_execute(connection, cursor, statement, parameters, context, executemany):
+        connection.info.setdefault("query_started", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def _after_execute(connection, cursor, statement, parameters, context, executemany):
+        _finish(connection, statement)
+
+    @event.listens_for(engine, "handle_error")
+    def _on_error(exception_context):
+        connection = exception_context.connection
+        if connection is not None and connection.info.get("query_started"):
+            _finish(connection, exception_context.statement or "")
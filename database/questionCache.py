@@ -0,0 +1,68 @@
+"""
+Read-through cache of quiz questions.
+
+The questions of a quiz never change once ``generate_quiz`` stored them, so
+they are cached by ``quiz_id`` as compact tuples and every quiz endpoint
+reads them from memory. The cache is filled when a quiz is generated and
+on the first read of a quiz generated by another worker.
+"""
+from typing import NamedTuple, Optional
+from uuid import UUID
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.models import Question
+from settings import settings
+from utils.lru import LRUCache
+
+
+class CachedQuestion(NamedTuple):
+    id: UUID
+    question_text: str
+    possible_answers: dict
+    question_type: str
+    correct_answer: list
+
+
+question_cache = LRUCache(settings.QUIZ_QUESTION_CACHE_SIZE)
+
+
+def cache_questions(quiz_id: UUID, questions) -> tuple[CachedQuestion, ...]:
+    """
+    Store the questions of a quiz in the cache.
+
+    :param quiz_id: ID of the quiz
+    :param questions: Question rows, ORM objects or dicts holding at least the cached columns
+    :return: Cached questions
+    """
+    records = tuple(
+        CachedQuestion(*(question[field] for field in CachedQuestion._fields)) if isinstance(question, dict) else CachedQuestion(
+            id=question.id,
+            question_text=question.question_text,
+            possible_answers=question.possible_answers,
+            question_type=question.question_type,
+            correct_answer=question.correct_answer
+        ) for question in questions
+    )
+    if records:
+        question_cache.put(quiz_id, records)
+    return records
+
+
+async def get_questions(db: AsyncSession, quiz_id: UUID) -> tuple[CachedQuestion, ...]:
+    """
+    Return the questions of a quiz, loading them from the database on a cache miss.
+
+    :param db: SQLAlchemy async session object
+    :param quiz_id: ID of the quiz
+    :return: Cached questions, empty if the quiz has none
+    """
+    records: Optional[tuple] = question_cache.get(quiz_id)
+    if records is not None:
+        return records
+    rows = (await db.execute(
+        select(
+            Question.id, Question.question_text, Question.possible_answers,
+            Question.question_type, Question.correct_answer
+        ).where(Question.quiz_id == quiz_id)
+    )).all()
+    return cache_questions(quiz_id, rows)
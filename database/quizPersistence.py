@@ -0,0 +1,55 @@
+"""
+Bulk persistence of generated quizzes.
+
+IDs are generated client side, so a batch of quizzes and all their
+questions is written with two executemany inserts and no refresh round
+trip. Nothing is committed here: the caller owns the transaction, so a
+quiz is never visible without its questions.
+"""
+from uuid import UUID, uuid4
+from sqlalchemy import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.models import Quiz, Question
+
+
+def build_quiz_rows(user_id: UUID, quiz_generated: dict) -> tuple[dict, list[dict]]:
+    """
+    Turn the output of the quiz agent into the rows of a quiz and its questions.
+
+    :param user_id: ID of the user the quiz is generated for
+    :param quiz_generated: Quiz returned by the quiz agent
+    :return: Tuple of the quiz row and its question rows
+    """
+    quiz_id = uuid4()
+    quiz_row = {
+        "id": quiz_id,
+        "generated_by_user_id": user_id,
+        "title": quiz_generated.get("quiz_title"),
+        "description": quiz_generated.get("quiz_description"),
+    }
+    question_rows = [
+        {
+            "id": uuid4(),
+            "quiz_id": quiz_id,
+            "question_text": question_data.get("question"),
+            "possible_answers": question_data.get("possible_answers"),
+            "question_type": question_data.get("question_type"),
+            "correct_answer": question_data.get("correct_answer"),
+        } for question_data in quiz_generated.get("questions", [])
+    ]
+    return quiz_row, question_rows
+
+
+async def insert_quizzes(db: AsyncSession, quizzes: list[tuple[dict, list[dict]]]) -> None:
+    """
+    Insert quizzes and their questions in the current transaction.
+
+    :param db: SQLAlchemy async session object
+    :param quizzes: Quiz and question rows, as built by ``build_quiz_rows``
+    """
+    quiz_rows = [quiz_row for quiz_row, _ in quizzes]
+    question_rows = [question_row for _, question_rows in quizzes for question_row in question_rows]
+    if quiz_rows:
+        await db.execute(insert(Quiz), quiz_rows)
+    if question_rows:
+        await db.execute(insert(Question), question_rows)
@@ -0,0 +1,119 @@
+"""
+Routing of the read-only endpoints to the read replica.
+
+Endpoints that only read, and do not need to see a write the same user just
+made, depend on ``get_async_read_db`` instead of ``get_async_db``. They get a
+replica session while the replica keeps up, and a primary session when no
+replica is configured, the replica is unreachable or it lags more than
+``DB_REPLICA_MAX_LAG_SECONDS``. The lag is checked at most every
+``DB_REPLICA_LAG_CHECK_SECONDS`` per worker.
+"""
+import asyncio
+import time
+from contextlib import asynccontextmanager
+from typing import Optional
+from sqlalchemy import text
+from database.connection import AsyncSessionLocal, ReplicaSessionLocal, replica_async_engine
+from logging_config import logger
+from settings import settings
+
+# Seconds the replica is behind, 0 when it replayed everything it received
+LAG_QUERY = text(
+    "SELECT CASE"
+    " WHEN NOT pg_is_in_recovery() THEN 0"
+    " WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0"
+    " ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)"
+    " END"
+)
+
+
+class ReplicaHealth:
+    """
+    Cached result of the replica lag check.
+    """
+    def __init__(self, engine, max_lag: float, check_interval: float):
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lag: Optional[float] = None
+        self.usable = False
+        self.checked_at = float("-inf")
+        self.replica_sessions = 0
+        self.fallbacks = 0
+        self._lock = asyncio.Lock()
+
+    async def _measure_lag(self) -> float:
+        async with self.engine.connect() as connection:
+            return float((await connection.execute(LAG_QUERY)).scalar())
+
+    async def _check(self) -> None:
+        try:
+            # Bounds the pool checkout and the connect too, an unreachable replica would otherwise
+            # hang for the TCP connect timeout
+            self.lag = await asyncio.wait_for(self._measure_lag(), self.check_interval)
+            usable = self.lag <= self.max_lag
+        except asyncio.TimeoutError:
+            logger.warning("Read replica lag check timed out after %ss", self.check_interval)
+            self.lag, usable = None, False
+        except Exception as e:
+            logger.warning("Read replica lag check failed: %s", e)
+            self.lag, usable = None, False
+        if usable != self.usable:
+            if usable:
+                logger.info("Read replica back in use, lag %.3fs", self.lag)
+            else:
+                logger.warning("Read replica unusable (lag %ss), reading from the primary", self.lag)
+        self.usable = usable
+        self.checked_at = time.monotonic()
+
+    async def is_usable(self) -> bool:
+        """
+        Return whether reads can go to the replica, re-checking the lag when the last check is too old.
+
+        Only one request runs the check, the others keep the previous result instead of waiting for it.
+        """
+        if time.monotonic() - self.checked_at >= self.check_interval and not self._lock.locked():
+            async with self._lock:
+                # Another request may have checked while this one waited for the lock
+                if time.monotonic() - self.checked_at >= self.check_interval:
+                    await self._check()
+        return self.usable
+
+    def snapshot(self) -> dict:
+        return {
+            "usable": self.usable,
+            "lag_seconds": self.lag,
+            "max_lag_seconds": self.max_lag,
+            "replica_sessions": self.replica_sessions,
+            "primary_fallbacks": self.fallbacks,
+        }
+
+
+replica_health = (
+    ReplicaHealth(replica_async_engine, settings.DB_REPLICA_MAX_LAG_SECONDS, settings.DB_REPLICA_LAG_CHECK_SECONDS)
+    if replica_async_engine is not None else None
+)
+
+
+@asynccontextmanager
+async def read_session():
+    """
+    Open a session for reads, on the replica when it is usable and on the primary otherwise.
+    """
+    if replica_health is not None:
+        if await replica_health.is_usable():
+            replica_health.replica_sessions += 1
+            async with ReplicaSessionLocal() as db:
+                yield db
+            return
+        replica_health.fallbacks += 1
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+async def get_async_read_db():
+    """
+    Session dependency of the read-only endpoints, see ``read_session``.
+    """
+    async with read_session() as db:
+        yield db
@@ -0,0 +1,79 @@
+"""
+Statements creating user accounts.
+
+A user is the pair of a ``users`` row and its ``user_auths`` row. Both are
+written by one statement: the ``user_auths`` insert resolves a taken
+username with ``ON CONFLICT DO NOTHING`` and the ``users`` row is only
+inserted for the accounts whose credentials were stored. The foreign key
+of ``user_auths`` is checked at the end of the statement, when the
+``users`` rows exist.
+"""
+from uuid import UUID
+from sqlalchemy import Table, Column, String, SmallInteger, MetaData, select, literal
+from sqlalchemy.dialects.postgresql import insert as pg_insert, UUID as PG_UUID
+from database.models import User, UserAuth
+
+# Temporary table the bulk provisioning COPYs the hashed accounts into
+staging_users = Table(
+    "provision_staging", MetaData(),
+    Column("id", PG_UUID(as_uuid=True)),
+    Column("full_name", String(255)),
+    Column("age", SmallInteger),
+    Column("username", String(100)),
+    Column("password", String(255)),
+)
+STAGING_DDL = (
+    "CREATE TEMPORARY TABLE provision_staging "
+    "(id uuid, full_name varchar(255), age smallint, username varchar(100), password varchar(255)) "
+    "ON COMMIT DROP"
+)
+
+
+def _create_users_statement(accounts):
+    """
+    :param accounts: Selectable with the ``id``, ``full_name``, ``age``, ``username`` and ``password`` of the accounts
+    :return: Statement returning the ``user_id`` and ``username`` of the created accounts
+    """
+    auths = (
+        pg_insert(UserAuth)
+        .from_select(["user_id", "username", "password"], select(accounts.c.id, accounts.c.username, accounts.c.password))
+        .on_conflict_do_nothing(index_elements=[UserAuth.username])
+        .returning(UserAuth.user_id, UserAuth.username)
+        .cte("auths")
+    )
+    users = (
+        pg_insert(User)
+        .from_select(
+            ["id", "full_name", "age"],
+            select(accounts.c.id, accounts.c.full_name, accounts.c.age).join(auths, auths.c.user_id == accounts.c.id)
+        )
+        .returning(User.id)
+        .cte("created_users")
+    )
+    return select(auths.c.user_id, auths.c.username).add_cte(users)
+
+
+def create_user_statement(user_id: UUID, full_name: str, age: int, username: str, hashed_password: str):
+    """
+    Create one account in a single statement.
+
+    :return: Statement returning the ``user_id`` and ``username``, no row if the username is taken
+    """
+    account = select(
+        literal(user_id, PG_UUID(as_uuid=True)).label("id"),
+        literal(full_name, String).label("full_name"),
+        literal(age, SmallInteger).label("age"),
+        literal(username, String).label("username"),
+        literal(hashed_password, String).label("password"),
+    ).cte("account")
+    return _create_users_statement(account)
+
+
+def create_staged_users_statement():
+    """
+    Create the accounts loaded into ``provision_staging``.
+
+    :return: Statement returning the ``user_id`` and ``username`` of the created accounts,
+        the staged accounts missing from the result have a taken username
+    """
+    return _create_users_statement(staging_users)
@@ -0,0 +1,69 @@
+"""
+Background sweeper grading the quiz attempts users abandoned.
+
+Expired, incomplete attempts of all users are selected in one query and
+graded set-based with ``database.grading``, which also updates
+``user_collections`` for the whole batch. Attempts are locked with
+``SKIP LOCKED`` so several workers can sweep at the same time.
+
+Usage (one sweep, outside of the app):
+    python -m jobs.abandonedQuizSweeper
+"""
+import asyncio
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import AsyncSessionLocal
+from database.grading import grade_attempts_statement
+from database.models import QuizAttempt, func
+from logging_config import logger
+from settings import settings
+from utils.leaderboard import leaderboard
+
+
+async def sweep_batch(db: AsyncSession, batch_size: int) -> int:
+    """
+    Grade one batch of abandoned attempts.
+
+    :param db: SQLAlchemy async session object
+    :param batch_size: Maximum number of attempts graded in the batch
+    :return: Number of attempts graded
+    """
+    expired_attempts = (
+        select(QuizAttempt.id, QuizAttempt.quiz_id, QuizAttempt.user_id)
+        .where(
+            QuizAttempt.is_completed == False,
+            QuizAttempt.expired_at < func.now()
+        )
+        .order_by(QuizAttempt.expired_at)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)
+    )
+    graded = (await db.execute(grade_attempts_statement(expired_attempts))).all()
+    await db.commit()
+    for attempt in graded:
+        leaderboard.update(attempt.user_id, attempt.total_points, attempt.full_name)
+    return len(graded)
+
+
+async def sweep_abandoned_attempts(batch_size: int = None) -> int:
+    """
+    Grade every abandoned attempt, batch by batch, until none is left.
+
+    :param batch_size: Maximum number of attempts graded per statement
+    :return: Total number of attempts graded
+    """
+    batch_size = batch_size or settings.QUIZ_SWEEP_BATCH_SIZE
+    total = 0
+    async with AsyncSessionLocal() as db:
+        while True:
+            graded = await sweep_batch(db, batch_size)
+            total += graded
+            if graded < batch_size:
+                break
+    if total:
+        logger.info("Abandoned quiz sweep graded %s attempts", total)
+    return total
+
+
+if __name__ == "__main__":
+    asyncio.run(sweep_abandoned_attempts())
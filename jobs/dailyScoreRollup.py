@@ -0,0 +1,160 @@
+"""
+Rollup of the completed quiz attempts into ``daily_scores``.
+
+Each run picks up the attempts completed since the watermark stored in
+``job_watermarks``, recomputes the score of every (user, day) pair they
+touch from all attempts of that day, and upserts the pairs set-based. The
+watermark advances in the same transaction as the upsert, so a failed run
+is simply repeated.
+
+The watermark stops ``DAILY_SCORE_ROLLUP_LAG_SECONDS`` in the past: an
+attempt is stamped with the start of its grading transaction, which may
+commit slightly after a later timestamp was already rolled up.
+
+Usage:
+    python -m jobs.dailyScoreRollup               # incremental, from the watermark
+    python -m jobs.dailyScoreRollup --backfill    # every completed attempt, window by window
+"""
+import argparse
+import asyncio
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import select, and_, cast, func, Date, Integer
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import AsyncSessionLocal
+from database.models import QuizAttempt, DailyScore, JobWatermark
+from logging_config import logger
+from settings import settings
+
+JOB_NAME = "daily_score_rollup"
+# Transaction level advisory lock, only one worker rolls up at a time
+ADVISORY_LOCK_ID = 3_702_117
+
+
+def rollup_statement(since: Optional[datetime], until: datetime):
+    """
+    Build the upsert of the daily scores touched by the attempts completed in ``(since, until]``.
+
+    :param since: Exclusive lower bound of ``completed_at``, None for no bound
+    :param until: Inclusive upper bound of ``completed_at``
+    :return: Upsert statement
+    """
+    conditions = [QuizAttempt.is_completed == True, QuizAttempt.completed_at <= until]
+    if since is not None:
+        conditions.append(QuizAttempt.completed_at > since)
+    touched = (
+        select(QuizAttempt.user_id, cast(QuizAttempt.completed_at, Date).label("date"))
+        .where(*conditions)
+        .distinct()
+        .cte("touched")
+    )
+    # Range on completed_at instead of a cast, so the attempts of a day come from the index
+    day_scores = (
+        select(
+            func.gen_random_uuid(),
+            touched.c.user_id,
+            touched.c.date,
+            cast(func.floor(func.coalesce(func.avg(QuizAttempt.score), 0)), Integer)
+        )
+        .select_from(touched.join(QuizAttempt, and_(
+            QuizAttempt.user_id == touched.c.user_id,
+            QuizAttempt.is_completed == True,
+            QuizAttempt.completed_at >= touched.c.date,
+            QuizAttempt.completed_at < touched.c.date + 1
+        )))
+        .group_by(touched.c.user_id, touched.c.date)
+    )
+    upsert = pg_insert(DailyScore).from_select(["id", "user_id", "date", "score"], day_scores)
+    return upsert.on_conflict_do_update(
+        index_elements=[DailyScore.user_id, DailyScore.date],
+        set_={"score": upsert.excluded.score}
+    )
+
+
+def _watermark_statement(watermark: datetime):
+    upsert = pg_insert(JobWatermark).values(name=JOB_NAME, watermark=watermark)
+    return upsert.on_conflict_do_update(
+        index_elements=[JobWatermark.name],
+        set_={"watermark": upsert.excluded.watermark}
+    )
+
+
+async def _rollup_window(db: AsyncSession, since: Optional[datetime], until: datetime) -> Optional[int]:
+    """
+    Roll up one window and move the watermark to its end in a single transaction.
+
+    :return: Number of upserted daily scores, None if another worker holds the lock
+    """
+    locked = (await db.execute(select(func.pg_try_advisory_xact_lock(ADVISORY_LOCK_ID)))).scalar()
+    if not locked:
+        await db.rollback()
+        return None
+    result = await db.execute(rollup_statement(since, until))
+    await db.execute(_watermark_statement(until))
+    await db.commit()
+    return result.rowcount
+
+
+async def _upper_bound(db: AsyncSession) -> datetime:
+    return (await db.execute(
+        select(func.localtimestamp() - timedelta(seconds=settings.DAILY_SCORE_ROLLUP_LAG_SECONDS))
+    )).scalar()
+
+
+async def rollup_daily_scores() -> int:
+    """
+    Roll up the attempts completed since the watermark.
+
+    :return: Number of upserted daily scores
+    """
+    async with AsyncSessionLocal() as db:
+        since = (await db.execute(
+            select(JobWatermark.watermark).where(JobWatermark.name == JOB_NAME)
+        )).scalar()
+        until = await _upper_bound(db)
+        if since is not None and until <= since:
+            return 0
+        upserted = await _rollup_window(db, since, until)
+    if upserted:
+        logger.info("Daily score rollup upserted %s daily scores up to %s", upserted, until)
+    return upserted or 0
+
+
+async def backfill_daily_scores(window_days: int = 30) -> int:
+    """
+    Recompute the daily scores of every completed attempt, ``window_days`` of completions per transaction.
+
+    :param window_days: Days of completed attempts rolled up per transaction
+    :return: Number of upserted daily scores
+    """
+    total = 0
+    async with AsyncSessionLocal() as db:
+        first = (await db.execute(select(func.min(QuizAttempt.completed_at)))).scalar()
+        final = await _upper_bound(db)
+        if first is None:
+            logger.info("Daily score backfill found no completed attempts")
+            return 0
+        since, window = None, timedelta(days=window_days)
+        until = min(first + window, final)
+        while True:
+            upserted = await _rollup_window(db, since, until)
+            if upserted is None:
+                raise RuntimeError("Another worker is rolling up the daily scores, retry the backfill later")
+            total += upserted
+            logger.info("Daily score backfill upserted %s daily scores up to %s", upserted, until)
+            if until >= final:
+                break
+            since, until = until, min(until + window, final)
+    return total
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Roll up completed quiz attempts into daily_scores")
+    parser.add_argument("--backfill", action="store_true", help="recompute every day instead of starting at the watermark")
+    parser.add_argument("--window-days", type=int, default=30, help="days of attempts per backfill transaction")
+    args = parser.parse_args()
+    if args.backfill:
+        asyncio.run(backfill_daily_scores(args.window_days))
+    else:
+        asyncio.run(rollup_daily_scores())
@@ -0,0 +1,32 @@
+"""
+Periodic rebuild of the in-memory leaderboard from ``user_collections``.
+
+The incremental updates of a worker only cover the attempts it graded, the
+rebuild brings in the points earned through the other workers.
+"""
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+from database.connection import AsyncSessionLocal
+from database.models import User, UserCollection
+from logging_config import logger
+from utils.leaderboard import leaderboard
+
+
+async def refresh_leaderboard() -> int:
+    """
+    Reload the points of every user and rebuild the leaderboard.
+
+    :return: Number of ranked users
+    """
+    leaderboard.begin_refresh()
+    async with AsyncSessionLocal() as db:
+        # Ordered by the database, the board is built without sorting in Python
+        rows = (await db.execute(
+            select(UserCollection.user_id, User.full_name, UserCollection.point_earned)
+            .join(User, User.id == UserCollection.user_id)
+            .order_by(UserCollection.point_earned.desc(), UserCollection.user_id)
+        )).all()
+    # Building a large board is CPU bound, keep it off the event loop
+    await run_in_threadpool(leaderboard.replace, rows)
+    logger.info("Leaderboard refreshed with %s users", len(rows))
+    return len(rows)
@@ -0,0 +1,16 @@
+"""
+Periodic publication of the metrics of this worker to ``MULTIPROCESS_DIR``.
+
+``/metrics`` is served by whichever worker accepts the scrape, it publishes
+its own metrics and reads the last ones published by the other workers.
+"""
+from starlette.concurrency import run_in_threadpool
+from settings import settings
+from utils.metrics import registry
+
+
+async def publish_metrics() -> None:
+    """
+    Write the metrics of this worker to the shared directory.
+    """
+    await run_in_threadpool(registry.publish, settings.MULTIPROCESS_DIR)
@@ -0,0 +1,63 @@
+"""
+Provision a cohort of user accounts from a CSV or JSON Lines file.
+
+The CSV needs a header with ``full_name``, ``username``, ``password`` and
+``age``, JSON Lines one object with the same keys per line. The result of
+every account is written as JSON Lines to ``--report`` (stdout by default).
+
+Usage:
+    python -m jobs.provisionUsers cohort.csv --batch-size 5000 --report report.jsonl
+"""
+import argparse
+import asyncio
+import csv
+import json
+import sys
+from pathlib import Path
+from pydantic import ValidationError
+from controllers.asyncProvisioningController import provision_users
+from database.connection import AsyncSessionLocal, async_engine
+from schemas.usersSchema import CreateUserRequest, ProvisionResult
+from utils.passwordHashing import shutdown_executor
+from logging_config import logger
+
+
+def read_accounts(path: Path) -> list[dict]:
+    with path.open(newline="", encoding="utf-8") as file:
+        if path.suffix.lower() == ".csv":
+            return list(csv.DictReader(file))
+        return [json.loads(line) for line in file if line.strip()]
+
+
+async def main(path: Path, batch_size: int, report) -> None:
+    rows = read_accounts(path)
+    valid, results = [], []
+    for index, row in enumerate(rows):
+        try:
+            valid.append((index, CreateUserRequest(**row)))
+        except (ValidationError, TypeError) as e:
+            results.append(ProvisionResult(index=index, username=row.get("username"), status="invalid", detail=str(e)))
+    try:
+        for start in range(0, len(valid), batch_size):
+            batch = valid[start:start + batch_size]
+            async with AsyncSessionLocal() as db:
+                response = await provision_users(db, [account for _, account in batch])
+            # Map the positions in the batch back to the lines of the file
+            for result in response.results:
+                results.append(result.model_copy(update={"index": batch[result.index][0]}))
+    finally:
+        shutdown_executor()
+        await async_engine.dispose()
+    for result in sorted(results, key=lambda result: result.index):
+        report.write(result.model_dump_json() + "\n")
+    created = sum(result.status == "created" for result in results)
+    logger.info("Provisioned %s of %s accounts from %s", created, len(rows), path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("path", type=Path)
+    parser.add_argument("--batch-size", type=int, default=5000, help="accounts created per transaction")
+    parser.add_argument("--report", type=argparse.FileType("w"), default=sys.stdout)
+    args = parser.parse_args()
+    asyncio.run(main(args.path, args.batch_size, args.report))
@@ -0,0 +1,43 @@
+import asyncio
+from typing import Awaitable, Callable
+from logging_config import logger
+
+
+async def run_periodically(name: str, interval: float, job: Callable[[], Awaitable[None]]) -> None:
+    """
+    Run ``job`` every ``interval`` seconds until the task is cancelled.
+
+    A failing run is logged and retried at the next interval, it never stops the loop.
+
+    :param name: Name of the job used in the logs
+    :param interval: Seconds between the end of a run and the start of the next one
+    :param job: Coroutine function running one iteration of the job
+    """
+    logger.info("Scheduled job %s every %s seconds", name, interval)
+    while True:
+        try:
+            await job()
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logger.exception("Scheduled job %s failed: %s", name, e)
+        await asyncio.sleep(interval)
+
+
+def start_jobs(jobs: list[tuple[str, float, Callable[[], Awaitable[None]]]]) -> list[asyncio.Task]:
+    """
+    Start the periodic jobs as background tasks of the running event loop.
+
+    :param jobs: Tuples of name, interval and coroutine function
+    :return: Started tasks, to be cancelled with ``stop_jobs``
+    """
+    return [asyncio.create_task(run_periodically(name, interval, job), name=name) for name, interval, job in jobs]
+
+
+async def stop_jobs(tasks: list[asyncio.Task]) -> None:
+    """
+    Cancel the periodic jobs and wait for them to finish.
+    """
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,110 @@
+"""
+Production entry point: uvicorn with one worker process per core.
+
+Each worker runs the app on uvloop with the httptools HTTP parser when
+they are installed. The supervisor process handles the signals of
+uvicorn's multiprocess manager:
+
+* ``SIGHUP`` restarts the workers one after the other, e.g. after a
+  deploy or a change of ``.env``, while the socket keeps accepting;
+* ``SIGTTIN`` / ``SIGTTOU`` add or remove a worker;
+* ``SIGTERM`` / ``SIGINT`` stop the workers, letting in-flight requests
+  finish for ``WEB_GRACEFUL_SHUTDOWN_SECONDS``.
+
+Behind a reverse proxy, ``FORWARDED_ALLOW_IPS`` lists the proxies whose
+``X-Forwarded-For`` header gives the client address of a request.
+
+Every worker has its own connection pools (``DB_POOL_SIZE`` +
+``DB_MAX_OVERFLOW``) and password hashing processes, so both are sized
+per worker. The state kept in memory is per worker too:
+
+* the auth rate limiters enforce their share of the limits, the worker
+  count is passed to the workers as ``WEB_WORKER_COUNT`` (workers added
+  with ``SIGTTIN`` later keep the share computed at start);
+* the Prometheus metrics and the finished profiles are published to
+  ``MULTIPROCESS_DIR``, a temporary directory unless configured, so
+  ``/metrics`` and the profile endpoints cover every worker;
+* the leaderboard catches up with the points earned through the other
+  workers at its next rebuild (``LEADERBOARD_REFRESH_SECONDS``);
+* only the console log is written, a shared ``LOG_FILE`` would be rotated
+  by every worker at once.
+
+Usage:
+    python launcher.py
+    python launcher.py --workers 4 --port 8000
+"""
+import argparse
+import atexit
+import importlib.util
+import os
+import shutil
+import tempfile
+from glob import glob
+import uvicorn
+from settings import settings
+
+
+def available_cores() -> int:
+    """
+    Number of cores this process may run on, honouring CPU affinity (e.g. ``docker --cpuset-cpus``).
+    """
+    try:
+        return len(os.sched_getaffinity(0))
+    except AttributeError:
+        return os.cpu_count() or 1
+
+
+def server_options(workers: int, host: str, port: int) -> dict:
+    """
+    Keyword arguments of ``uvicorn.run`` for a production server.
+    """
+    return {
+        "host": host,
+        "port": port,
+        "workers": workers,
+        "loop": "uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        "http": "httptools" if importlib.util.find_spec("httptools") else "h11",
+        "backlog": settings.WEB_BACKLOG,
+        "timeout_keep_alive": settings.WEB_KEEPALIVE_SECONDS,
+        "timeout_graceful_shutdown": settings.WEB_GRACEFUL_SHUTDOWN_SECONDS,
+        # The client address of a request coming through a trusted proxy is taken from X-Forwarded-For
+        "proxy_headers": True,
+        "forwarded_allow_ips": settings.FORWARDED_ALLOW_IPS,
+        "log_level": "info",
+    }
+
+
+def multiprocess_dir() -> str:
+    """
+    Prepare the directory the workers share, emptied of the files of a previous run.
+    """
+    if not settings.MULTIPROCESS_DIR:
+        directory = tempfile.mkdtemp(prefix="app-workers-")
+        atexit.register(shutil.rmtree, directory, ignore_errors=True)
+        return directory
+    os.makedirs(settings.MULTIPROCESS_DIR, exist_ok=True)
+    for path in glob(os.path.join(settings.MULTIPROCESS_DIR, "metrics-*.json*")) + glob(
+            os.path.join(settings.MULTIPROCESS_DIR, "profile-*.json*")):
+        os.remove(path)
+    return settings.MULTIPROCESS_DIR
+
+
+def main(workers: int, host: str, port: int) -> None:
+    workers = workers or available_cores()
+    if not settings.PASSWORD_HASH_WORKERS:
+        # One hashing process per core in total, not per worker
+        os.environ["PASSWORD_HASH_WORKERS"] = str(max(available_cores() // workers, 1))
+    if workers > 1:
+        # Read by the workers when they import the settings
+        os.environ["WEB_WORKER_COUNT"] = str(workers)
+        os.environ["MULTIPROCESS_DIR"] = multiprocess_dir()
+    uvicorn.run("main:app", **server_options(workers, host, port))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--workers", type=int, default=settings.WEB_WORKERS, help="0 for one per core")
+    parser.add_argument("--host", default=settings.WEB_HOST)
+    parser.add_argument("--port", type=int, default=settings.WEB_PORT)
+    args = parser.parse_args()
+    main(args.workers, args.host, args.port)
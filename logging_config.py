@@ -1,15 +1,142 @@
+"""
+Logging of the application.
+
+Records are put on an in-memory queue by a ``QueueHandler`` and written to
+the console and a size-rotated file by a ``QueueListener`` thread, so a
+request never waits for log I/O. Messages use lazy %-style arguments: a
+record dropped by the level or by sampling is never formatted, and the
+JSON encoding happens on the listener thread.
+
+``LOG_SAMPLING`` keeps only a share of the INFO and DEBUG records of busy
+loggers (e.g. ``httpx`` logs every outbound request). Warnings and errors
+are always kept.
+"""
+import atexit
+import copy
+import json
 import logging
+import queue
+import random
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
+from typing import Optional
+from settings import settings
+
+# Attributes of every LogRecord, anything else was passed with ``extra=``
+_RECORD_ATTRIBUTES = set(vars(logging.makeLogRecord({}))) | {"message", "asctime", "taskName"}
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Format a record as one JSON object per line, with the ``extra`` fields of the record.
+    """
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "time": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        entry.update({key: value for key, value in vars(record).items() if key not in _RECORD_ATTRIBUTES})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keep a share of the INFO and DEBUG records of the loggers in ``rates`` (child loggers included).
+    """
+    def __init__(self, rates: dict[str, float]):
+        super().__init__()
+        self.rates = rates
+        self.dropped = 0
+
+    def _rate_of(self, name: str) -> Optional[float]:
+        while name:
+            if name in self.rates:
+                return self.rates[name]
+            name = name.rpartition(".")[0]
+        return None
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > logging.INFO:
+            return True
+        rate = self._rate_of(record.name)
+        if rate is None or random.random() < rate:
+            return True
+        self.dropped += 1
+        return False
+
+
+class _ThreadQueueHandler(QueueHandler):
+    """
+    Queue handler for a listener thread of the same process.
+
+    Only the message is rendered on the calling thread, to capture the arguments as they are now.
+    Unlike ``QueueHandler``, the exception is kept as is for the formatter of the listener thread.
+    """
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        record.msg, record.args = record.message, None
+        return record
+
+
+def parse_sampling(value: str) -> dict[str, float]:
+    """
+    Parse ``LOG_SAMPLING`` (``name=rate,name=rate``) into rates by logger name.
+    """
+    rates = {}
+    for item in filter(None, (part.strip() for part in value.split(","))):
+        name, _, rate = item.partition("=")
+        rates[name.strip()] = min(max(float(rate), 0.0), 1.0)
+    return rates
+
+
+def queued(handlers: list[logging.Handler], sampling: dict[str, float]) -> tuple[QueueHandler, QueueListener]:
+    """
+    Put ``handlers`` behind a queue, the listener has to be started.
+
+    :param handlers: Handlers doing the actual I/O, run by the listener thread
+    :param sampling: Rates of the sampled loggers, see ``SamplingFilter``
+    :return: Handler to attach to a logger and the listener writing its records
+    """
+    queue_handler = _ThreadQueueHandler(queue.SimpleQueue())
+    queue_handler.addFilter(SamplingFilter(sampling))
+    return queue_handler, QueueListener(queue_handler.queue, *handlers, respect_handler_level=True)
+
+
+def setup_logging(log_file: Optional[str] = settings.LOG_FILE) -> logging.Logger:
+    """
+    Route every record through a queue to the console and, when ``log_file`` is set, a rotating file.
+
+    :param log_file: Path of the log file, None to only log to the console
+    :return: The application logger
+    """
+    if settings.LOG_FORMAT == "json":
+        formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter('%(asctime)s - %(levelname)s - %(message)s')
+    handlers = [logging.StreamHandler()]
+    if log_file:
+        handlers.append(RotatingFileHandler(
+            log_file, maxBytes=settings.LOG_MAX_BYTES, backupCount=settings.LOG_BACKUP_COUNT, encoding="utf-8"
+        ))
+    for handler in handlers:
+        handler.setFormatter(formatter)
+
+    queue_handler, listener = queued(handlers, parse_sampling(settings.LOG_SAMPLING))
+    listener.start()
+    # Flush the queue on interpreter exit
+    atexit.register(listener.stop)
 
-def setup_logging(log_file='app.log'):
-    logging.basicConfig(
-        level=logging.INFO,
-        format='%(asctime)s - %(levelname)s - %(message)s',
-        handlers=[
-            logging.StreamHandler(),
-            logging.FileHandler(log_file)
-        ],
-        encoding='utf-8'
-    )
+    root = logging.getLogger()
+    root.handlers[:] = [queue_handler]
+    root.setLevel(settings.LOG_LEVEL.upper())
     return logging.getLogger("AppLogger")
 
-logger = setup_logging()
\ No newline at end of file
+# Several workers would each rotate the same file under the others, they only log to the console
+logger = setup_logging(settings.LOG_FILE if settings.WEB_WORKER_COUNT <= 1 else None)
@@ -1,13 +1,67 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
-from routes import users_router, mood_detection_router, chat_router, quiz_router
+import anyio.to_thread
+from starlette.concurrency import run_in_threadpool
+from routes import users_router, mood_detection_router, chat_router, quiz_router, metrics_router, prometheus_router, leaderboard_router, admin_router
+from routes.middleware.metrics import MetricsMiddleware
+from routes.middleware.profiling import ProfilingMiddleware
+from database.connection import async_engine, engine, replica_async_engine
+from jobs.scheduler import start_jobs, stop_jobs
+from jobs.abandonedQuizSweeper import sweep_abandoned_attempts
+from jobs.leaderboardRefresh import refresh_leaderboard
+from jobs.dailyScoreRollup import rollup_daily_scores
+from jobs.metricsPublish import publish_metrics
+from utils.metrics import registry
+from utils.httpClient import open_client, close_client
+from utils.passwordHashing import start_executor, shutdown_executor
+from settings import settings
+from logging_config import logger
 from pydantic import BaseModel
-import uvicorn
 
 class HealthResponse(BaseModel):
     status: str
 
-app = FastAPI()
+def warm_up() -> None:
+    """
+    Build the LLM clients and the compiled quiz graph ahead of the first request.
+    """
+    from nodes.chatAzure import chat_azure
+    from nodes.quizAiAgent import quiz_agent
+    chat_azure.llm
+    quiz_agent.llm
+    quiz_agent.quiz_agent
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Sync routes and run_in_threadpool share this limiter
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.WEB_THREADPOOL_SIZE
+    open_client()
+    await start_executor()
+    if settings.EAGER_STARTUP:
+        logger.info("Eager startup, warming up the AI clients")
+        await run_in_threadpool(warm_up)
+    jobs = [("leaderboard-refresh", settings.LEADERBOARD_REFRESH_SECONDS, refresh_leaderboard)]
+    if settings.QUIZ_SWEEP_ENABLED:
+        jobs.append(("abandoned-quiz-sweeper", settings.QUIZ_SWEEP_INTERVAL_SECONDS, sweep_abandoned_attempts))
+    if settings.DAILY_SCORE_ROLLUP_ENABLED:
+        jobs.append(("daily-score-rollup", settings.DAILY_SCORE_ROLLUP_INTERVAL_SECONDS, rollup_daily_scores))
+    if settings.MULTIPROCESS_DIR:
+        jobs.append(("metrics-publish", settings.MULTIPROCESS_PUBLISH_SECONDS, publish_metrics))
+    tasks = start_jobs(jobs)
+    yield
+    await stop_jobs(tasks)
+    if settings.MULTIPROCESS_DIR:
+        # Keep the final counts of this worker in the totals of /metrics
+        registry.publish(settings.MULTIPROCESS_DIR)
+    shutdown_executor()
+    await close_client()
+    await async_engine.dispose()
+    if replica_async_engine is not None:
+        await replica_async_engine.dispose()
+    engine.dispose()
+
+app = FastAPI(lifespan=lifespan)
 
 origins = ["*"]
 
@@ -18,15 +72,22 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(MetricsMiddleware)
+app.add_middleware(ProfilingMiddleware)
 prefix = "/api/v1"
 app.include_router(router=users_router, prefix=f"{prefix}", tags=["auth"])
 app.include_router(router=mood_detection_router, prefix=f"{prefix}/mood", tags=["mood-detection"])
 app.include_router(router=chat_router, prefix=f"{prefix}/chat", tags=["chat"])
 app.include_router(router=quiz_router, prefix=f"{prefix}/quiz", tags=["quiz"])
+app.include_router(router=leaderboard_router, prefix=f"{prefix}/leaderboard", tags=["leaderboard"])
+app.include_router(router=admin_router, prefix=f"{prefix}/admin", tags=["admin"])
+app.include_router(router=metrics_router, prefix=f"{prefix}/metrics", tags=["metrics"])
+app.include_router(router=prometheus_router, tags=["metrics"])
 
 @app.get("/", response_model=HealthResponse)
 async def health():
     return HealthResponse(status="Ok")
 
 if __name__ == "__main__":
-    uvicorn.run("main:app", host="0.0.0.0", port=80, log_level="info")
\ No newline at end of file
+    from launcher import main as launch
+    launch(settings.WEB_WORKERS, settings.WEB_HOST, settings.WEB_PORT)
@@ -1,11 +1,8 @@
-from langchain_openai import AzureChatOpenAI
-from langchain.prompts import PromptTemplate
-import os
-from dotenv import load_dotenv
+from functools import cached_property
 from typing import TypedDict, Optional
 from pydantic import BaseModel, Field
 from logging_config import logger
-load_dotenv()
+from settings import settings
 
 class ChatAzureMentalCareResponse(BaseModel):
     response: str = Field(description="Response from the Azure mental care chat model")
@@ -26,13 +23,18 @@ class ChatAzureMentalCareRequest(TypedDict):
 
 
 class ChatAzureMentalCare():
-    def __init__(self):
-        self.llm =  AzureChatOpenAI(
+    @cached_property
+    def llm(self):
+        """
+        Azure OpenAI client, created on first use to keep imports side-effect free.
+        """
+        from langchain_openai import AzureChatOpenAI
+        return AzureChatOpenAI(
             deployment_name="gpt-4.1",
             model="gpt-4.1",
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+            api_key=settings.AZURE_OPENAI_API_KEY,
+            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+            api_version=settings.AZURE_OPENAI_API_VERSION,
             temperature=0.5,
             max_tokens=5000
         )
@@ -82,6 +84,7 @@ class ChatAzureMentalCare():
 
             NOTE: If the user asking for non-mental care related questions, please answer them in a concise manner that you are a mental care assistant and you can only answer mental care related questions.
             """
+            from langchain_core.prompts import PromptTemplate
             mental_care_prompt = PromptTemplate(
                 input_variables=["user_name", "current_mood", "message_history", "message", "notes", "user_condition_summary"],
                 template=mental_care_prompt_template
@@ -100,7 +103,7 @@ class ChatAzureMentalCare():
             
             return response
         except Exception as e:
-            logger.error(f"Error in chat method: {str(e)}")
+            logger.error("Error in chat method: %s", e)
             return None
         
     
@@ -1,14 +1,9 @@
-from langchain_openai import AzureChatOpenAI
-from langchain.prompts import PromptTemplate
-import os
-from dotenv import load_dotenv
+from functools import cached_property
 from typing import TypedDict, Optional, Literal
 from logging_config import logger
 import random
 from pydantic import BaseModel, Field
-from langgraph.graph import StateGraph, END
-
-load_dotenv()
+from settings import settings
 
 class PossibleOptions(TypedDict):
     A: str
@@ -48,19 +43,31 @@ class QuestionModel(BaseModel):
     )
 
 class QuizAiAgent:
-    def __init__(self):
-        self.llm = AzureChatOpenAI(
+    @cached_property
+    def llm(self):
+        """
+        Azure OpenAI client, created on first use to keep imports side-effect free.
+        """
+        from langchain_openai import AzureChatOpenAI
+        return AzureChatOpenAI(
             deployment_name="gpt-4.1",
             model="gpt-4.1",
-            api_key=os.getenv("AZURE_OPENAI_API_KEY"),
-            azure_endpoint=os.getenv("AZURE_OPENAI_ENDPOINT"),
-            api_version=os.getenv("AZURE_OPENAI_API_VERSION"),
+            api_key=settings.AZURE_OPENAI_API_KEY,
+            azure_endpoint=settings.AZURE_OPENAI_ENDPOINT,
+            api_version=settings.AZURE_OPENAI_API_VERSION,
             temperature=0.5,
             max_tokens=5000
         )
-        self.quiz_agent = self._init_graph()
+
+    @cached_property
+    def quiz_agent(self):
+        """
+        Compiled LangGraph of the quiz generation, built on first use.
+        """
+        return self._init_graph()
 
     def _init_graph(self):
+        from langgraph.graph import StateGraph, END
         graph = StateGraph(QuizState)
         graph.add_node("theme_selection", lambda quiz_state: quiz_state)
         graph.add_node("process_mental_health", self._process_mental_health)
@@ -130,9 +137,9 @@ class QuizAiAgent:
             quiz_state["current_question"] += 1
         if quiz_state.get("total_questions") < quiz_state["current_question"]:
             return quiz_state
-        logger.info(f"Advancing to question {quiz_state['current_question']}")
+        logger.info("Advancing to question %s", quiz_state['current_question'])
         question_type = self._generate_question_type()
-        logger.info(f"Generated question type: {question_type}")
+        logger.info("Generated question type: %s", question_type)
         quiz_state["current_question_type"] = question_type
         return quiz_state
     
@@ -163,6 +170,7 @@ class QuizAiAgent:
             if the question_type is multiple_answer then you need to provide 4 possible answers (A, B, C, D) and at least two correct answers.
             and only two or three correct answers are allowed.
         """
+        from langchain_core.prompts import PromptTemplate
         generate_mental_health_quiz_prompt = PromptTemplate(
             input_variables=["user_condition_summary", "difficulty", "question_type", "questions_history"],
             template=generate_mental_health_quiz_prompt_template
@@ -177,7 +185,7 @@ class QuizAiAgent:
             "questions_history": "\n".join([q["question"] for q in quiz_state.get("questions", [])])
         })
         response_dict = response.model_dump()
-        logger.info(f"Generated question: {response_dict['question']}")
+        logger.debug("Generated question: %s", response_dict['question'])
         quiz_state["questions"].append({
             "question": response_dict["question"],
             "possible_answers": {
@@ -211,7 +219,7 @@ class QuizAiAgent:
             quiz_state["current_question"] = 1
         else:
             quiz_state["current_question"] += 1
-            logger.info(f"Advancing to question {quiz_state['current_question']}")
+            logger.info("Advancing to question %s", quiz_state['current_question'])
         if quiz_state.get("total_questions") < quiz_state["current_question"]:
             return quiz_state
         question_type = self._generate_question_type()
@@ -241,6 +249,7 @@ class QuizAiAgent:
             if the question_type is multiple_answer then you need to provide 4 possible answers (A, B, C, D) and at least two correct answers.
             and only two or three correct answers are allowed.
         """
+        from langchain_core.prompts import PromptTemplate
         generate_judi_online_quiz_prompt = PromptTemplate(
             input_variables=["difficulty", "question_type", "questions_history"],
             template=generate_judi_online_quiz_prompt_template
@@ -254,7 +263,7 @@ class QuizAiAgent:
             "questions_history": "\n".join([q["question"] for q in quiz_state.get("questions", [])])
         })
         response_dict = response.model_dump()
-        logger.info(f"Generated question: {response_dict['question']}")
+        logger.debug("Generated question: %s", response_dict['question'])
         quiz_state["questions"].append({
             "question": response_dict["question"],
             "possible_answers": {
@@ -295,6 +304,7 @@ class QuizAiAgent:
         This is the questions:
         {questions_history}
         """
+        from langchain_core.prompts import PromptTemplate
         generate_quiz_title_description_prompt = PromptTemplate(
             input_variables=["theme", "difficulty", "questions_history"],
             template=generate_quiz_title_description_prompt_template
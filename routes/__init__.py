@@ -1,4 +1,7 @@
 from .usersRoute import router as users_router
 from .moodDetectionRoute import router as mood_detection_router
 from .chatRoute import router as chat_router
-from .quizRoute import router as quiz_router
\ No newline at end of file
+from .quizRoute import router as quiz_router
+from .metricsRoute import router as metrics_router, prometheus_router
+from .leaderboardRoute import router as leaderboard_router
+from .adminRoute import router as admin_router
\ No newline at end of file
@@ -0,0 +1,53 @@
+from typing import List, Literal
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import get_async_db
+from schemas.usersSchema import BulkProvisionRequest, BulkProvisionResponse
+from schemas.metricsSchemas import ProfileSummary
+from controllers.asyncProvisioningController import provision_users
+from routes.middleware.auth import require_admin
+from routes.middleware.profiling import sampler
+
+router = APIRouter(dependencies=[Depends(require_admin)])
+
+# ****** Admin Endpoints ******
+@router.post("/users/bulk", status_code=200, response_model=BulkProvisionResponse)
+async def provision_users_endpoint(
+    data: BulkProvisionRequest,
+    db: AsyncSession = Depends(get_async_db)
+) -> BulkProvisionResponse:
+    """
+    Endpoint to create many user accounts at once.
+
+    :param data: Accounts to create
+    :param db: SQLAlchemy async session object
+    :return: Result of every account, a taken username only rejects its own account
+    """
+    try:
+        return await provision_users(db, data.users)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+@router.get("/profiles", status_code=200, response_model=List[ProfileSummary])
+async def list_profiles_endpoint() -> List[ProfileSummary]:
+    """
+    Endpoint to list the request profiles kept by the workers, newest first.
+
+    :return: Summary of each profile
+    """
+    return [ProfileSummary(**profile.summary()) for profile in sampler.list()]
+
+@router.get("/profiles/{profile_id}", status_code=200, response_class=PlainTextResponse)
+async def get_profile_endpoint(profile_id: str, kind: Literal["wall", "cpu"] = "wall") -> PlainTextResponse:
+    """
+    Endpoint to download a request profile as folded stacks, e.g. for ``flamegraph.pl`` or speedscope.
+
+    :param profile_id: ID returned in the ``X-Profile-Id`` header of the profiled request
+    :param kind: ``wall`` weighted by samples, ``cpu`` weighted by microseconds of CPU time
+    :return: One ``frame;frame;frame weight`` line per stack
+    """
+    profile = sampler.get(profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail="Profile not found")
+    return PlainTextResponse(profile.folded(kind))
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from schemas.leaderboardSchemas import LeaderboardResponse, MyRankResponse
+from controllers.leaderboardController import get_top, get_user_rank
+from routes.middleware.auth import get_user_id
+
+router = APIRouter()
+
+# ****** Leaderboard Endpoints ******
+@router.get("/top", status_code=200, response_model=LeaderboardResponse)
+async def leaderboard_top_endpoint(
+    limit: int = Query(10, ge=1, le=100),
+    user_id: str = Depends(get_user_id)
+) -> LeaderboardResponse:
+    """
+    Endpoint to get the users with the most points.
+
+    :param limit: Number of users to return
+    :param user_id: ID of the user making the request
+    :return: Top of the leaderboard
+    """
+    try:
+        return get_top(limit)
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
+
+@router.get("/me", status_code=200, response_model=MyRankResponse)
+async def leaderboard_me_endpoint(
+    radius: int = Query(5, ge=0, le=50),
+    user_id: str = Depends(get_user_id)
+) -> MyRankResponse:
+    """
+    Endpoint to get the rank of the user with its neighbors.
+
+    :param radius: Number of neighbors above and below the user
+    :param user_id: ID of the user making the request
+    :return: Rank of the user and the surrounding entries
+    """
+    try:
+        return get_user_rank(user_id, radius)
+    except ValueError as e:
+        raise HTTPException(status_code=503, detail=str(e)) from e
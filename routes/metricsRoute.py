@@ -0,0 +1,59 @@
+from fastapi import APIRouter, Depends
+from fastapi.responses import PlainTextResponse
+from starlette.concurrency import run_in_threadpool
+from database.poolMetrics import pool_metrics
+from database.replica import replica_health
+from routes.middleware.auth import require_admin
+from routes.middleware.rateLimit import auth_limiters
+from schemas.metricsSchemas import PoolMetricsResponse, RateLimitMetricsResponse
+from settings import settings
+from utils.metrics import registry
+
+# Admin only, the telemetry reveals traffic, pool sizing and the rate limits to get around
+router = APIRouter(dependencies=[Depends(require_admin)])
+# Served at the root as /metrics, where Prometheus scrapes by default, with the admin key as bearer token
+prometheus_router = APIRouter(dependencies=[Depends(require_admin)])
+
+# ****** Metrics Endpoints ******
+@router.get("/pool", status_code=200, response_model=PoolMetricsResponse)
+async def pool_metrics_endpoint() -> PoolMetricsResponse:
+    """
+    Endpoint to get the connection pool telemetry of this worker.
+
+    :return: Checkout wait time, checked out count, overflow usage and connection age of each pool, and the replica lag
+    """
+    pools = {name: metrics.snapshot() for name, metrics in pool_metrics.items()}
+    return PoolMetricsResponse(
+        pools=pools,
+        max_connections_per_worker=sum(
+            pool.get("pool_size", 0) + pool.get("max_overflow", 0) for pool in pools.values()
+        ),
+        replica=replica_health.snapshot() if replica_health is not None else None
+    )
+
+@router.get("/rate-limits", status_code=200, response_model=RateLimitMetricsResponse)
+async def rate_limit_metrics_endpoint() -> RateLimitMetricsResponse:
+    """
+    Endpoint to get the login and registration rate limiter counters of this worker, whose limits are its
+    share of the configured ones.
+
+    :return: Allowed and rejected attempts per limiter
+    """
+    return RateLimitMetricsResponse(
+        limiters={limiter.name: limiter.snapshot() for limiter in auth_limiters},
+        enabled=settings.AUTH_RATE_LIMIT_ENABLED
+    )
+
+@prometheus_router.get("/metrics", status_code=200, response_class=PlainTextResponse)
+async def prometheus_metrics_endpoint() -> PlainTextResponse:
+    """
+    Endpoint to scrape the request latency, in-flight requests and dependency time, summed over every worker
+    when they share ``MULTIPROCESS_DIR``.
+
+    :return: Metrics in the Prometheus text exposition format
+    """
+    if settings.MULTIPROCESS_DIR:
+        body = await run_in_threadpool(registry.render_all, settings.MULTIPROCESS_DIR)
+    else:
+        body = registry.render()
+    return PlainTextResponse(body, media_type="text/plain; version=0.0.4; charset=utf-8")
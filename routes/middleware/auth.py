@@ -1,31 +1,96 @@
-from fastapi import HTTPException, status, Depends
+import hashlib
+import hmac
+import time
+from typing import Optional
+from fastapi import HTTPException, status, Depends, Header
 import jwt
 from fastapi.security import OAuth2PasswordBearer
-from dotenv import load_dotenv
-from os import getenv
-load_dotenv()
+from settings import settings
+from utils.lru import LRUCache
 
 # OAuth2 scheme for token extraction
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/login")
 
-def get_user_id(token: str = Depends(oauth2_scheme)) -> str:
+# Verified tokens by SHA-256 digest: (user_id, expiry as a UNIX timestamp)
+token_cache = LRUCache(settings.AUTH_TOKEN_CACHE_SIZE)
+# Expired tokens are swept out of the cache on insert, at most once per interval
+TOKEN_CACHE_SWEEP_SECONDS = 60
+_next_sweep = 0.0
+
+def _decode_token(token: str) -> tuple[str, float]:
     """
-    Extracts the user ID from the JWT token.
-    
+    Fully verify a JWT token.
+
     :param token: JWT token
-    :return: User ID extracted from the token
+    :return: User ID and expiry of the token
     :raises HTTPException: If the token is invalid or expired
     """
     try:
-        payload = jwt.decode(token, getenv("SECRET_KEY_ENCRYPTION"), algorithms=["HS256"])
-        if "user_id" not in payload:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,               
-                detail="Could not validate credentials", 
-                headers={"WWW-Authenticate": "Bearer"}
-                )
-        return payload.get("user_id")
+        payload = jwt.decode(token, settings.SECRET_KEY_ENCRYPTION, algorithms=["HS256"])
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
     except jwt.InvalidTokenError:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid token")
+    if "user_id" not in payload:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Could not validate credentials",
+            headers={"WWW-Authenticate": "Bearer"}
+            )
+    return payload["user_id"], payload.get("exp", float("inf"))
+
+def _cache_token(digest: bytes, user_id: str, expires_at: float) -> None:
+    """
+    Cache a verified token, first sweeping the expired tokens out when the interval has passed.
+
+    Without the sweep an expired token never looked up again would hold its
+    slot until the LRU order evicts it.
+    """
+    global _next_sweep
+    now = time.time()
+    if now >= _next_sweep:
+        _next_sweep = now + TOKEN_CACHE_SWEEP_SECONDS
+        token_cache.prune(lambda entry: entry[1] <= now)
+    token_cache.put(digest, (user_id, expires_at))
+
+async def get_user_id(token: str = Depends(oauth2_scheme)) -> str:
+    """
+    Extracts the user ID from the JWT token.
+
+    Tokens verified before are looked up by digest in ``token_cache`` instead of being decoded again.
+    The check is a few microseconds of CPU, so it runs on the event loop instead of the threadpool.
+    
+    :param token: JWT token
+    :return: User ID extracted from the token
+    :raises HTTPException: If the token is invalid or expired
+    """
+    digest = hashlib.sha256(token.encode()).digest()
+    cached = token_cache.get(digest)
+    if cached is not None:
+        user_id, expires_at = cached
+        if time.time() < expires_at:
+            return user_id
+        token_cache.pop(digest)
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Token has expired")
+    user_id, expires_at = _decode_token(token)
+    _cache_token(digest, user_id, expires_at)
+    return user_id
+
+async def require_admin(x_admin_key: Optional[str] = Header(None), authorization: Optional[str] = Header(None)) -> None:
+    """
+    Allows the request only with the admin API key in the ``X-Admin-Key`` header.
+
+    The key is also accepted as ``Authorization: Bearer <key>``, the credentials a Prometheus scrape job sends.
+
+    :param x_admin_key: Admin API key sent by the client
+    :param authorization: Authorization header sent by the client
+    :raises HTTPException: If the admin API is disabled or the key is wrong
+    """
+    if not settings.ADMIN_API_KEY:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin API is disabled")
+    if not x_admin_key and authorization:
+        scheme, _, credentials = authorization.partition(" ")
+        if scheme.lower() == "bearer":
+            x_admin_key = credentials.strip()
+    if not x_admin_key or not hmac.compare_digest(x_admin_key.encode(), settings.ADMIN_API_KEY.encode()):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin key")
@@ -0,0 +1,97 @@
+import time
+from database.queryMetrics import start_query_stats
+from settings import settings
+from utils.metrics import counter, gauge, histogram, start_request_timings
+from logging_config import logger
+
+requests_total = counter(
+    "http_requests_total", "HTTP requests served", ("method", "route", "status")
+)
+request_seconds = histogram(
+    "http_request_duration_seconds", "Latency of the HTTP requests", ("method", "route")
+)
+request_dependency_seconds = histogram(
+    "http_request_dependency_seconds",
+    "Time each request spent in the database and the AI services",
+    ("route", "dependency")
+)
+request_queries = histogram(
+    "http_request_queries", "SQL statements run per request", ("route",),
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100)
+)
+n_plus_one_total = counter(
+    "http_request_repeated_queries_total",
+    "Requests running the same statement at least N_PLUS_ONE_THRESHOLD times", ("route",)
+)
+requests_in_flight = gauge("http_requests_in_flight", "HTTP requests being handled")
+
+
+def _route_of(scope) -> str:
+    return getattr(scope.get("route"), "path_format", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    Pure ASGI middleware recording the latency, status, dependency time and query count of every request.
+
+    Requests are labelled with the path template of the matched route (``/api/v1/quiz/{quiz_id}``),
+    unmatched paths share the ``unmatched`` label to keep the number of series bounded. Streaming
+    responses are timed until their last chunk is sent. With ``DEBUG`` the response carries a
+    ``Server-Timing`` header with the time spent so far in each dependency.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+        started = time.perf_counter()
+        timings = start_request_timings()
+        queries = start_query_stats()
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                if settings.DEBUG:
+                    message.setdefault("headers", [])
+                    message["headers"] = list(message["headers"]) + [
+                        (b"server-timing", self._server_timing(time.perf_counter() - started, timings, queries))
+                    ]
+            await send(message)
+
+        requests_in_flight.inc()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            requests_in_flight.dec()
+            route = _route_of(scope)
+            method = scope["method"]
+            requests_total.labels(method, route, str(status_code)).inc()
+            request_seconds.labels(method, route).observe(elapsed)
+            for dependency, seconds in timings.seconds.items():
+                request_dependency_seconds.labels(route, dependency).observe(seconds)
+            request_queries.labels(route).observe(queries.count)
+            if settings.N_PLUS_ONE_THRESHOLD:
+                repeated = queries.repeated(settings.N_PLUS_ONE_THRESHOLD)
+                if repeated:
+                    n_plus_one_total.labels(route).inc()
+                    statement, count = repeated[0]
+                    logger.warning(
+                        "Possible N+1 in %s %s: statement run %sx (%s queries in total): %s",
+                        method, route, count, queries.count, " ".join(statement.split())[:300]
+                    )
+
+    @staticmethod
+    def _server_timing(elapsed: float, timings, queries) -> bytes:
+        metrics = [f'db;dur={timings.seconds.get("db", 0.0) * 1000:.1f};desc="{queries.count} queries"']
+        metrics.extend(
+            f"{dependency};dur={seconds * 1000:.1f}"
+            for dependency, seconds in timings.seconds.items() if dependency != "db"
+        )
+        metrics.append(f"total;dur={elapsed * 1000:.1f}")
+        return ", ".join(metrics).encode("latin-1")
@@ -0,0 +1,55 @@
+import hmac
+import random
+from starlette.concurrency import run_in_threadpool
+from settings import settings
+from utils.profiler import Sampler
+from logging_config import logger
+
+sampler = Sampler(settings.PROFILE_INTERVAL_MS / 1000, settings.PROFILE_BUFFER_SIZE, settings.MULTIPROCESS_DIR)
+
+
+class ProfilingMiddleware:
+    """
+    Pure ASGI middleware profiling the requests sent with ``X-Profile: <admin key>`` and a
+    ``PROFILE_SAMPLE_RATE`` share of the others.
+
+    The ID of the profile is returned in the ``X-Profile-Id`` response header, the profile is
+    served by ``/api/v1/admin/profiles/{profile_id}``. A request that is not profiled only costs
+    a look at its headers.
+    """
+    def __init__(self, app):
+        self.app = app
+
+    def _trigger(self, scope) -> str | None:
+        if settings.ADMIN_API_KEY:
+            for name, value in scope["headers"]:
+                if name == b"x-profile":
+                    if hmac.compare_digest(value, settings.ADMIN_API_KEY.encode()):
+                        return "header"
+                    break
+        if settings.PROFILE_SAMPLE_RATE and random.random() < settings.PROFILE_SAMPLE_RATE:
+            return "sampled"
+        return None
+
+    async def __call__(self, scope, receive, send):
+        trigger = self._trigger(scope) if scope["type"] == "http" else None
+        if trigger is None:
+            await self.app(scope, receive, send)
+            return
+
+        profile = sampler.start(scope["method"], scope["path"], trigger)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile.id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            sampler.stop(profile)
+            if sampler.directory:
+                try:
+                    await run_in_threadpool(sampler.save, profile)
+                except OSError as e:
+                    logger.warning("Could not save profile %s: %s", profile.id, e)
@@ -0,0 +1,59 @@
+from typing import Optional
+from fastapi import HTTPException, Request, status
+from settings import settings
+from utils.rateLimit import TokenBucketLimiter, retry_after_header
+from logging_config import logger
+
+# Every worker keeps its own buckets, so each one enforces its share of the limits: the connections of a
+# client spread over the workers get the configured limit in total. A client keeping one connection only
+# reaches one worker and gets less, which errs on the strict side. Bursts keep at least one attempt
+_workers = max(settings.WEB_WORKER_COUNT, 1)
+
+# Shared by /login and /register, checked before any password is hashed
+ip_limiter = TokenBucketLimiter(
+    "client_ip", settings.AUTH_IP_RATE_PER_MINUTE / _workers, max(settings.AUTH_IP_BURST // _workers, 1),
+    settings.AUTH_RATE_LIMIT_MAX_KEYS
+)
+username_limiter = TokenBucketLimiter(
+    "username", settings.AUTH_USERNAME_RATE_PER_MINUTE / _workers, max(settings.AUTH_USERNAME_BURST // _workers, 1),
+    settings.AUTH_RATE_LIMIT_MAX_KEYS
+)
+auth_limiters = (ip_limiter, username_limiter)
+
+def client_ip(request: Request) -> str:
+    """
+    Address of the client that sent the request.
+
+    Behind cloudflared or another reverse proxy the TCP peer is the proxy. uvicorn replaces it with the
+    address taken from ``X-Forwarded-For`` when the peer is listed in ``FORWARDED_ALLOW_IPS``, skipping the
+    trusted hops from the right, so a client cannot choose its address by sending the header itself. Cloudflare
+    appends the address it saw to that header, the one it also sends as ``CF-Connecting-IP``. With the proxy
+    missing from ``FORWARDED_ALLOW_IPS`` every client shares the proxy's address and its bucket.
+    """
+    return request.client.host if request.client else "unknown"
+
+
+def check_auth_rate_limit(request: Request, username: Optional[str]) -> None:
+    """
+    Throttles login and registration attempts per client IP and per username.
+
+    The IP bucket is checked first, so a rejected IP does not drain the bucket of the username it targets.
+
+    :param request: Incoming request, used for the client IP (see ``client_ip``)
+    :param username: Username of the attempt
+    :raises HTTPException: 429 with ``Retry-After`` if either bucket is empty
+    """
+    if not settings.AUTH_RATE_LIMIT_ENABLED:
+        return
+    address = client_ip(request)
+    for limiter, key in ((ip_limiter, address), (username_limiter, username)):
+        if key is None:
+            continue
+        wait = limiter.acquire(key)
+        if wait:
+            logger.warning("Rate limited %s by %s for %s", request.url.path, limiter.name, address)
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many attempts, try again later",
+                headers={"Retry-After": retry_after_header(wait)}
+            )
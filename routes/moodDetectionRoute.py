@@ -1,48 +1,96 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlalchemy.orm import Session
-from database.connection import get_db
-from schemas.moodDetectionSchemas import FaceDetectionRequest, MoodInferenceResponse
-from controllers.moodDetectionController import mood_inference, mood_inference_trial
+from typing import Optional
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import get_async_db
+from database.replica import get_async_read_db
+from schemas.moodDetectionSchemas import FaceDetectionRequest, MoodInferenceResponse, MoodHistoryResponse, MoodTrendsResponse
+from controllers.asyncMoodDetectionController import mood_inference, mood_inference_trial, get_mood_history, get_mood_trends
 from routes.middleware.auth import get_user_id
 from logging_config import logger
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter()
 
 # ****** Face Detection Endpoints ******
 @router.post("/face-detection", status_code=200, response_model=MoodInferenceResponse)
-def face_detection_endpoint(
+async def face_detection_endpoint(
     data: FaceDetectionRequest,
     user_id: str = Depends(get_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> dict:
     """
     Endpoint to perform face detection and mood inference.
     
     :param data: Data for face detection
-    :param db: SQLAlchemy session object
+    :param db: SQLAlchemy async session object
     :param user_id: ID of the user making the request
     :return: Inference result
     """
     try:
-        logger.info(f"User ID: {user_id} - Processing face detection request")
-        return mood_inference(db, user_id, data)
+        logger.info("User ID: %s - Processing face detection request", user_id)
+        return await mood_inference(db, user_id, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e))
     
 @router.post("/face-detection/trial", status_code=200, response_model=MoodInferenceResponse)
-def face_detection_trial_endpoint(
+async def face_detection_trial_endpoint(
     data: FaceDetectionRequest,
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> dict:
     """
     Endpoint to perform face detection and mood inference for trial purposes.
     
     :param data: Data for face detection
-    :param db: SQLAlchemy session object
+    :param db: SQLAlchemy async session object
     :return: Inference result
     """
     try:
         logger.info("Processing face detection trial request")
-        return mood_inference_trial(db, data)
+        return await mood_inference_trial(db, data)
     except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
\ No newline at end of file
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/history", status_code=200, response_model=MoodHistoryResponse)
+async def mood_history_endpoint(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_read_db)
+) -> MoodHistoryResponse:
+    """
+    Endpoint to list the recorded moods of a user, newest first.
+
+    :param limit: Page size
+    :param cursor: ``next_cursor`` of the previous page, omitted for the first page
+    :param user_id: ID of the user making the request
+    :param db: SQLAlchemy async session object
+    :return: Page of moods
+    """
+    try:
+        return await get_mood_history(db, user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/trends", status_code=200, response_model=MoodTrendsResponse)
+async def mood_trends_endpoint(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    window: int = Query(7, ge=1, le=90),
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_read_db)
+) -> MoodTrendsResponse:
+    """
+    Endpoint to get the mood trends of a user over a date range.
+
+    :param start: First day of the range, defaults to 90 days before ``end``
+    :param end: Last day of the range, defaults to today
+    :param window: Length in days of the rolling distribution
+    :param user_id: ID of the user making the request
+    :param db: SQLAlchemy async session object
+    :return: Daily series, rolling distribution, streaks and weekly changes
+    """
+    try:
+        return await get_mood_trends(db, user_id, start, end, window)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,94 +1,97 @@
-from fastapi import APIRouter, Depends, HTTPException, Response
-from sqlalchemy.orm import Session
-from database.connection import get_db
+from datetime import date
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
+from sqlalchemy.ext.asyncio import AsyncSession
+from database.connection import get_async_db
+from database.replica import get_async_read_db
 from schemas.quizSchemas import *
-from controllers.quizController import *
+from controllers.asyncQuizController import *
 from routes.middleware.auth import get_user_id
+from utils.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE
 
 router = APIRouter()
 
 # ****** Quiz Endpoints ******
 @router.post("/generate", status_code=201, response_model=QuizGeneratedResponse)
-def generate_quiz_endpoint(
+async def generate_quiz_endpoint(
     quiz_data: QuizGeneratedRequest,
     user_id: str = Depends(get_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> QuizGeneratedResponse:
     """
     Endpoint to generate a quiz for a user.
     
     :param quiz_data: Data for the quiz generation
     :param user_id: ID of the user making the request
-    :param db: SQLAlchemy session object
+    :param db: SQLAlchemy async session object
     :return: Generated Quiz object
     """
     try:
-        return generate_quiz(db, quiz_data, user_id)
+        return await generate_quiz(db, quiz_data, user_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     
 @router.post("/attempt/{quiz_id}", status_code=200, response_model=QuizAttemptResponse)
-def attempt_quiz_endpoint(
+async def attempt_quiz_endpoint(
     quiz_id: str,
     user_id: str = Depends(get_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> dict:
     """
     Endpoint to attempt a quiz for a user.
     
     :param quiz_id: ID of the quiz to be attempted
     :param user_id: ID of the user making the request
-    :param db: SQLAlchemy session object
+    :param db: SQLAlchemy async session object
     :return: Response with quiz attempt result
     """
     try:
-        return attempt_quiz(db, quiz_id, user_id)
+        return await attempt_quiz(db, quiz_id, user_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     
 @router.get("/attempt", status_code=200, response_model=AttemptIdResponse)
-def get_quiz_attempts_endpoint(
+async def get_quiz_attempts_endpoint(
     user_id: str = Depends(get_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> list:
     """
     Endpoint to get all quiz attempts for a user.
     
     :param user_id: ID of the user making the request
-    :param db: SQLAlchemy session object
+    :param db: SQLAlchemy async session object
     :return: List of quiz attempts
     """
     try:
-        return get_quiz_attempt_id(db, user_id)
+        return await get_quiz_attempt_id(db, user_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     
 @router.get("/attempt/{quiz_attempt_id}", status_code=200, response_model=CheckQuizAttemptQuestion)
-def get_quiz_attempt_details_endpoint(
+async def get_quiz_attempt_details_endpoint(
     quiz_attempt_id: str,
     user_id: str = Depends(get_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> List[QuestionAttemptResponse]:
     """
     Endpoint to get details of a specific quiz attempt.
     
     :param quiz_attempt_id: ID of the quiz attempt
     :param user_id: ID of the user making the request
-    :param db: SQLAlchemy session object
+    :param db: SQLAlchemy async session object
     :return: Details of the quiz attempt
     """
     try:
-        return get_quiz_questions(db, quiz_attempt_id, user_id)
+        return await get_quiz_questions(db, quiz_attempt_id, user_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     
 @router.put("/submit/{quiz_attempt_id}/{question_id}", status_code=200, response_model=AttemptQuizAnswerResponse)
-def submit_quiz_attempt_endpoint(
+async def submit_quiz_attempt_endpoint(
     quiz_attempt_id: UUID,
     question_id: UUID,
     user_answers: AttemptQuizAnswerRequest,
     user_id: str = Depends(get_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> QuizEvaluationResponse:
     """
     Endpoint to submit a quiz attempt and evaluate the answers.
@@ -96,20 +99,41 @@ def submit_quiz_attempt_endpoint(
     :param quiz_attempt_id: ID of the quiz attempt
     :param user_answers: User's answers to the quiz questions
     :param user_id: ID of the user making the request
-    :param db: SQLAlchemy session object
+    :param db: SQLAlchemy async session object
     :return: Evaluation response of the quiz attempt
     """
     try:
-        return attempt_quiz_answer(db, quiz_attempt_id, user_id,question_id, user_answers)
+        return await attempt_quiz_answer(db, quiz_attempt_id, user_id,question_id, user_answers)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+    
+@router.put("/submit/{quiz_attempt_id}", status_code=200, response_model=BatchAttemptQuizAnswerResponse)
+async def submit_quiz_answers_endpoint(
+    quiz_attempt_id: UUID,
+    data: BatchAttemptQuizAnswerRequest,
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_db)
+) -> BatchAttemptQuizAnswerResponse:
+    """
+    Endpoint to submit the answers of several questions of a quiz attempt in one request.
+    
+    :param quiz_attempt_id: ID of the quiz attempt
+    :param data: Answers of the questions
+    :param user_id: ID of the user making the request
+    :param db: SQLAlchemy async session object
+    :return: Attempt answer ID of each submitted question
+    """
+    try:
+        return await attempt_quiz_answers(db, quiz_attempt_id, user_id, data)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     
 @router.get("/answer/{quiz_attempt_id}/{question_id}", status_code=200, response_model=UserAnswer)
-def get_quiz_answer_details_endpoint(
+async def get_quiz_answer_details_endpoint(
     quiz_attempt_id: str,
     question_id: str,
     user_id: str = Depends(get_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> List[EvaluationQuestionDetail]:
     """
     Endpoint to get details of a specific question in a quiz attempt.
@@ -117,38 +141,38 @@ def get_quiz_answer_details_endpoint(
     :param quiz_attempt_id: ID of the quiz attempt
     :param question_id: ID of the question in the quiz attempt
     :param user_id: ID of the user making the request
-    :param db: SQLAlchemy session object
+    :param db: SQLAlchemy async session object
     :return: Details of the question in the quiz attempt
     """
     try:
-        return get_answer_by_quiz_attempt_question_id(db, quiz_attempt_id, question_id, user_id)
+        return await get_answer_by_quiz_attempt_question_id(db, quiz_attempt_id, question_id, user_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     
 @router.get("/answer/{answer_id}", status_code=200, response_model=UserAnswer)
-def get_possible_answers_endpoint(
+async def get_possible_answers_endpoint(
     answer_id: str,
     user_id: str = Depends(get_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_read_db)
 ) -> PossibleAnswers:
     """
     Endpoint to get possible answers for a specific question in a quiz attempt.
     
     :param answer_id: ID of the answer
     :param user_id: ID of the user making the request
-    :param db: SQLAlchemy session object
+    :param db: SQLAlchemy async session object
     :return: Possible answers for the question
     """
     try:
-        return get_answer_by_answer_id(db, answer_id, user_id)
+        return await get_answer_by_answer_id(db, answer_id, user_id)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
     
 @router.post("/submit/{quiz_attempt_id}", status_code=200, response_model=QuizEvaluationResponse)
-def submit_quiz_attempt_endpoint(
+async def submit_quiz_attempt_endpoint(
     quiz_attempt_id: str,
     user_id: str = Depends(get_user_id),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> QuizEvaluationResponse:
     """
     Endpoint to submit a quiz attempt and evaluate the answers.
@@ -156,10 +180,73 @@ def submit_quiz_attempt_endpoint(
     :param quiz_attempt_id: ID of the quiz attempt
     :param user_answers: User's answers to the quiz questions
     :param user_id: ID of the user making the request
-    :param db: SQLAlchemy session object
+    :param db: SQLAlchemy async session object
     :return: Evaluation response of the quiz attempt
     """
     try:
-        return evaluate_quiz(db, quiz_attempt_id, user_id)
+        return await evaluate_quiz(db, quiz_attempt_id, user_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+@router.get("/history/quizzes", status_code=200, response_model=QuizHistoryResponse)
+async def get_quiz_history_endpoint(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_read_db)
+) -> QuizHistoryResponse:
+    """
+    Endpoint to list the quizzes generated for a user, newest first.
+
+    :param limit: Page size
+    :param cursor: ``next_cursor`` of the previous page, omitted for the first page
+    :param user_id: ID of the user making the request
+    :param db: SQLAlchemy async session object
+    :return: Page of quizzes
+    """
+    try:
+        return await get_quiz_history(db, user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+@router.get("/history/attempts", status_code=200, response_model=AttemptHistoryResponse)
+async def get_attempt_history_endpoint(
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_read_db)
+) -> AttemptHistoryResponse:
+    """
+    Endpoint to list the quiz attempts of a user with their scores, newest first.
+
+    :param limit: Page size
+    :param cursor: ``next_cursor`` of the previous page, omitted for the first page
+    :param user_id: ID of the user making the request
+    :param db: SQLAlchemy async session object
+    :return: Page of quiz attempts
+    """
+    try:
+        return await get_attempt_history(db, user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e)) from e
+
+@router.get("/daily-scores", status_code=200, response_model=DailyScoreResponse)
+async def get_daily_scores_endpoint(
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+    user_id: str = Depends(get_user_id),
+    db: AsyncSession = Depends(get_async_read_db)
+) -> DailyScoreResponse:
+    """
+    Endpoint to get the daily quiz scores of a user, read from the daily score rollup.
+
+    :param start: First day of the range, defaults to 30 days before ``end``
+    :param end: Last day of the range, defaults to today
+    :param user_id: ID of the user making the request
+    :param db: SQLAlchemy async session object
+    :return: Score of each day with a completed quiz
+    """
+    try:
+        return await get_daily_scores(db, user_id, start, end)
     except ValueError as e:
         raise HTTPException(status_code=400, detail=str(e)) from e
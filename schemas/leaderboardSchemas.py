@@ -0,0 +1,19 @@
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from uuid import UUID
+
+class LeaderboardEntryResponse(BaseModel):
+    rank: int
+    user_id: UUID
+    full_name: Optional[str] = None
+    point_earned: int
+
+class LeaderboardResponse(BaseModel):
+    entries: List[LeaderboardEntryResponse]
+    total_users: int
+
+class MyRankResponse(BaseModel):
+    rank: Optional[int] = Field(default=None, description="Rank of the user, null before the first graded quiz")
+    point_earned: int = 0
+    entries: List[LeaderboardEntryResponse] = Field(description="The user and its neighbors")
+    total_users: int
@@ -0,0 +1,25 @@
+from pydantic import BaseModel, Field
+from typing import Any, Dict, Optional
+
+class PoolMetricsResponse(BaseModel):
+    pools: Dict[str, Dict[str, Any]] = Field(description="Telemetry of each connection pool by name")
+    max_connections_per_worker: int = Field(
+        description="Connections a single worker can open (pool_size + max_overflow of every pool), "
+                    "multiply by the number of workers to compare with Postgres max_connections")
+    replica: Optional[Dict[str, Any]] = Field(
+        default=None, description="Lag and routing counters of the read replica, null when no replica is configured")
+
+class RateLimitMetricsResponse(BaseModel):
+    limiters: Dict[str, Dict[str, Any]] = Field(
+        description="Limits, tracked callers and allowed/rejected attempt counters of each auth rate limiter by name")
+    enabled: bool = Field(description="Whether login and registration are rate limited")
+
+class ProfileSummary(BaseModel):
+    id: str
+    method: str
+    path: str
+    trigger: str = Field(description="header when requested with X-Profile, sampled otherwise")
+    started_at: float = Field(description="UNIX timestamp of the start of the request")
+    duration_ms: float
+    cpu_ms: float = Field(description="CPU time of the sampled stacks")
+    samples: int
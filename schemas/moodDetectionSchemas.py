@@ -1,5 +1,6 @@
-from pydantic import BaseModel
-from typing import Literal, Dict
+from pydantic import BaseModel, Field
+from typing import Literal, Dict, List, Optional
+from datetime import date
 
 class FaceDetectionRequest(BaseModel):
     image: str  # Base64 encoded image string
@@ -7,4 +8,35 @@ class FaceDetectionRequest(BaseModel):
 class MoodInferenceResponse(BaseModel):
     time: str
     prediction: str
-    scores: Dict[Literal['happy', 'surprise', 'sad', 'anger', 'disgust', 'fear', 'neutral'], str]
\ No newline at end of file
+    scores: Dict[Literal['happy', 'surprise', 'sad', 'anger', 'disgust', 'fear', 'neutral'], str]
+
+class MoodHistoryItem(BaseModel):
+    date: date
+    mood: str
+    notes: Optional[str] = None
+
+class MoodHistoryResponse(BaseModel):
+    items: List[MoodHistoryItem]
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page, null on the last page")
+
+class MoodStreak(BaseModel):
+    mood: str
+    length: int
+    end: date
+
+class WeeklyMood(BaseModel):
+    week_start: date
+    counts: Dict[str, int]
+    change: Dict[str, int] = Field(description="Difference with the previous week")
+    dominant: Optional[str] = None
+
+class MoodTrendsResponse(BaseModel):
+    start: date
+    end: date
+    window_days: int
+    totals: Dict[str, int]
+    daily: List[Optional[str]] = Field(description="Mood of each day from start to end, null without a record")
+    rolling: Dict[str, List[int]] = Field(description="Records of each mood in the trailing window ending on each day")
+    longest_streaks: List[MoodStreak]
+    current_streak: Optional[MoodStreak] = None
+    weekly: List[WeeklyMood]
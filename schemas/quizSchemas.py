@@ -1,6 +1,7 @@
 from pydantic import BaseModel, Field
 from typing import Literal, List, Optional, Dict
 from uuid import UUID
+from datetime import date, datetime
 
 class QuizGeneratedRequest(BaseModel):
     theme: Literal["mental_health", "judi_online"]
@@ -58,7 +59,54 @@ class AttemptQuizAnswerResponse(BaseModel):
 class AttemptQuizAnswerRequest(BaseModel):
     user_answers: Optional[List[Literal["A", "B", "C", "D"]]]
 
+class BatchAnswerItem(BaseModel):
+    question_id: UUID
+    user_answers: Optional[List[Literal["A", "B", "C", "D"]]]
+
+class BatchAttemptQuizAnswerRequest(BaseModel):
+    answers: List[BatchAnswerItem] = Field(min_length=1, description="Answers of one or more questions of the attempt")
+
+class SubmittedAnswer(BaseModel):
+    question_id: UUID
+    attempt_answer_id: UUID
+
+class BatchAttemptQuizAnswerResponse(BaseModel):
+    message: str
+    answers: List[SubmittedAnswer]
+
 class CheckQuizAttemptQuestion(BaseModel):
     questions: list[QuestionAttemptResponse]
     expired_at: Optional[str] = Field(
-        description="Expiration time of the quiz attempt in ISO format")
\ No newline at end of file
+        description="Expiration time of the quiz attempt in ISO format")
+
+class QuizHistoryItem(BaseModel):
+    quiz_id: UUID
+    title: str
+    description: Optional[str] = None
+    created_at: datetime
+
+class QuizHistoryResponse(BaseModel):
+    items: List[QuizHistoryItem]
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page, null on the last page")
+
+class AttemptHistoryItem(BaseModel):
+    quiz_attempt_id: UUID
+    quiz_id: UUID
+    quiz_title: str
+    attempted_at: datetime
+    is_completed: bool
+    score: Optional[int] = None
+    points_earned: Optional[int] = None
+
+class AttemptHistoryResponse(BaseModel):
+    items: List[AttemptHistoryItem]
+    next_cursor: Optional[str] = Field(default=None, description="Cursor of the next page, null on the last page")
+
+class DailyScoreItem(BaseModel):
+    date: date
+    score: int
+
+class DailyScoreResponse(BaseModel):
+    start: date
+    end: date
+    scores: List[DailyScoreItem] = Field(description="Days with at least one completed quiz, oldest first")
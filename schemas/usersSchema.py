@@ -1,6 +1,6 @@
 from typing import Optional, List, TypedDict, Annotated, Dict, Literal
 from uuid import UUID
-from pydantic import BaseModel, EmailStr, AfterValidator, field_validator
+from pydantic import BaseModel, EmailStr, AfterValidator, Field, field_validator
 
 class CreateUserRequest(BaseModel):
     full_name: str
@@ -44,4 +44,19 @@ class FetchedInfoResponse(BaseModel):
     point_earned: Optional[int] = 0
 
     class Config:
-        orm_mode = True
\ No newline at end of file
+        orm_mode = True
+
+class BulkProvisionRequest(BaseModel):
+    users: List[CreateUserRequest] = Field(min_length=1, max_length=10000)
+
+class ProvisionResult(BaseModel):
+    index: int = Field(description="Position of the account in the request")
+    username: Optional[str] = None
+    status: Literal["created", "username_exists", "duplicate_in_batch", "invalid"]
+    user_id: Optional[UUID] = None
+    detail: Optional[str] = None
+
+class BulkProvisionResponse(BaseModel):
+    created: int
+    conflicts: int
+    results: List[ProvisionResult]
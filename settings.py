@@ -0,0 +1,133 @@
+from typing import Optional
+from pydantic import BaseModel
+from dotenv import load_dotenv
+from os import getenv
+
+load_dotenv(override=True)
+
+class Settings(BaseModel):
+    """
+    Application settings, read once from the environment (and ``.env``).
+    """
+    POSTGRE_URL: Optional[str] = None
+    # Optional streaming replica serving the read-only endpoints
+    POSTGRE_REPLICA_URL: Optional[str] = None
+    DB_REPLICA_MAX_LAG_SECONDS: float = 1.0
+    DB_REPLICA_LAG_CHECK_SECONDS: float = 2.0
+
+    # Connection pool, applied to both the sync and the async engine
+    DB_POOL_SIZE: int = 5
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: float = 30
+    DB_POOL_RECYCLE: int = 1800
+    DB_POOL_PRE_PING: bool = True
+    DB_STATEMENT_TIMEOUT_MS: int = 0
+
+    # Authentication
+    SECRET_KEY_ENCRYPTION: Optional[str] = None
+    # bcrypt cost factor, hashes with another cost are rehashed on the next successful login
+    BCRYPT_ROUNDS: int = 12
+    # Worker processes hashing and verifying passwords (0 for one per core)
+    PASSWORD_HASH_WORKERS: int = 0
+    # Passwords queued or being hashed before new logins and sign-ups get a 503
+    PASSWORD_HASH_QUEUE_SIZE: int = 64
+    # Bulk provisioning chunks queued in the pool at once (0 for one per worker), the rest wait their turn
+    PASSWORD_HASH_BULK_CHUNKS: int = 0
+    # Verified access tokens kept in memory, so a reused token skips the JWT verification
+    AUTH_TOKEN_CACHE_SIZE: int = 10000
+    # Token buckets throttling /login and /register before any password is hashed
+    AUTH_RATE_LIMIT_ENABLED: bool = True
+    AUTH_IP_RATE_PER_MINUTE: float = 30
+    AUTH_IP_BURST: int = 10
+    AUTH_USERNAME_RATE_PER_MINUTE: float = 5
+    AUTH_USERNAME_BURST: int = 5
+    # Buckets kept per limiter, the least recently seen callers are evicted first
+    AUTH_RATE_LIMIT_MAX_KEYS: int = 100000
+    # Key of the admin endpoints (X-Admin-Key header), the admin endpoints are disabled when unset
+    ADMIN_API_KEY: Optional[str] = None
+
+    # External AI services
+    AZURE_OPENAI_API_KEY: Optional[str] = None
+    AZURE_OPENAI_ENDPOINT: Optional[str] = None
+    AZURE_OPENAI_API_VERSION: Optional[str] = None
+    MOOD_CLASSIFIER_API_KEY: Optional[str] = None
+    MOOD_CLASSIFIER_URL: str = "https://moodclassifier.eastasia.inference.ml.azure.com/score"
+    # Seconds to connect to the mood classifier, and to wait for each read or write of a call
+    MOOD_CLASSIFIER_CONNECT_TIMEOUT_SECONDS: float = 5
+    MOOD_CLASSIFIER_TIMEOUT_SECONDS: float = 30
+
+    # Logging, written by a background thread behind a queue
+    LOG_LEVEL: str = "INFO"
+    LOG_FORMAT: str = "json"
+    # Rotating log file, only written by a single worker (see WEB_WORKER_COUNT)
+    LOG_FILE: Optional[str] = "app.log"
+    LOG_MAX_BYTES: int = 10 * 1024 * 1024
+    LOG_BACKUP_COUNT: int = 5
+    # Share of the INFO and DEBUG records kept per logger, e.g. "httpx=0.1,AppLogger=0.5"
+    LOG_SAMPLING: str = ""
+
+    # Request profiling: requests sent with X-Profile set to the admin key, plus this share of all requests
+    PROFILE_SAMPLE_RATE: float = 0.0
+    PROFILE_INTERVAL_MS: float = 5
+    # Finished profiles kept for the admin endpoints
+    PROFILE_BUFFER_SIZE: int = 50
+
+    # Adds Server-Timing headers with the database and AI time of each request
+    DEBUG: bool = False
+    # A statement run this many times in one request is logged as a likely N+1 query (0 to disable)
+    N_PLUS_ONE_THRESHOLD: int = 5
+
+    # Server, see launcher.py
+    WEB_HOST: str = "0.0.0.0"
+    WEB_PORT: int = 80
+    # Worker processes (0 for one per available core)
+    WEB_WORKERS: int = 0
+    WEB_BACKLOG: int = 2048
+    WEB_KEEPALIVE_SECONDS: int = 5
+    WEB_GRACEFUL_SHUTDOWN_SECONDS: int = 30
+    # Threads per worker running sync routes and run_in_threadpool calls (the LLM clients)
+    WEB_THREADPOOL_SIZE: int = 40
+    # Worker processes serving the app, set by launcher.py for its workers (keep it out of .env, which
+    # overrides the environment). The auth rate limits are split between the workers and only the console
+    # log is written when there are several
+    WEB_WORKER_COUNT: int = 1
+    # Directory where every worker publishes its Prometheus metrics and finished profiles, so that any worker
+    # serves them for all. launcher.py creates a temporary one when it starts several workers without it
+    MULTIPROCESS_DIR: Optional[str] = None
+    # Seconds between two publications of the metrics of a worker, the other workers' values on /metrics are
+    # up to this old
+    MULTIPROCESS_PUBLISH_SECONDS: float = 1
+    # Comma-separated addresses or networks of the reverse proxies (cloudflared, a load balancer) whose
+    # X-Forwarded-For header is trusted for the client address, "*" to trust any peer. Same meaning and
+    # name as uvicorn's setting; keep it to the proxies that really front the app, or any client can pick
+    # its own address and dodge the per-IP rate limit
+    FORWARDED_ALLOW_IPS: str = "127.0.0.1"
+
+    # Build the LLM clients and the quiz graph in the lifespan hook instead of on first use
+    EAGER_STARTUP: bool = False
+
+    # Number of quizzes whose questions are kept in memory
+    QUIZ_QUESTION_CACHE_SIZE: int = 4096
+
+    # Background sweeper grading abandoned quiz attempts
+    QUIZ_SWEEP_ENABLED: bool = True
+    QUIZ_SWEEP_INTERVAL_SECONDS: float = 60
+    QUIZ_SWEEP_BATCH_SIZE: int = 500
+
+    # Rollup of the completed quiz attempts into daily_scores
+    DAILY_SCORE_ROLLUP_ENABLED: bool = True
+    DAILY_SCORE_ROLLUP_INTERVAL_SECONDS: float = 300
+    DAILY_SCORE_ROLLUP_LAG_SECONDS: int = 60
+
+    # In-memory leaderboard, rebuilt from the database on this interval
+    LEADERBOARD_REFRESH_SECONDS: float = 300
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        """
+        Build the settings from the environment variables named like the fields.
+        """
+        values = {name: getenv(name) for name in cls.model_fields}
+        return cls(**{name: value for name, value in values.items() if value is not None})
+
+settings = Settings.from_env()
@@ -0,0 +1,23 @@
+"""
+Shared client of the mood classifier calls.
+"""
+import asyncio
+
+
+def test_client_is_shared_and_bounded():
+    from settings import settings
+    from utils.httpClient import open_client, close_client
+
+    async def use():
+        client = open_client()
+        assert open_client() is client
+        assert client.timeout.connect == settings.MOOD_CLASSIFIER_CONNECT_TIMEOUT_SECONDS
+        assert client.timeout.read == settings.MOOD_CLASSIFIER_TIMEOUT_SECONDS
+        await close_client()
+        assert client.is_closed
+        # Outside the lifespan a new client is opened on demand
+        reopened = open_client()
+        assert reopened is not client
+        await close_client()
+
+    asyncio.run(use())
@@ -0,0 +1,38 @@
+"""
+Rebuild of the in-memory leaderboard.
+"""
+from uuid import UUID
+from utils.leaderboard import Leaderboard
+
+ALICE, BOB, CAROL = UUID(int=1), UUID(int=2), UUID(int=3)
+
+
+def test_replace_keeps_the_database_order():
+    board = Leaderboard()
+    board.replace([(BOB, "Bob", 10), (ALICE, "Alice", 5), (CAROL, "Carol", 5)])
+    assert [(entry.rank, entry.user_id) for entry in board.top(3)] == [(1, BOB), (2, ALICE), (2, CAROL)]
+    board.update(CAROL, 11)
+    assert board.rank(CAROL) == 1 and board.rank(BOB) == 2
+
+
+def test_updates_during_a_refresh_survive_the_swap():
+    board = Leaderboard()
+    board.replace([(ALICE, "Alice", 5), (BOB, "Bob", 1)])
+    board.begin_refresh()
+    # Graded after the snapshot was read: the snapshot still has the old points
+    board.update(BOB, 9, "Bob")
+    board.update(CAROL, 3, "Carol")
+    board.replace([(ALICE, "Alice", 7), (BOB, "Bob", 1)])
+    assert [(entry.user_id, entry.point_earned) for entry in board.top(3)] == [(BOB, 9), (ALICE, 7), (CAROL, 3)]
+    # Only the updates of a running refresh are reapplied
+    board.update(ALICE, 8)
+    board.replace([(ALICE, "Alice", 7)])
+    assert board.top(3)[0].point_earned == 7 and board.rank(BOB) is None
+
+
+def test_an_update_older_than_the_snapshot_is_not_reapplied():
+    board = Leaderboard()
+    board.begin_refresh()
+    board.update(ALICE, 4, "Alice")
+    board.replace([(ALICE, "Alice", 6)])
+    assert board.top(1)[0].point_earned == 6
@@ -0,0 +1,56 @@
+import json
+import os
+from utils.metrics import Registry, Counter, Gauge, Histogram
+
+
+def worker_registry(requests: int, in_flight: int, latencies: list[float]) -> Registry:
+    registry = Registry()
+    registry.register(Counter("requests_total", "Requests", ("route",))).labels("/").inc(requests)
+    registry.register(Gauge("in_flight", "In flight")).set(in_flight)
+    histogram = registry.register(Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0)))
+    for latency in latencies:
+        histogram.observe(latency)
+    return registry
+
+
+def write_dump(directory, pid: int, registry: Registry) -> None:
+    dumps = {name: metric.dump() for name, metric in registry._metrics.items()}
+    (directory / f"metrics-{pid}.json").write_text(json.dumps(dumps))
+
+
+def dead_pid() -> int:
+    pid = 2 ** 22 + 1
+    while True:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return pid
+        except PermissionError:
+            pass
+        pid += 1
+
+
+def test_render_all_sums_the_workers(tmp_path):
+    write_dump(tmp_path, os.getppid(), worker_registry(3, 2, [0.05, 2.0]))
+    own = worker_registry(4, 1, [0.5])
+
+    rendered = own.render_all(str(tmp_path))
+
+    assert 'requests_total{route="/"} 7' in rendered
+    assert "in_flight 3" in rendered
+    assert 'latency_seconds_bucket{le="0.1"} 1' in rendered
+    assert 'latency_seconds_bucket{le="1.0"} 2' in rendered
+    assert 'latency_seconds_bucket{le="+Inf"} 3' in rendered
+    assert "latency_seconds_count 3" in rendered
+    assert os.path.exists(tmp_path / f"metrics-{os.getpid()}.json")
+
+
+def test_render_all_keeps_the_counters_of_stopped_workers_but_not_their_gauges(tmp_path):
+    write_dump(tmp_path, dead_pid(), worker_registry(5, 2, [0.05]))
+    own = worker_registry(1, 1, [])
+
+    rendered = own.render_all(str(tmp_path))
+
+    assert 'requests_total{route="/"} 6' in rendered
+    assert "in_flight 1" in rendered
+    assert "latency_seconds_count 1" in rendered
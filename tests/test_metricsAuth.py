@@ -0,0 +1,32 @@
+import pytest
+from fastapi.testclient import TestClient
+from main import app
+from settings import settings
+
+ADMIN_KEY = "test-admin-key"
+ENDPOINTS = ("/metrics", "/api/v1/metrics/pool", "/api/v1/metrics/rate-limits")
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", ADMIN_KEY)
+    # Without the lifespan, no background job or warm-up runs
+    return TestClient(app)
+
+
+@pytest.mark.parametrize("path", ENDPOINTS)
+def test_metrics_require_the_admin_key(client, path):
+    assert client.get(path).status_code == 403
+    assert client.get(path, headers={"X-Admin-Key": "wrong"}).status_code == 403
+    assert client.get(path, headers={"X-Admin-Key": ADMIN_KEY}).status_code == 200
+
+
+@pytest.mark.parametrize("path", ENDPOINTS)
+def test_metrics_accept_the_admin_key_as_bearer_token(client, path):
+    assert client.get(path, headers={"Authorization": f"Bearer {ADMIN_KEY}"}).status_code == 200
+    assert client.get(path, headers={"Authorization": "Bearer wrong"}).status_code == 403
+
+
+def test_metrics_are_disabled_without_an_admin_key(client, monkeypatch):
+    monkeypatch.setattr(settings, "ADMIN_API_KEY", None)
+    assert client.get("/metrics", headers={"X-Admin-Key": ADMIN_KEY}).status_code == 403
@@ -0,0 +1,34 @@
+import numpy as np
+from utils.moodTrends import compute_mood_trends
+
+MOOD_IDS = [1, 2, 3]
+
+
+def test_longest_streak_end_is_the_latest_of_tied_runs():
+    # Mood 1 on days 0-1 and 5-6, mood 2 on days 2-3 and 8-9: every run lasts two days
+    offsets = [0, 1, 2, 3, 5, 6, 8, 9]
+    levels = [1, 1, 2, 2, 1, 1, 2, 2]
+
+    trends = compute_mood_trends(offsets, levels, days=10, mood_ids=MOOD_IDS)
+
+    np.testing.assert_array_equal(trends.longest_streak, [2, 2, 0])
+    np.testing.assert_array_equal(trends.longest_streak_end, [6, 9, -1])
+
+
+def test_longest_streak_end_prefers_the_longer_run_over_a_later_one():
+    offsets = [0, 1, 2, 4, 6, 7, 9]
+    levels = [1, 1, 1, 2, 1, 2, 1]
+
+    trends = compute_mood_trends(offsets, levels, days=10, mood_ids=MOOD_IDS)
+
+    np.testing.assert_array_equal(trends.longest_streak, [3, 1, 0])
+    np.testing.assert_array_equal(trends.longest_streak_end, [2, 7, -1])
+    assert trends.current_streak == (0, 1, 9)
+
+
+def test_empty_range_has_no_streaks():
+    trends = compute_mood_trends([], [], days=7, mood_ids=MOOD_IDS)
+
+    np.testing.assert_array_equal(trends.longest_streak, [0, 0, 0])
+    np.testing.assert_array_equal(trends.longest_streak_end, [-1, -1, -1])
+    assert trends.current_streak is None
@@ -0,0 +1,51 @@
+"""
+Process pool hashing the passwords.
+"""
+import asyncio
+import os
+import signal
+import pytest
+
+
+@pytest.fixture
+def hashing(monkeypatch):
+    from settings import settings
+    from utils import passwordHashing
+    monkeypatch.setattr(settings, "PASSWORD_HASH_WORKERS", 2)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_QUEUE_SIZE", 2)
+    monkeypatch.setattr(settings, "PASSWORD_HASH_BULK_CHUNKS", 1)
+    yield passwordHashing
+    passwordHashing.shutdown_executor()
+
+
+def test_bulk_hashing_does_not_fill_the_admission_limit(hashing):
+    from utils.auth import verify_password
+
+    async def run():
+        await hashing.start_executor()
+        bulk = asyncio.ensure_future(hashing.hash_passwords([f"password-{index}" for index in range(8)]))
+        await asyncio.sleep(0.05)
+        # Bulk chunks wait for their single slot instead of queueing in the pool
+        assert 0 < hashing.stats()["bulk_in_flight"] <= 4
+        assert hashing.stats()["in_flight"] == 0
+        login = await hashing.hash_password("login")
+        return login, await bulk
+
+    login, hashes = asyncio.run(run())
+    assert verify_password("login", login)
+    assert len(hashes) == 8 and verify_password("password-7", hashes[7])
+
+
+def test_broken_pool_is_replaced(hashing):
+    async def run():
+        await hashing.start_executor()
+        broken = hashing.get_executor()
+        for process in list(broken._processes.values()):
+            os.kill(process.pid, signal.SIGKILL)
+        password_hash = await hashing.hash_password("after-crash")
+        return broken, password_hash
+
+    broken, password_hash = asyncio.run(run())
+    assert hashing.get_executor() is not broken
+    assert hashing.stats()["restarts"] >= 1
+    assert password_hash.startswith("$2b$")
@@ -0,0 +1,35 @@
+import asyncio
+from utils.profiler import Sampler
+
+
+def record(sampler: Sampler, path: str):
+    async def request():
+        profile = sampler.start("GET", path, "header")
+        await asyncio.sleep(0.01)
+        sampler.stop(profile)
+        sampler.save(profile)
+        return profile
+
+    return asyncio.run(request())
+
+
+def test_saved_profiles_are_found_by_another_worker(tmp_path):
+    recorder = Sampler(0.001, 2, str(tmp_path))
+    other_worker = Sampler(0.001, 2, str(tmp_path))
+
+    profile = record(recorder, "/a")
+    found = other_worker.get(profile.id)
+
+    assert found is not None
+    assert found.summary()["path"] == "/a"
+    assert found.folded("wall") == profile.folded("wall")
+    assert other_worker.get("../../etc/passwd") is None
+
+
+def test_saved_profiles_keep_the_capacity(tmp_path):
+    sampler = Sampler(0.001, 2, str(tmp_path))
+
+    ids = [record(sampler, f"/{index}").id for index in range(3)]
+
+    assert [profile.id for profile in Sampler(0.001, 2, str(tmp_path)).list()] == ids[:0:-1]
+    assert len(list(tmp_path.glob("profile-*.json"))) == 2
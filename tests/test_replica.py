@@ -0,0 +1,46 @@
+import asyncio
+import time
+from database.replica import ReplicaHealth
+
+
+class HangingEngine:
+    """
+    Engine of an unreachable replica, the connect never completes.
+    """
+    def connect(self):
+        return self
+
+    async def __aenter__(self):
+        await asyncio.sleep(3600)
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+
+def test_unreachable_replica_times_out_and_is_unusable():
+    health = ReplicaHealth(HangingEngine(), max_lag=1.0, check_interval=0.05)
+
+    started = time.monotonic()
+    usable = asyncio.run(health.is_usable())
+
+    assert usable is False
+    assert health.lag is None
+    assert time.monotonic() - started < 1
+
+
+def test_concurrent_reads_do_not_wait_for_a_running_check():
+    health = ReplicaHealth(HangingEngine(), max_lag=1.0, check_interval=0.5)
+
+    async def reads():
+        check = asyncio.create_task(health.is_usable())
+        await asyncio.sleep(0)
+        started = time.monotonic()
+        usable = await health.is_usable()
+        waited = time.monotonic() - started
+        await check
+        return usable, waited
+
+    usable, waited = asyncio.run(reads())
+
+    assert usable is False
+    assert waited < 0.1
@@ -0,0 +1,99 @@
+"""
+The sync controllers keep ``user_dashboards`` in sync like the async ones.
+
+Runs against the disposable PostgreSQL database of ``TEST_POSTGRE_URL``,
+skipped when it is not set.
+"""
+import os
+from datetime import datetime, timedelta
+from uuid import uuid4
+import pytest
+from sqlalchemy import insert, select, text
+
+pytestmark = pytest.mark.skipif(not os.getenv("TEST_POSTGRE_URL"), reason="TEST_POSTGRE_URL is not set")
+
+
+@pytest.fixture(scope="module")
+def database():
+    from settings import settings
+    if settings.POSTGRE_URL != os.environ["TEST_POSTGRE_URL"]:
+        pytest.skip("POSTGRE_URL is overridden (e.g. by .env), refusing to run against another database")
+    from database import manage
+    manage.create_all()
+    manage.migrate()
+    with manage.engine.connect() as connection:
+        if not connection.execute(text("SELECT count(*) FROM moods")).scalar():
+            manage.seed_moods()
+
+
+@pytest.fixture
+def db(database):
+    from database.connection import SessionLocal
+    from database.users import create_user_statement
+    session = SessionLocal()
+    user_id = uuid4()
+    session.execute(create_user_statement(user_id, "Sync Writer", 30, f"sync-{user_id.hex}", "not-a-hash"))
+    session.commit()
+    yield session, user_id
+    session.close()
+
+
+def dashboard(session, user_id):
+    from database.models import UserDashboard
+    return session.execute(select(UserDashboard).where(UserDashboard.user_id == user_id)).scalars().first()
+
+
+def seed_attempt(session, user_id, expired_at=None):
+    from database.models import Quiz, Question, QuizAttempt, AttemptAnswer
+    quiz_id, attempt_id, question_ids = uuid4(), uuid4(), [uuid4() for _ in range(2)]
+    session.execute(insert(Quiz).values(id=quiz_id, generated_by_user_id=user_id, title="Sync"))
+    session.execute(insert(Question).values([
+        {"id": question_id, "quiz_id": quiz_id, "question_text": "?", "question_type": "multiple_choice",
+         "possible_answers": {"A": "yes", "B": "no"}, "correct_answer": ["A"]}
+        for question_id in question_ids
+    ]))
+    session.execute(insert(QuizAttempt).values(id=attempt_id, user_id=user_id, quiz_id=quiz_id, **(
+        {"expired_at": expired_at} if expired_at else {}
+    )))
+    session.execute(insert(AttemptAnswer).values([
+        {"id": uuid4(), "attempt_id": attempt_id, "question_id": question_ids[0], "user_answer": ["A"]},
+        {"id": uuid4(), "attempt_id": attempt_id, "question_id": question_ids[1], "user_answer": ["B"]},
+    ]))
+    session.commit()
+    return attempt_id
+
+
+def test_evaluate_quiz_updates_the_dashboard(db):
+    from controllers import quizController
+    session, user_id = db
+    evaluation = quizController.evaluate_quiz(session, seed_attempt(session, user_id), user_id)
+    assert (evaluation.score, evaluation.points_earned) == (50, 1)
+    assert [detail.is_correct for detail in evaluation.evaluation_details].count(True) == 1
+    row = dashboard(session, user_id)
+    assert (row.score, row.point_earned) == (50, 1)
+
+
+def test_update_quiz_abandoned_updates_the_dashboard(db):
+    from controllers import quizController
+    session, user_id = db
+    seed_attempt(session, user_id, expired_at=datetime.now() - timedelta(hours=1))
+    quizController.update_quiz_abandoned(session, user_id)
+    row = dashboard(session, user_id)
+    assert (row.score, row.point_earned) == (50, 1)
+
+
+def test_mood_inference_updates_the_dashboard(db, monkeypatch):
+    from controllers import moodDetectionController
+    from schemas.moodDetectionSchemas import FaceDetectionRequest
+    session, user_id = db
+
+    class Response:
+        def raise_for_status(self):
+            pass
+
+        def json(self):
+            return {"prediction": "happy"}
+
+    monkeypatch.setattr(moodDetectionController.requests, "post", lambda *args, **kwargs: Response())
+    moodDetectionController.mood_inference(session, user_id, FaceDetectionRequest(image="frame"))
+    assert dashboard(session, user_id).today_mood == "Happy"
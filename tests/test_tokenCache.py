@@ -0,0 +1,45 @@
+"""
+Cache of the verified access tokens behind ``get_user_id``.
+"""
+import asyncio
+import time
+import pytest
+from fastapi import HTTPException
+
+
+@pytest.fixture
+def auth(monkeypatch):
+    from routes.middleware import auth
+    auth.token_cache.clear()
+    monkeypatch.setattr(auth, "_next_sweep", 0.0)
+    yield auth
+    auth.token_cache.clear()
+
+
+def test_verified_token_is_cached(auth):
+    from utils.auth import create_access_token
+    token = create_access_token({"user_id": "cached-user"})
+    assert asyncio.run(auth.get_user_id(token)) == "cached-user"
+    assert len(auth.token_cache) == 1
+    assert asyncio.run(auth.get_user_id(token)) == "cached-user"
+
+
+def test_expired_tokens_are_swept_on_insert(auth, monkeypatch):
+    from utils.auth import create_access_token
+    auth.token_cache.put(b"expired", ("gone", time.time() - 1))
+    auth.token_cache.put(b"valid", ("kept", time.time() + 3600))
+    asyncio.run(auth.get_user_id(create_access_token({"user_id": "new-user"})))
+    assert b"expired" not in auth.token_cache
+    assert b"valid" in auth.token_cache
+    # At most one sweep per interval
+    auth.token_cache.put(b"expired", ("gone", time.time() - 1))
+    asyncio.run(auth.get_user_id(create_access_token({"user_id": "other-user"})))
+    assert b"expired" in auth.token_cache
+
+
+def test_expired_cached_token_is_rejected(auth):
+    import hashlib
+    auth.token_cache.put(hashlib.sha256(b"stale-token").digest(), ("user", time.time() - 1))
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(auth.get_user_id("stale-token"))
+    assert error.value.status_code == 401
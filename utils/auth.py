@@ -2,15 +2,20 @@ from datetime import datetime, timedelta
 import jwt
 from passlib.context import CryptContext
 from fastapi import HTTPException, status
-from dotenv import load_dotenv
-from os import getenv
-load_dotenv()
+from settings import settings
 
 # Configurations
-SECRET_KEY = getenv("SECRET_KEY_ENCRYPTION")
+SECRET_KEY = settings.SECRET_KEY_ENCRYPTION
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 1440  # 24 hours
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Pinning min and max rounds to the configured cost makes ``verify_and_update`` rehash any other cost
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
@@ -22,6 +27,16 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """
     return pwd_context.verify(plain_password, hashed_password)
 
+def verify_and_update_password(plain_password: str, hashed_password: str) -> tuple[bool, str | None]:
+    """
+    Verify a plain password and rehash it when the stored hash uses an outdated cost factor.
+
+    :param plain_password: The plain text password to verify
+    :param hashed_password: The hashed password to compare against
+    :return: Whether the password matches, and the new hash to store or None
+    """
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
 def get_password_hash(password: str) -> str:
     """
     Hash a password using bcrypt.
@@ -0,0 +1,35 @@
+"""
+Shared HTTP client of the outbound calls to the mood classifier.
+
+One client per worker keeps its connections alive, so a call reuses an
+open TLS connection instead of a new handshake. It is opened by the
+lifespan hook of the app, or on first use outside of it (scripts, tests),
+and every call is bounded by ``MOOD_CLASSIFIER_*_TIMEOUT_SECONDS``.
+"""
+from typing import Optional
+import httpx
+from settings import settings
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def open_client() -> httpx.AsyncClient:
+    """
+    Return the shared client, creating it if needed.
+    """
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(timeout=httpx.Timeout(
+            settings.MOOD_CLASSIFIER_TIMEOUT_SECONDS, connect=settings.MOOD_CLASSIFIER_CONNECT_TIMEOUT_SECONDS
+        ))
+    return _client
+
+
+async def close_client() -> None:
+    """
+    Close the shared client and its connections, on shutdown.
+    """
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
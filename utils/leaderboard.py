@@ -0,0 +1,154 @@
+"""
+In-memory points leaderboard.
+
+Users are kept in a list sorted by ``(-points, user_id.int)``, so the rank
+of a user is a binary search instead of a scan of ``user_collections``.
+Integers compare much faster than ``UUID`` objects, which matters for the
+rebuild of a board with a million users. Users
+with the same points share the same rank (1, 2, 2, 4).
+
+Each worker holds its own copy: it is rebuilt periodically from the
+database (``jobs.leaderboardRefresh``) and updated in between by the
+grading of the quiz attempts handled by the worker. With several workers
+the points earned through another worker only show up at the next
+rebuild, so ranks can lag by up to ``LEADERBOARD_REFRESH_SECONDS``.
+
+A rebuild reads a snapshot while the worker keeps grading: the updates
+made between ``begin_refresh`` and ``replace`` are recorded and reapplied
+on top of the snapshot, so they are not lost by the swap.
+"""
+from bisect import bisect_left, insort
+from threading import Lock
+from typing import Iterable, NamedTuple, Optional
+from uuid import UUID
+
+
+class LeaderboardEntry(NamedTuple):
+    rank: int
+    user_id: UUID
+    full_name: Optional[str]
+    point_earned: int
+
+
+def _release(keys: list, points: dict, names: dict, chunk: int = 10_000) -> None:
+    # Freeing a million entries at once is one long C call holding the GIL,
+    # free them in chunks so the event loop gets a turn in between
+    while keys:
+        del keys[-chunk:]
+    for mapping in (points, names):
+        while mapping:
+            for _ in range(min(chunk, len(mapping))):
+                mapping.popitem()
+
+
+class Leaderboard:
+    def __init__(self):
+        self._keys: list[tuple[int, int]] = []
+        self._points: dict[UUID, int] = {}
+        self._names: dict[UUID, str] = {}
+        self._lock = Lock()
+        # Updates made since begin_refresh, None when no rebuild is running
+        self._pending: Optional[dict[UUID, tuple[int, Optional[str]]]] = None
+        self.loaded = False
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def begin_refresh(self) -> None:
+        """
+        Start recording the updates, call before reading the snapshot passed to ``replace``.
+        """
+        with self._lock:
+            self._pending = {}
+
+    def replace(self, rows: Iterable[tuple[UUID, Optional[str], int]]) -> None:
+        """
+        Rebuild the leaderboard from scratch.
+
+        The rows must come ordered by points descending then user ID (the
+        byte order of a PostgreSQL ``uuid`` is the order of ``UUID.int``),
+        so the keys are built in one pass without a sort. The pass is
+        bytecode rather than one long C call, so the thread running it gives
+        the GIL back to the event loop at every switch interval. The new
+        state is built before taking the lock, readers only wait for the swap.
+
+        :param rows: Tuples of user ID, full name and points, ordered
+        """
+        keys, points, names = [], {}, {}
+        for user_id, full_name, point_earned in rows:
+            keys.append((-point_earned, user_id.int))
+            points[user_id] = point_earned
+            names[user_id] = full_name
+        with self._lock:
+            previous = self._keys, self._points, self._names
+            self._keys, self._points, self._names = keys, points, names
+            pending, self._pending = self._pending or {}, None
+            for user_id, (point_earned, full_name) in pending.items():
+                # Points only grow, an update older than the snapshot is not applied over it
+                if point_earned > self._points.get(user_id, -1):
+                    self._update(user_id, point_earned, full_name)
+            self.loaded = True
+        _release(*previous)
+
+    def update(self, user_id: UUID, point_earned: int, full_name: Optional[str] = None) -> None:
+        """
+        Set the points of one user, moving it to its new position.
+
+        :param user_id: ID of the user
+        :param point_earned: Total points of the user
+        :param full_name: Name of the user, kept when omitted
+        """
+        with self._lock:
+            if self._pending is not None:
+                self._pending[user_id] = (point_earned, full_name)
+            self._update(user_id, point_earned, full_name)
+
+    def _update(self, user_id: UUID, point_earned: int, full_name: Optional[str]) -> None:
+        previous = self._points.get(user_id)
+        if previous is not None:
+            index = bisect_left(self._keys, (-previous, user_id.int))
+            del self._keys[index]
+        self._points[user_id] = point_earned
+        if full_name is not None:
+            self._names[user_id] = full_name
+        insort(self._keys, (-point_earned, user_id.int))
+
+    def _rank(self, point_earned: int) -> int:
+        # Users with strictly more points come first, (-p,) sorts before every (-p, user)
+        return bisect_left(self._keys, (-point_earned,)) + 1
+
+    def _entries(self, keys: list[tuple[int, int]]) -> list[LeaderboardEntry]:
+        entries = []
+        for negative_points, user_int in keys:
+            user_id = UUID(int=user_int)
+            entries.append(LeaderboardEntry(self._rank(-negative_points), user_id, self._names.get(user_id), -negative_points))
+        return entries
+
+    def rank(self, user_id: UUID) -> Optional[int]:
+        """
+        Return the rank of a user, None if the user has no points yet.
+        """
+        with self._lock:
+            point_earned = self._points.get(user_id)
+            return None if point_earned is None else self._rank(point_earned)
+
+    def top(self, limit: int) -> list[LeaderboardEntry]:
+        """
+        Return the ``limit`` users with the most points.
+        """
+        with self._lock:
+            return self._entries(self._keys[:limit])
+
+    def around(self, user_id: UUID, radius: int) -> list[LeaderboardEntry]:
+        """
+        Return a user with up to ``radius`` neighbors above and below, empty if the user has no points yet.
+        """
+        with self._lock:
+            point_earned = self._points.get(user_id)
+            if point_earned is None:
+                return []
+            index = bisect_left(self._keys, (-point_earned, user_id.int))
+            return self._entries(self._keys[max(index - radius, 0):index + radius + 1])
+
+
+leaderboard = Leaderboard()
@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, Optional
+
+
+class LRUCache:
+    """
+    Thread-safe mapping bounded to ``maxsize`` entries, evicting the least recently used one.
+    """
+    def __init__(self, maxsize: int):
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """
+        Return the value of ``key`` and mark it as recently used.
+
+        :param key: Key to look up
+        :param default: Value returned when the key is not cached
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """
+        Cache ``value`` under ``key``, evicting the least recently used entry when full.
+        """
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        with self._lock:
+            return self._data.pop(key, default)
+
+    def prune(self, predicate: Callable[[Any], bool]) -> int:
+        """
+        Remove every entry whose value matches ``predicate``.
+
+        :return: Number of removed entries
+        """
+        with self._lock:
+            stale = [key for key, value in self._data.items() if predicate(value)]
+            for key in stale:
+                del self._data[key]
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return key in self._data
+
+    def __len__(self) -> int:
+        return len(self._data)
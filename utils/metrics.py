@@ -0,0 +1,356 @@
+"""
+Minimal in-process metrics with Prometheus text exposition.
+
+Counters, gauges and histograms keep one child per label combination.
+Children are created with ``dict.setdefault`` and updated without a lock:
+the GIL makes each update cheap and, at worst, a concurrent increment from
+a threadpool thread is lost, which is acceptable for monitoring.
+
+With several worker processes every worker keeps its own metrics and
+publishes them as a JSON file in ``MULTIPROCESS_DIR`` (``Registry.publish``).
+``/metrics`` sums the files of all the workers: counters and histograms of
+the workers that exited are kept, so restarts do not reset them, gauges
+only count the workers still running. The values of the other workers are
+as old as their last publication (``MULTIPROCESS_PUBLISH_SECONDS``).
+
+Request attribution: ``RequestTimings`` collects the time spent in the
+database and in the AI services while handling the current request. The
+metrics middleware opens it through a context variable, and ``track`` /
+``add_dependency_time`` add to it from anywhere down the call stack
+(including SQLAlchemy's greenlets and the threadpool, which copy the
+context and so share the same object).
+"""
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from glob import glob
+from typing import Iterator, Optional, Sequence
+
+# Upper bounds (seconds) of the latency buckets
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children = {}
+        if not self.labelnames:
+            self._unlabelled = self.labels()
+
+    def labels(self, *values: str):
+        """
+        Return the child of a label combination, creating it on first use.
+
+        :param values: Label values, in the order of ``labelnames``
+        """
+        child = self._children.get(values)
+        if child is None:
+            if len(values) != len(self.labelnames):
+                raise ValueError(f"{self.name} expects labels {self.labelnames}")
+            child = self._children.setdefault(values, self._new_child())
+        return child
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def _samples(self, values: tuple, child) -> Iterator[str]:
+        yield f"{self.name}{_format_labels(self.labelnames, values)} {_format_value(child.value)}"
+
+    def render(self) -> Iterator[str]:
+        yield f"# HELP {self.name} {self.documentation}"
+        yield f"# TYPE {self.name} {self.kind}"
+        for values, child in list(self._children.items()):
+            yield from self._samples(values, child)
+
+    def _dump_child(self, child):
+        return child.value
+
+    def _merge_child(self, child, state) -> None:
+        child.value += state
+
+    def dump(self) -> dict:
+        """
+        Return the definition and the values of the metric as JSON-serializable data.
+        """
+        return {
+            "kind": self.kind,
+            "documentation": self.documentation,
+            "labelnames": list(self.labelnames),
+            "samples": [[list(values), self._dump_child(child)] for values, child in list(self._children.items())],
+        }
+
+    def merge(self, samples: list) -> None:
+        """
+        Add the samples of a ``dump`` of the same metric, e.g. from another worker.
+        """
+        for values, state in samples:
+            self._merge_child(self.labels(*values), state)
+
+
+class _Value:
+    __slots__ = ("value",)
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount: float = 1) -> None:
+        self.value += amount
+
+    def dec(self, amount: float = 1) -> None:
+        self.value -= amount
+
+    def set(self, value: float) -> None:
+        self.value = value
+
+
+class Counter(_Metric):
+    """
+    Monotonically increasing count, e.g. requests served.
+    """
+    kind = "counter"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        self._unlabelled.inc(amount)
+
+
+class Gauge(_Metric):
+    """
+    Value going up and down, e.g. requests in flight.
+    """
+    kind = "gauge"
+
+    def _new_child(self):
+        return _Value()
+
+    def inc(self, amount: float = 1) -> None:
+        self._unlabelled.inc(amount)
+
+    def dec(self, amount: float = 1) -> None:
+        self._unlabelled.dec(amount)
+
+    def set(self, value: float) -> None:
+        self._unlabelled.set(value)
+
+
+class _HistogramValue:
+    __slots__ = ("bounds", "counts", "sum")
+
+    def __init__(self, bounds: tuple):
+        self.bounds = bounds
+        # One count per bucket plus the +Inf bucket, not cumulative
+        self.counts = [0] * (len(bounds) + 1)
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.bounds, value)] += 1
+        self.sum += value
+
+
+class Histogram(_Metric):
+    """
+    Distribution of observed values in fixed buckets, e.g. request latency.
+    """
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(bucket for bucket in buckets if bucket != float("inf")))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_child(self):
+        return _HistogramValue(self.buckets)
+
+    def observe(self, value: float) -> None:
+        self._unlabelled.observe(value)
+
+    def _samples(self, values: tuple, child) -> Iterator[str]:
+        counts = list(child.counts)
+        cumulative = 0
+        for bound, count in zip(self.buckets + (float("inf"),), counts):
+            cumulative += count
+            labels = _format_labels(self.labelnames, values, f'le="{_format_value(bound)}"')
+            yield f"{self.name}_bucket{labels} {cumulative}"
+        labels = _format_labels(self.labelnames, values)
+        yield f"{self.name}_sum{labels} {_format_value(child.sum)}"
+        yield f"{self.name}_count{labels} {cumulative}"
+
+    def _dump_child(self, child):
+        return [list(child.counts), child.sum]
+
+    def _merge_child(self, child, state) -> None:
+        counts, total = state
+        for index, count in enumerate(counts):
+            child.counts[index] += count
+        child.sum += total
+
+    def dump(self) -> dict:
+        return dict(super().dump(), buckets=list(self.buckets))
+
+
+class Registry:
+    """
+    Set of metrics rendered together on the ``/metrics`` endpoint.
+    """
+    def __init__(self):
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} is already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def render(self) -> str:
+        """
+        Return every metric in the Prometheus text exposition format.
+        """
+        lines = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def publish(self, directory: str) -> None:
+        """
+        Write the metrics of this process to ``directory``, replacing its previous file atomically.
+
+        :param directory: Directory shared by the workers
+        """
+        path = os.path.join(directory, f"metrics-{os.getpid()}.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump({name: metric.dump() for name, metric in list(self._metrics.items())}, file)
+        os.replace(f"{path}.tmp", path)
+
+    def render_all(self, directory: str) -> str:
+        """
+        Publish the metrics of this process and render the sum of the metrics of every worker.
+
+        :param directory: Directory shared by the workers
+        :return: Metrics in the Prometheus text exposition format
+        """
+        self.publish(directory)
+        merged = Registry()
+        for path in sorted(glob(os.path.join(directory, "metrics-*.json"))):
+            try:
+                with open(path, encoding="utf-8") as file:
+                    dumps = json.load(file)
+            except (OSError, ValueError):
+                continue
+            alive = _alive(int(os.path.basename(path)[len("metrics-"):-len(".json")]))
+            for name, dump in dumps.items():
+                metric = merged._metrics.get(name) or merged.register(_from_dump(name, dump))
+                # Gauges describe the present, the last value of a stopped worker is meaningless
+                if dump["kind"] != "gauge" or alive:
+                    metric.merge(dump["samples"])
+        return merged.render()
+
+
+def _alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _from_dump(name: str, dump: dict) -> _Metric:
+    if dump["kind"] == "histogram":
+        return Histogram(name, dump["documentation"], dump["labelnames"], dump["buckets"])
+    return (Counter if dump["kind"] == "counter" else Gauge)(name, dump["documentation"], dump["labelnames"])
+
+
+registry = Registry()
+
+def counter(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+    return registry.register(Counter(name, documentation, labelnames))
+
+def gauge(name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+    return registry.register(Gauge(name, documentation, labelnames))
+
+def histogram(name: str, documentation: str, labelnames: Sequence[str] = (),
+              buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+    return registry.register(Histogram(name, documentation, labelnames, buckets))
+
+
+dependency_seconds = histogram(
+    "app_dependency_duration_seconds",
+    "Time of single calls to the database and the AI services",
+    ("dependency",)
+)
+
+
+class RequestTimings:
+    """
+    Time spent in each dependency while handling one request.
+    """
+    __slots__ = ("seconds",)
+
+    def __init__(self):
+        self.seconds: dict[str, float] = {}
+
+    def add(self, dependency: str, seconds: float) -> None:
+        self.seconds[dependency] = self.seconds.get(dependency, 0.0) + seconds
+
+
+_request_timings: ContextVar[Optional[RequestTimings]] = ContextVar("request_timings", default=None)
+
+def start_request_timings() -> RequestTimings:
+    """
+    Attribute the dependency time of the current context to a new request.
+    """
+    timings = RequestTimings()
+    _request_timings.set(timings)
+    return timings
+
+def add_dependency_time(dependency: str, seconds: float) -> None:
+    """
+    Record one call to a dependency and add its time to the current request, if any.
+
+    :param dependency: ``db``, ``llm`` or ``classifier``
+    :param seconds: Duration of the call
+    """
+    dependency_seconds.labels(dependency).observe(seconds)
+    timings = _request_timings.get()
+    if timings is not None:
+        timings.add(dependency, seconds)
+
+@contextmanager
+def track(dependency: str):
+    """
+    Time the enclosed block as a call to ``dependency``, works around ``await`` as well.
+
+    :param dependency: ``db``, ``llm`` or ``classifier``
+    """
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_dependency_time(dependency, time.perf_counter() - started)
@@ -0,0 +1,87 @@
+"""
+Vectorized mood trend analytics.
+
+The moods of a date range arrive as two columnar arrays, the day offset
+from the start of the range and the mood level, and every statistic is
+computed with NumPy on a (days x moods) one-hot matrix instead of looping
+over the rows in Python.
+"""
+from typing import NamedTuple
+import numpy as np
+
+
+class MoodTrends(NamedTuple):
+    daily: np.ndarray           # (days,) mood column of each day, -1 without a record
+    totals: np.ndarray          # (moods,) records of each mood
+    rolling: np.ndarray         # (days, moods) records of each mood in the trailing window
+    longest_streak: np.ndarray  # (moods,) longest run of consecutive days with the mood
+    longest_streak_end: np.ndarray  # (moods,) day offset of the last day of that run, -1 if none
+    current_streak: tuple       # (mood column, length, last day offset) of the latest run, None without records
+    weekly: np.ndarray          # (weeks, moods) records of each mood per week
+    weekly_change: np.ndarray   # (weeks, moods) difference with the previous week
+
+
+def compute_mood_trends(offsets, levels, days: int, mood_ids, window: int = 7, first_weekday: int = 0) -> MoodTrends:
+    """
+    Compute the mood trends of one user over a range of days.
+
+    :param offsets: Day offset of each record from the start of the range, at most one record per day
+    :param levels: Mood level of each record
+    :param days: Number of days in the range
+    :param mood_ids: Sorted IDs of every mood, the column order of the results
+    :param window: Length in days of the rolling distribution
+    :param first_weekday: Weekday of the first day of the range (Monday is 0), weeks start on Monday
+    :return: Trends of the range
+    """
+    offsets = np.asarray(offsets, dtype=np.int64)
+    mood_ids = np.asarray(mood_ids, dtype=np.int64)
+    columns = np.searchsorted(mood_ids, np.asarray(levels, dtype=np.int64))
+    moods = len(mood_ids)
+
+    daily = np.full(days, -1, dtype=np.int64)
+    daily[offsets] = columns
+    one_hot = np.zeros((days, moods), dtype=np.int32)
+    one_hot[offsets, columns] = 1
+    totals = one_hot.sum(axis=0)
+
+    # Trailing window sums as differences of the cumulative counts
+    cumulative = np.vstack([np.zeros((1, moods), dtype=np.int32), one_hot.cumsum(axis=0, dtype=np.int32)])
+    window_end = np.arange(1, days + 1)
+    rolling = cumulative[window_end] - cumulative[np.maximum(window_end - window, 0)]
+
+    # Run-length encoding of the daily series, a missing day (-1) breaks a streak
+    boundaries = np.flatnonzero(np.diff(daily)) + 1
+    run_starts = np.concatenate(([0], boundaries))
+    run_ends = np.concatenate((boundaries, [days]))
+    run_values = daily[run_starts]
+    recorded = run_values >= 0
+    run_starts, run_ends, run_values = run_starts[recorded], run_ends[recorded], run_values[recorded]
+    run_lengths = run_ends - run_starts
+
+    longest_streak = np.zeros(moods, dtype=np.int64)
+    np.maximum.at(longest_streak, run_values, run_lengths)
+    # Longest and, among ties, latest run of each mood: the maximum of the (length, last day) pair
+    # encoded as one integer, ends are below ``days + 1`` so the encoding keeps the order
+    longest_key = np.full(moods, -1, dtype=np.int64)
+    np.maximum.at(longest_key, run_values, run_lengths * (days + 1) + (run_ends - 1))
+    longest_streak_end = np.where(longest_key >= 0, longest_key % (days + 1), -1)
+    current_streak = (
+        (int(run_values[-1]), int(run_lengths[-1]), int(run_ends[-1] - 1)) if len(run_values) else None
+    )
+
+    week_of_day = (np.arange(days) + first_weekday) // 7
+    weeks = int(week_of_day[-1]) + 1 if days else 0
+    weekly = np.zeros((weeks, moods), dtype=np.int32)
+    np.add.at(weekly, (week_of_day[offsets], columns), 1)
+    weekly_change = np.diff(weekly, axis=0, prepend=weekly[:1]) if weeks else weekly
+
+    return MoodTrends(
+        daily=daily,
+        totals=totals,
+        rolling=rolling,
+        longest_streak=longest_streak,
+        longest_streak_end=longest_streak_end,
+        current_streak=current_streak,
+        weekly=weekly,
+        weekly_change=weekly_change,
+    )
@@ -0,0 +1,61 @@
+import base64
+import json
+from datetime import date, datetime
+from typing import Any, Callable, Sequence
+from uuid import UUID
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+
+def _encode_value(value: Any) -> Any:
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
+
+def encode_cursor(*values: Any) -> str:
+    """
+    Encode the sort key of the last row of a page into an opaque cursor.
+
+    :param values: Sort key columns of the last row, e.g. ``created_at`` and ``id``
+    :return: URL safe cursor string
+    """
+    raw = json.dumps([_encode_value(value) for value in values], separators=(",", ":"))
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, *parsers: Callable[[str], Any]) -> tuple:
+    """
+    Decode a cursor created by ``encode_cursor``.
+
+    :param cursor: Cursor received from the client
+    :param parsers: One parser per sort key column, e.g. ``datetime.fromisoformat`` and ``UUID``
+    :return: Parsed sort key
+    :raises ValueError: If the cursor is malformed
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+        if not isinstance(values, list) or len(values) != len(parsers):
+            raise ValueError("unexpected cursor length")
+        return tuple(parse(value) for parse, value in zip(parsers, values))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Invalid cursor") from e
+
+
+def split_page(rows: Sequence, limit: int, key: Callable[[Any], tuple]) -> tuple[list, str | None]:
+    """
+    Split the ``limit + 1`` rows fetched for a page into the page and the cursor of the next one.
+
+    :param rows: Rows fetched with ``LIMIT limit + 1``
+    :param limit: Page size
+    :param key: Returns the sort key of a row
+    :return: Tuple of the rows of the page and the next cursor, None on the last page
+    """
+    page = list(rows[:limit])
+    if len(rows) <= limit:
+        return page, None
+    return page, encode_cursor(*key(page[-1]))
@@ -0,0 +1,193 @@
+"""
+bcrypt hashing and verification in a dedicated pool of worker processes.
+
+bcrypt is deliberately slow CPU bound work. Run in the request threadpool
+it holds the GIL and starves every other request during a login spike, so
+it runs in worker processes instead, one per core by default.
+
+The pool admits at most ``PASSWORD_HASH_QUEUE_SIZE`` passwords queued or
+in progress. Past that, logins and sign-ups fail fast with
+``HashingPoolBusyError`` (a 503) instead of piling up behind each other.
+Bulk provisioning is never rejected and has its own count: at most
+``PASSWORD_HASH_BULK_CHUNKS`` of its chunks sit in the pool at once, so a
+large import neither fills the admission limit nor buries the logins under
+a deep queue.
+
+The workers are started by a forkserver rather than forked from the web
+worker, which runs threads. If a worker dies the pool is broken, it is
+replaced and the call retried once.
+"""
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import List, Optional
+from settings import settings
+
+# Largest number of passwords hashed per task sent to a worker process
+HASH_CHUNK_SIZE = 64
+
+
+class HashingPoolBusyError(Exception):
+    """
+    Raised when the password hashing pool has no room for another password.
+    """
+    def __init__(self):
+        super().__init__("Too many password operations in progress, retry shortly")
+
+
+class _PoolState:
+    executor: Optional[ProcessPoolExecutor] = None
+    # Passwords submitted and not finished yet, only touched from the event loop
+    in_flight = 0
+    bulk_in_flight = 0
+    rejected = 0
+    restarts = 0
+    # Bulk chunk slots, an asyncio primitive belongs to one event loop
+    bulk_slots: Optional[asyncio.Semaphore] = None
+    bulk_loop: Optional[asyncio.AbstractEventLoop] = None
+
+
+_state = _PoolState()
+
+
+def _hash_chunk(passwords: List[str]) -> List[str]:
+    from utils.auth import get_password_hash
+    return [get_password_hash(password) for password in passwords]
+
+
+def _verify_and_update(password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    from utils.auth import verify_and_update_password
+    return verify_and_update_password(password, hashed_password)
+
+
+def _started() -> None:
+    pass
+
+
+def _workers() -> int:
+    return settings.PASSWORD_HASH_WORKERS or os.cpu_count() or 1
+
+
+def _bulk_chunks() -> int:
+    return settings.PASSWORD_HASH_BULK_CHUNKS or _workers()
+
+
+def get_executor() -> ProcessPoolExecutor:
+    """
+    Return the process pool, created on first use.
+    """
+    if _state.executor is None:
+        _state.executor = ProcessPoolExecutor(max_workers=_workers(), mp_context=multiprocessing.get_context("forkserver"))
+    return _state.executor
+
+
+async def start_executor() -> None:
+    """
+    Start the worker processes, so the first logins after startup do not wait for them.
+    """
+    executor = get_executor()
+    loop = asyncio.get_running_loop()
+    await asyncio.gather(*(loop.run_in_executor(executor, _started) for _ in range(_workers())))
+
+
+def shutdown_executor() -> None:
+    if _state.executor is not None:
+        _state.executor.shutdown(cancel_futures=True)
+        _state.executor = None
+
+
+def _discard_executor(executor: ProcessPoolExecutor) -> None:
+    # Calls failing together on the same broken pool replace it only once
+    if _state.executor is executor:
+        _state.executor = None
+        _state.restarts += 1
+        executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _bulk_slots() -> asyncio.Semaphore:
+    loop = asyncio.get_running_loop()
+    if _state.bulk_loop is not loop:
+        _state.bulk_slots, _state.bulk_loop = asyncio.Semaphore(_bulk_chunks()), loop
+    return _state.bulk_slots
+
+
+def stats() -> dict:
+    return {"workers": _workers(), "in_flight": _state.in_flight, "bulk_in_flight": _state.bulk_in_flight,
+            "rejected": _state.rejected, "restarts": _state.restarts,
+            "queue_size": settings.PASSWORD_HASH_QUEUE_SIZE}
+
+
+async def _run(function, *args):
+    """
+    Run ``function`` in the pool, replacing a broken pool and retrying once.
+    """
+    loop = asyncio.get_running_loop()
+    executor = get_executor()
+    try:
+        return await loop.run_in_executor(executor, function, *args)
+    except BrokenProcessPool:
+        # A worker died (e.g. killed by the OOM killer), counted in ``restarts``
+        _discard_executor(executor)
+        return await loop.run_in_executor(get_executor(), function, *args)
+
+
+async def _submit(function, *args):
+    """
+    Run one interactive password operation in the pool.
+
+    :raises HashingPoolBusyError: If ``PASSWORD_HASH_QUEUE_SIZE`` passwords are already queued or in progress
+    """
+    if _state.in_flight >= settings.PASSWORD_HASH_QUEUE_SIZE:
+        _state.rejected += 1
+        raise HashingPoolBusyError()
+    _state.in_flight += 1
+    try:
+        return await _run(function, *args)
+    finally:
+        _state.in_flight -= 1
+
+
+async def _submit_bulk(chunk: List[str]) -> List[str]:
+    """
+    Hash a chunk of a bulk import once a bulk slot is free, outside of the admission limit.
+    """
+    async with _bulk_slots():
+        _state.bulk_in_flight += len(chunk)
+        try:
+            return await _run(_hash_chunk, chunk)
+        finally:
+            _state.bulk_in_flight -= len(chunk)
+
+
+async def hash_password(password: str) -> str:
+    """
+    Hash one password, e.g. at sign-up.
+
+    :raises HashingPoolBusyError: If the pool is full
+    """
+    return (await _submit(_hash_chunk, [password]))[0]
+
+
+async def verify_password(password: str, hashed_password: str) -> tuple[bool, Optional[str]]:
+    """
+    Verify a password, returning the new hash when the stored one uses an outdated cost factor.
+
+    :raises HashingPoolBusyError: If the pool is full
+    """
+    return await _submit(_verify_and_update, password, hashed_password)
+
+
+async def hash_passwords(passwords: List[str]) -> List[str]:
+    """
+    Hash many passwords in parallel without blocking the event loop, for bulk provisioning.
+
+    :param passwords: Plain text passwords
+    :return: Hashes in the order of ``passwords``
+    """
+    # Small batches are still spread over every worker
+    chunk_size = max(1, min(HASH_CHUNK_SIZE, -(-len(passwords) // _workers())))
+    chunks = [passwords[index:index + chunk_size] for index in range(0, len(passwords), chunk_size)]
+    hashed = await asyncio.gather(*(_submit_bulk(chunk) for chunk in chunks))
+    return [password_hash for chunk in hashed for password_hash in chunk]
@@ -0,0 +1,249 @@
+"""
+Sampling profiler for single requests.
+
+While at least one profile is active, a daemon thread wakes up every
+``interval`` seconds, takes the stack of every thread with
+``sys._current_frames()`` and adds it to each active profile:
+
+* the event loop thread is only sampled while the task of the profiled
+  request is the one running, so concurrent requests do not show up;
+* other threads (the threadpool running the LLM clients and the LangGraph
+  agent, the sync engine) are sampled while they are busy. They cannot be
+  tied to a task, so under concurrency they show up in every profile
+  active at that time.
+
+Each sample counts once in the wall-clock profile, and with the CPU time
+the thread used since the previous sample in the CPU profile. Both are
+kept as folded stacks (``frame;frame;frame count``), the input of
+flamegraph.pl, speedscope and similar tools.
+
+Nothing runs while no profile is active.
+
+Finished profiles are kept in a ring buffer of the worker. With several
+workers they are also saved to a shared directory, so the admin endpoints
+find a profile whichever worker recorded it.
+"""
+import asyncio
+import json
+import os
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, deque
+from glob import glob
+from os.path import basename
+from typing import Optional
+
+# Leaf functions of a thread waiting for work, such samples are skipped
+_IDLE_FUNCTIONS = {"wait", "_wait_for_tstate_lock", "get", "select", "poll", "_worker"}
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{code.co_qualname} ({basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _stack(frame) -> tuple[str, ...]:
+    names = []
+    while frame is not None:
+        names.append(_frame_name(frame))
+        frame = frame.f_back
+    names.reverse()
+    return tuple(names)
+
+
+def _thread_cpu(ident: int) -> Optional[float]:
+    try:
+        return time.clock_gettime(time.pthread_getcpuclockid(ident))
+    except (AttributeError, OSError):
+        return None
+
+
+class Profile:
+    """
+    Samples of one request.
+    """
+    def __init__(self, method: str, path: str, trigger: str):
+        self.id = uuid.uuid4().hex
+        self.method = method
+        self.path = path
+        self.trigger = trigger
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.cpu = 0.0
+        self.samples = 0
+        self.wall = Counter()
+        self.cpu_micros = Counter()
+        self.loop_thread = threading.get_ident()
+        self.loop = asyncio.get_running_loop()
+        self.task = asyncio.current_task()
+        self._started = time.perf_counter()
+
+    def summary(self) -> dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "trigger": self.trigger,
+            "started_at": self.started_at,
+            "duration_ms": self.duration * 1000,
+            "cpu_ms": self.cpu * 1000,
+            "samples": self.samples,
+        }
+
+    def folded(self, kind: str = "wall") -> str:
+        """
+        Return the profile as folded stacks, one ``frame;frame;frame weight`` line per distinct stack.
+
+        :param kind: ``wall`` (weight in samples) or ``cpu`` (weight in microseconds of CPU time)
+        """
+        stacks = self.cpu_micros if kind == "cpu" else self.wall
+        return "".join(f"{';'.join(stack)} {weight}\n" for stack, weight in stacks.most_common() if weight)
+
+
+class SavedProfile:
+    """
+    Finished profile read back from the shared directory, possibly recorded by another worker.
+    """
+    def __init__(self, data: dict):
+        self.id = data["summary"]["id"]
+        self._summary = data["summary"]
+        self._folded = {"wall": data["wall"], "cpu": data["cpu"]}
+
+    def summary(self) -> dict:
+        return dict(self._summary)
+
+    def folded(self, kind: str = "wall") -> str:
+        return self._folded["cpu" if kind == "cpu" else "wall"]
+
+
+class Sampler:
+    """
+    Background thread sampling the stacks of the active profiles, and the ring buffer of the finished ones.
+
+    :param interval: Seconds between two samples
+    :param capacity: Finished profiles kept, by this worker and in ``directory`` for all the workers together
+    :param directory: Directory shared by the workers, None to keep the profiles in this worker only
+    """
+    def __init__(self, interval: float, capacity: int, directory: Optional[str] = None):
+        self.interval = interval
+        self.capacity = capacity
+        self.directory = directory
+        self.finished = deque(maxlen=capacity)
+        self._active: list[Profile] = []
+        self._cpu_seen: dict[int, float] = {}
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self, method: str, path: str, trigger: str) -> Profile:
+        """
+        Start profiling the current request, must be called from its task.
+        """
+        profile = Profile(method, path, trigger)
+        with self._lock:
+            self._active.append(profile)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+                self._thread.start()
+        return profile
+
+    def stop(self, profile: Profile) -> None:
+        """
+        Stop sampling a profile and keep it in the ring buffer.
+
+        :param profile: Profile returned by ``start``
+        """
+        profile.duration = time.perf_counter() - profile._started
+        with self._lock:
+            self._active.remove(profile)
+            profile.cpu = sum(profile.cpu_micros.values()) / 1e6
+            self.finished.append(profile)
+
+    def save(self, profile: Profile) -> None:
+        """
+        Write a finished profile to the shared directory, dropping the oldest saved beyond the capacity.
+        """
+        path = os.path.join(self.directory, f"profile-{profile.id}.json")
+        with open(f"{path}.tmp", "w", encoding="utf-8") as file:
+            json.dump({"summary": profile.summary(), "wall": profile.folded("wall"), "cpu": profile.folded("cpu")}, file)
+        os.replace(f"{path}.tmp", path)
+        for _, stale in self._saved()[:-self.capacity]:
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+    def _saved(self) -> list[tuple[float, str]]:
+        # Oldest first, a file removed by another worker in the meantime is skipped
+        saved = []
+        for path in glob(os.path.join(self.directory, "profile-*.json")):
+            try:
+                saved.append((os.path.getmtime(path), path))
+            except FileNotFoundError:
+                pass
+        return sorted(saved)
+
+    def _load(self, path: str) -> Optional[SavedProfile]:
+        try:
+            with open(path, encoding="utf-8") as file:
+                return SavedProfile(json.load(file))
+        except (OSError, ValueError):
+            return None
+
+    def get(self, profile_id: str) -> Optional[Profile | SavedProfile]:
+        with self._lock:
+            profile = next((profile for profile in self.finished if profile.id == profile_id), None)
+        if profile is None and self.directory and re.fullmatch(r"[0-9a-f]{32}", profile_id):
+            profile = self._load(os.path.join(self.directory, f"profile-{profile_id}.json"))
+        return profile
+
+    def list(self) -> list[Profile | SavedProfile]:
+        """
+        Return the finished profiles, newest first.
+        """
+        if self.directory:
+            profiles = [profile for profile in (self._load(path) for _, path in self._saved()) if profile is not None]
+            return sorted(profiles, key=lambda profile: profile.summary()["started_at"], reverse=True)
+        with self._lock:
+            return list(reversed(self.finished))
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while True:
+            frames = sys._current_frames()
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            # Held while sampling, so a profile is never changed once stopped
+            with self._lock:
+                if not self._active:
+                    self._thread = None
+                    self._cpu_seen.clear()
+                    return
+                self._sample(own, frames, names)
+            del frames
+            time.sleep(self.interval)
+
+    def _sample(self, own: int, frames: dict, names: dict) -> None:
+        for ident, frame in frames.items():
+            if ident == own:
+                continue
+            cpu = _thread_cpu(ident)
+            cpu_delta = 0.0
+            if cpu is not None:
+                cpu_delta = max(cpu - self._cpu_seen.get(ident, cpu), 0.0)
+                self._cpu_seen[ident] = cpu
+            stack = None
+            for profile in self._active:
+                if ident == profile.loop_thread:
+                    # Private, but the only way to know the running task of another thread's loop
+                    if asyncio.tasks._current_tasks.get(profile.loop) is not profile.task:
+                        continue
+                elif frame.f_code.co_name in _IDLE_FUNCTIONS:
+                    continue
+                if stack is None:
+                    stack = (names.get(ident, str(ident)),) + _stack(frame)
+                profile.samples += 1
+                profile.wall[stack] += 1
+                if cpu_delta:
+                    profile.cpu_micros[stack] += round(cpu_delta * 1e6)
@@ -0,0 +1,64 @@
+import math
+import time
+from threading import Lock
+from typing import Hashable
+from utils.lru import LRUCache
+
+
+class TokenBucketLimiter:
+    """
+    Token bucket per key: each key may spend ``burst`` attempts at once and
+    earns ``rate_per_minute`` attempts back per minute.
+
+    Buckets live in an LRU bounded to ``max_keys``, so a flood of distinct
+    keys evicts the least recently seen buckets instead of growing memory.
+    An evicted key simply starts over with a full bucket.
+    """
+    def __init__(self, name: str, rate_per_minute: float, burst: int, max_keys: int):
+        if rate_per_minute <= 0 or burst < 1:
+            raise ValueError("rate_per_minute must be positive and burst at least 1")
+        self.name = name
+        self.rate = rate_per_minute / 60
+        self.burst = burst
+        self.allowed = 0
+        self.rejected = 0
+        self._buckets = LRUCache(max_keys)
+        self._lock = Lock()
+
+    def acquire(self, key: Hashable) -> float:
+        """
+        Spend one token of ``key``.
+
+        :param key: Caller to throttle, e.g. a client IP or a username
+        :return: 0 if the attempt is allowed, otherwise the seconds until the next token
+        """
+        now = time.monotonic()
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (self.burst, now))
+            tokens = min(self.burst, tokens + (now - updated_at) * self.rate)
+            if tokens < 1:
+                self._buckets.put(key, (tokens, now))
+                self.rejected += 1
+                return (1 - tokens) / self.rate
+            self._buckets.put(key, (tokens - 1, now))
+            self.allowed += 1
+            return 0.0
+
+    def snapshot(self) -> dict:
+        """
+        Return the limits, the tracked keys and the accumulated counters.
+        """
+        return {
+            "rate_per_minute": self.rate * 60,
+            "burst": self.burst,
+            "tracked_keys": len(self._buckets),
+            "allowed": self.allowed,
+            "rejected": self.rejected,
+        }
+
+
+def retry_after_header(seconds: float) -> str:
+    """
+    Format a wait time for the ``Retry-After`` header (whole seconds, at least 1).
+    """
+    return str(max(1, math.ceil(seconds)))